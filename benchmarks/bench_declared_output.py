@@ -0,0 +1,110 @@
+"""
+Benchmark of declared output labels (output_index, output_columns)
+compared with a user function that provides a DataFrame.
+
+The DataFrame user function builds a DataFrame in every call and returns
+its values if is_dataframe is False, as many user functions do. The
+declared user function returns the array. Reported are the time to
+construct Fitterpp and the time of an evaluation of the residuals.
+
+Usage
+-----
+PYTHONPATH=. python benchmarks/bench_declared_output.py --sizes 100 10000 1000000
+"""
+
+from fitterpp.fitterpp import Fitterpp
+
+import argparse
+import json
+import lmfit
+import numpy as np
+import pandas as pd
+import time
+
+COLUMNS = ["y1", "y2"]
+INDEX_NAME = "time"
+
+
+def timeCall(function, num_repeat):
+    """
+    Measures the average time of a call.
+
+    Parameters
+    ----------
+    function: Function (no arguments)
+    num_repeat: int
+
+    Returns
+    -------
+    float (microseconds per call)
+    """
+    function()  # Warm up
+    start = time.perf_counter()
+    for _ in range(num_repeat):
+        function()
+    return 1e6*(time.perf_counter() - start)/num_repeat
+
+
+def measure(size, num_repeat=None):
+    """
+    Measures construction and evaluation for a number of rows of output.
+
+    Parameters
+    ----------
+    size: int (number of rows of the output and the data)
+    num_repeat: int (calls per measurement)
+
+    Returns
+    -------
+    dict (microseconds)
+    """
+    if num_repeat is None:
+        num_repeat = max(5, int(1e6//size))
+    times = np.linspace(0, 10, size)
+    index = pd.Index(times, name=INDEX_NAME)
+    def calcArray(rate=1.0, scale=1.0):
+        return np.column_stack([scale*np.exp(-rate*times),
+              scale*(1 - np.exp(-rate*times))])
+    def calcDataFrame(rate=1.0, scale=1.0, is_dataframe=True):
+        df = pd.DataFrame(calcArray(rate=rate, scale=scale), index=index,
+              columns=COLUMNS)
+        if is_dataframe:
+            return df
+        return df.values
+    parameters = lmfit.Parameters()
+    parameters.add("rate", value=0.5, min=0, max=10)
+    parameters.add("scale", value=2, min=0, max=10)
+    data_df = calcDataFrame(rate=1.0, scale=1.0)
+    def mkDataFrameFitter():
+        return Fitterpp(calcDataFrame, parameters, data_df)
+    def mkDeclaredFitter():
+        return Fitterpp(calcArray, parameters, data_df, output_index=index,
+              output_columns=COLUMNS)
+    dataframe_fitter = mkDataFrameFitter()
+    declared_fitter = mkDeclaredFitter()
+    # Check consistency
+    if not np.allclose(dataframe_fitter.function(parameters),
+          declared_fitter.function(parameters)):
+        raise RuntimeError("Inconsistent residuals.")
+    num_construct = max(1, num_repeat//10)
+    return dict(size=size,
+          dataframe_construct=timeCall(mkDataFrameFitter, num_construct),
+          declared_construct=timeCall(mkDeclaredFitter, num_construct),
+          dataframe_evaluate=timeCall(
+              lambda: dataframe_fitter.function(parameters), num_repeat),
+          declared_evaluate=timeCall(
+              lambda: declared_fitter.function(parameters), num_repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+          description="Benchmark of declared output labels")
+    parser.add_argument("--sizes", type=int, nargs="+",
+          default=[100, int(1e4), int(1e6)])
+    args = parser.parse_args()
+    results = [measure(s) for s in args.sizes]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
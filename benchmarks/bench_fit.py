@@ -0,0 +1,219 @@
+"""
+Benchmark of fitting workloads (see fit_workloads.py).
+
+Each workload is fit by Fitterpp with each method chain. The results are
+written as JSON. For each workload and chain, the measurements are
+    evaluations_per_sec: evaluations of the user function per second of fit
+    time_to_target: seconds until an evaluation has an rssq no larger than
+        the target of the workload (None if the target is not reached)
+    peak_memory: largest memory allocated during the fit in MB (tracemalloc)
+    duration, num_evaluation, rssq, target_rssq
+The import time of fitterpp is in import_time.
+
+The compare mode reports the ratio of the measurements of a new result
+file to those of a base file. Ratios larger than 1 are improvements.
+
+Usage
+-----
+PYTHONPATH=. python benchmarks/bench_fit.py --output base.json
+PYTHONPATH=. python benchmarks/bench_fit.py --workloads parabola linear  \
+    --chains leastsq --output new.json
+python benchmarks/bench_fit.py --compare base.json new.json
+"""
+
+import bench_import
+import fit_workloads
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+MB = 1e6
+CHAIN_SEP = "+"
+DEFAULT_CHAINS = ["leastsq", "differential_evolution",
+      "differential_evolution+leastsq"]
+# Larger is better (otherwise smaller is better)
+HIGHER_BETTER_METRICS = ["evaluations_per_sec"]
+LOWER_BETTER_METRICS = ["time_to_target", "peak_memory", "duration"]
+
+
+class RecordingFunction():
+    # Records the time of each evaluation of a user function
+
+    def __init__(self, user_function):
+        self.user_function = user_function
+        self.times = []
+
+    def __call__(self, is_dataframe=True, **kwargs):
+        result = self.user_function(is_dataframe=is_dataframe, **kwargs)
+        if not is_dataframe:
+            self.times.append(time.perf_counter())
+        return result
+
+
+def mkMethods(chain, max_fev):
+    """
+    Creates the methods of a chain. Differential evolution is seeded.
+
+    Parameters
+    ----------
+    chain: str (method names separated by CHAIN_SEP)
+    max_fev: int
+
+    Returns
+    -------
+    list-FitterppMethod
+    """
+    from fitterpp import constants as cn
+    from fitterpp import util
+    methods = []
+    for method_name in chain.split(CHAIN_SEP):
+        kwargs = {cn.MAX_NFEV: max_fev}
+        if method_name == cn.METHOD_DIFFERENTIAL_EVOLUTION:
+            kwargs["seed"] = fit_workloads.SEED
+        methods.append(util.FitterppMethod(method_name, kwargs))
+    return methods
+
+def measure(workload, chain, max_fev):
+    """
+    Fits a workload with a chain of methods.
+
+    Parameters
+    ----------
+    workload: fit_workloads.Workload
+    chain: str
+    max_fev: int
+
+    Returns
+    -------
+    dict
+    """
+    from fitterpp.fitterpp import Fitterpp
+    from fitterpp.function_wrapper import FunctionWrapper
+    _ = FunctionWrapper.getReferenceTime()  # Not part of the fit
+    function = RecordingFunction(workload.user_function)
+    tracemalloc.start()
+    fitter = Fitterpp(function, workload.initial_params, workload.data_df,
+          method_names=mkMethods(chain, max_fev), is_collect=True)
+    function.times = []
+    tracemalloc.reset_peak()
+    start_time = time.perf_counter()
+    fitter.fit()
+    duration = time.perf_counter() - start_time
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Evaluations are in the order of the traces
+    rssqs = [r for t in fitter.traces for r in t.rssqs]
+    time_to_target = None
+    for rssq, evaluation_time in zip(rssqs, function.times):
+        if rssq <= workload.target_rssq:
+            time_to_target = evaluation_time - start_time
+            break
+    return dict(workload=workload.name, chain=chain,
+          num_evaluation=fitter.num_evaluation,
+          duration=duration,
+          evaluations_per_sec=fitter.num_evaluation/duration,
+          time_to_target=time_to_target,
+          peak_memory=peak_memory/MB,
+          rssq=float(fitter.rssq),
+          target_rssq=workload.target_rssq)
+
+def run(workload_names, chains, max_fev, num_import_repeat):
+    """
+    Runs the benchmark.
+
+    Parameters
+    ----------
+    workload_names: list-str (keys of fit_workloads.WORKLOAD_DCT)
+    chains: list-str
+    max_fev: int
+    num_import_repeat: int
+
+    Returns
+    -------
+    dict
+    """
+    results = []
+    for workload_name in workload_names:
+        workload = fit_workloads.WORKLOAD_DCT[workload_name]()
+        for chain in chains:
+            results.append(measure(workload, chain, max_fev))
+    import_result = bench_import.measure(num_repeat=num_import_repeat)
+    return dict(python=platform.python_version(),
+          machine=platform.machine(),
+          max_fev=max_fev,
+          import_time=import_result["median"],
+          results=results)
+
+def compare(base_dct, new_dct):
+    """
+    Calculates the ratios of the measurements of two runs. Ratios larger
+    than 1 are improvements.
+
+    Parameters
+    ----------
+    base_dct: dict (output of run)
+    new_dct: dict (output of run)
+
+    Returns
+    -------
+    dict
+    """
+    def calcRatio(base, new, is_higher_better):
+        if (base is None) or (new is None) or (min(base, new) <= 0):
+            return None
+        if is_higher_better:
+            return new/base
+        return base/new
+    base_results = {(r["workload"], r["chain"]): r
+          for r in base_dct["results"]}
+    comparisons = []
+    for new_result in new_dct["results"]:
+        key = (new_result["workload"], new_result["chain"])
+        if not key in base_results:
+            continue
+        base_result = base_results[key]
+        comparison = dict(workload=key[0], chain=key[1])
+        for metric in HIGHER_BETTER_METRICS + LOWER_BETTER_METRICS:
+            comparison[metric] = calcRatio(base_result[metric],
+                  new_result[metric], metric in HIGHER_BETTER_METRICS)
+        comparisons.append(comparison)
+    return dict(import_time=calcRatio(base_dct["import_time"],
+          new_dct["import_time"], False), comparisons=comparisons)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of fitting")
+    parser.add_argument("--workloads", nargs="+",
+          default=list(fit_workloads.WORKLOAD_DCT.keys()),
+          choices=list(fit_workloads.WORKLOAD_DCT.keys()))
+    parser.add_argument("--chains", nargs="+", default=DEFAULT_CHAINS,
+          help="method names separated by %s" % CHAIN_SEP)
+    parser.add_argument("--max_fev", type=int, default=1000)
+    parser.add_argument("--num_import_repeat", type=int, default=3)
+    parser.add_argument("--output", default=None,
+          help="JSON file for the results (default is stdout)")
+    parser.add_argument("--compare", nargs=2, default=None,
+          metavar=("BASE", "NEW"), help="compare two result files")
+    args = parser.parse_args()
+    if args.compare is None:
+        result = run(args.workloads, args.chains, args.max_fev,
+              args.num_import_repeat)
+    else:
+        with open(args.compare[0], "r") as fd:
+            base_dct = json.load(fd)
+        with open(args.compare[1], "r") as fd:
+            new_dct = json.load(fd)
+        result = compare(base_dct, new_dct)
+    if args.output is None:
+        json.dump(result, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, "w") as fd:
+            json.dump(result, fd, indent=2)
+
+
+if __name__ == '__main__':
+    main()
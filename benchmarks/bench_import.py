@@ -0,0 +1,79 @@
+"""
+Benchmark of the time to import fitterpp.
+
+Each measurement runs in a fresh interpreter. The benchmark fails
+(non-zero exit) if the median time exceeds the threshold or if modules
+that should be loaded lazily are imported.
+
+Usage
+-----
+python benchmarks/bench_import.py --num_repeat 5 --threshold 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAZY_MODULES = ["matplotlib.pyplot", "lhsmdu"]
+SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import fitterpp
+import fitterpp.fitterpp
+duration = time.perf_counter() - start
+lazy_modules = %s
+print(json.dumps({"duration": duration,
+      "loaded": [m for m in lazy_modules if m in sys.modules]}))
+""" % str(LAZY_MODULES)
+
+
+def measure(num_repeat=5):
+    """
+    Measures the import time of fitterpp.
+
+    Parameters
+    ----------
+    num_repeat: int (number of interpreters started)
+
+    Returns
+    -------
+    dict
+        durations: list-float (seconds)
+        median: float (seconds)
+        loaded: list-str (lazy modules that were imported)
+    """
+    durations = []
+    loaded = set()
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([PROJECT_DIR,
+          env.get("PYTHONPATH", "")])
+    for _ in range(num_repeat):
+        output = subprocess.run([sys.executable, "-c", SCRIPT], env=env,
+              check=True, capture_output=True, text=True).stdout
+        dct = json.loads(output.strip().split("\n")[-1])
+        durations.append(dct["duration"])
+        loaded.update(dct["loaded"])
+    return dict(durations=durations, median=statistics.median(durations),
+          loaded=sorted(loaded))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark import of fitterpp")
+    parser.add_argument("--num_repeat", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=None,
+          help="Maximum median import time in seconds")
+    args = parser.parse_args()
+    result = measure(num_repeat=args.num_repeat)
+    print(json.dumps(result, indent=2))
+    is_fail = len(result["loaded"]) > 0
+    if args.threshold is not None:
+        is_fail = is_fail or (result["median"] > args.threshold)
+    sys.exit(1 if is_fail else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark of constructing DFIntersectionFinder for time series data.
+
+The function output has one row per time point. The data have every other
+time point, either sorted or shuffled (which disables the binary search).
+The reference is the list based implementation used before hashing, and
+is only run for small sizes because it is quadratic.
+
+Usage
+-----
+PYTHONPATH=. python benchmarks/bench_intersection.py --sizes 10000 100000 1000000
+"""
+
+from fitterpp.fitterpp import DFIntersectionFinder
+
+import argparse
+import json
+import numpy as np
+import pandas as pd
+import time
+
+COLUMNS = ["a", "b", "c"]
+
+
+def findReference(df, other_df):
+    """
+    Finds the common row and column indices using lists.
+
+    Returns
+    -------
+    np.array-int, np.array-int
+    """
+    indices = list(df.index)
+    other_indices = list(other_df.index)
+    row_idxs = np.array([i for i in range(len(df))
+          if indices[i] in other_indices])
+    columns = list(df.columns)
+    other_columns = list(other_df.columns)
+    column_idxs = np.array([i for i in range(len(df.columns))
+          if columns[i] in other_columns])
+    return row_idxs, column_idxs
+
+
+def measure(size, max_reference_size):
+    """
+    Measures the time to find the intersection of the rows of a
+    function output and data.
+
+    Parameters
+    ----------
+    size: int (number of rows in the function output)
+    max_reference_size: int (largest size for the reference implementation)
+
+    Returns
+    -------
+    dict (seconds)
+    """
+    times = np.arange(size, dtype=float)/10
+    function_df = pd.DataFrame(np.random.rand(size, len(COLUMNS)),
+          index=times, columns=COLUMNS)
+    data_df = function_df.iloc[::2, 1:]
+    shuffled_df = data_df.sample(frac=1.0, random_state=0)
+    result = dict(size=size)
+    for name, df in [("sorted", data_df), ("shuffled", shuffled_df)]:
+        start = time.perf_counter()
+        common = DFIntersectionFinder(df, function_df)
+        result[name] = time.perf_counter() - start
+        if len(common.row_idxs) != len(df):
+            raise RuntimeError("Incorrect intersection.")
+    if size <= max_reference_size:
+        start = time.perf_counter()
+        _ = findReference(data_df, function_df)
+        result["reference"] = time.perf_counter() - start
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+          description="Benchmark of DFIntersectionFinder")
+    parser.add_argument("--sizes", type=int, nargs="+",
+          default=[int(1e4), int(1e5), int(1e6)])
+    parser.add_argument("--max_reference_size", type=int, default=int(1e4))
+    args = parser.parse_args()
+    results = [measure(s, args.max_reference_size) for s in args.sizes]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
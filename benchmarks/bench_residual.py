@@ -0,0 +1,110 @@
+"""
+Micro-benchmark of the overhead of calculating residuals.
+
+The user function returns a precomputed array so that the measurement
+is the overhead of FitterFunction, not the cost of the model. The
+reference is the residual calculation used before the gather indices
+were introduced.
+
+Usage
+-----
+PYTHONPATH=. python benchmarks/bench_residual.py --sizes 1000 10000 100000 1000000
+"""
+
+from fitterpp.fitter_function import FitterFunction
+from fitterpp.function_wrapper import FunctionWrapper
+
+import argparse
+import json
+import lmfit
+import numpy as np
+import time
+
+NUM_COLUMN = 2
+PARAMETER_NAMES = ["a", "b"]
+
+
+def timeCall(function, num_repeat):
+    """
+    Measures the average time of a call.
+
+    Parameters
+    ----------
+    function: Function (no arguments)
+    num_repeat: int
+
+    Returns
+    -------
+    float (microseconds per call)
+    """
+    function()  # Warm up
+    start = time.perf_counter()
+    for _ in range(num_repeat):
+        function()
+    return 1e6*(time.perf_counter() - start)/num_repeat
+
+
+def measure(size, num_repeat=None):
+    """
+    Measures the overhead of residual calculations for a number of
+    observations.
+
+    Parameters
+    ----------
+    size: int (number of observations)
+    num_repeat: int (calls per measurement)
+
+    Returns
+    -------
+    dict (microseconds per call)
+    """
+    if num_repeat is None:
+        num_repeat = max(5, int(1e7//size))
+    output_arr = np.random.rand(size, NUM_COLUMN)
+    def userFunction(is_dataframe=False, **kwargs):
+        return output_arr
+    row_idxs = np.array(range(size))
+    column_idxs = np.array([0])
+    data_arr = np.random.rand(size)
+    gather_idxs = row_idxs*NUM_COLUMN
+    parameters = lmfit.Parameters()
+    for name in PARAMETER_NAMES:
+        parameters.add(name, value=1, min=0, max=10)
+    kw_names = set(PARAMETER_NAMES)
+    # Residual calculation before the gather indices
+    def calcReferenceResiduals():
+        dct  = parameters.valuesdict()
+        diff = kw_names.symmetric_difference(dct.keys())
+        if len(diff) > 0:
+            raise ValueError(diff)
+        function_arr = userFunction(is_dataframe=False, **dct)
+        function_arr = function_arr[:, column_idxs]
+        function_arr = function_arr[row_idxs, :]
+        function_arr = function_arr.flatten()
+        residuals = data_arr - function_arr
+        _ = [isinstance(v, float) for v in residuals.flatten()]
+        return sum(residuals**2)
+    function = FitterFunction(userFunction, PARAMETER_NAMES, data_arr,
+          gather_idxs)
+    def calcResiduals():
+        return FunctionWrapper.calcSSQ(function(parameters))
+    # Check consistency
+    if not np.isclose(calcReferenceResiduals(), calcResiduals()):
+        raise RuntimeError("Inconsistent residuals.")
+    return dict(size=size,
+          reference=timeCall(calcReferenceResiduals, max(1, num_repeat//10)),
+          residuals=timeCall(calcResiduals, num_repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+          description="Benchmark of the overhead of residual calculations")
+    parser.add_argument("--sizes", type=int, nargs="+",
+          default=[int(1e3), int(1e4), int(1e5), int(1e6)])
+    args = parser.parse_args()
+    results = [measure(s) for s in args.sizes]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
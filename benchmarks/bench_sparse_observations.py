@@ -0,0 +1,143 @@
+"""
+Benchmark of observation aware user functions (is_observation_aware)
+for data that are sparse in the output of the model.
+
+The model is a two compartment ODE simulated on a grid of num_step times,
+of which num_observation are in the data. The full model reports every
+time of the grid, and Fitterpp discards the times that are not observed.
+The observation aware model is told the observed times, and reports only
+these. Reported are the time of an evaluation of the residuals and the
+time of a fit.
+
+Usage
+-----
+PYTHONPATH=. python benchmarks/bench_sparse_observations.py --num_step 10000 --num_observation 12
+"""
+
+import fitterpp.constants as cn
+from fitterpp.fitterpp import Fitterpp
+
+import argparse
+import json
+import lmfit
+import numpy as np
+import pandas as pd
+import scipy.integrate
+import time
+
+COLUMNS = ["central", "peripheral"]
+END_TIME = 24
+SEED = 0
+TRUE_DCT = dict(k12=0.3, k21=0.1, kel=0.2)
+
+
+class TwoCompartmentModel():
+    # Amounts in a central and a peripheral compartment after a dose in
+    # the central compartment. Reports the amounts at times.
+
+    def __init__(self, times):
+        """
+        Parameters
+        ----------
+        times: np.array (times that are reported)
+        """
+        self.times = np.array(times)
+
+    def setObservations(self, index, columns):
+        self.times = np.array(index)
+
+    def __call__(self, k12=0.1, k21=0.1, kel=0.1, is_dataframe=True):
+        def calcDerivatives(_, amounts):
+            central, peripheral = amounts
+            return [-(k12 + kel)*central + k21*peripheral,
+                  k12*central - k21*peripheral]
+        result = scipy.integrate.solve_ivp(calcDerivatives,
+              (0, END_TIME), [1, 0], t_eval=self.times, rtol=1e-8, atol=1e-10)
+        arr = result.y.T
+        if is_dataframe:
+            return pd.DataFrame(arr, index=self.times, columns=COLUMNS)
+        return arr
+
+
+def timeCall(function, num_repeat):
+    """
+    Measures the average time of a call.
+
+    Parameters
+    ----------
+    function: Function (no arguments)
+    num_repeat: int
+
+    Returns
+    -------
+    float (milliseconds per call)
+    """
+    function()  # Warm up
+    start = time.perf_counter()
+    for _ in range(num_repeat):
+        function()
+    return 1e3*(time.perf_counter() - start)/num_repeat
+
+
+def measure(num_step, num_observation, num_repeat=20):
+    """
+    Compares a full model with an observation aware model.
+
+    Parameters
+    ----------
+    num_step: int (times simulated by the full model)
+    num_observation: int (times in the data)
+    num_repeat: int (evaluations measured)
+
+    Returns
+    -------
+    dict (milliseconds)
+    """
+    grid = np.linspace(0, END_TIME, num_step)
+    rng = np.random.default_rng(SEED)
+    observed_times = grid[np.sort(rng.choice(num_step, num_observation,
+          replace=False))]
+    true_df = TwoCompartmentModel(observed_times)(**TRUE_DCT)
+    data_df = true_df + rng.normal(0, 0.001, true_df.shape)
+    parameters = lmfit.Parameters()
+    for name in TRUE_DCT.keys():
+        parameters.add(name, value=0.5, min=0.01, max=2)
+    methods = Fitterpp.mkFitterppMethod(method_names=[cn.METHOD_LEASTSQ],
+          max_fev=500)
+    def mkFitter(is_observation_aware):
+        return Fitterpp(TwoCompartmentModel(grid), parameters, data_df,
+              method_names=methods, is_observation_aware=is_observation_aware)
+    full_fitter = mkFitter(False)
+    aware_fitter = mkFitter(True)
+    # Check consistency
+    if not np.allclose(full_fitter.function(parameters),
+          aware_fitter.function(parameters), atol=1e-6):
+        raise RuntimeError("Inconsistent residuals.")
+    result = dict(num_step=num_step, num_observation=num_observation)
+    for name, fitter in [("full", full_fitter), ("aware", aware_fitter)]:
+        result["%s_evaluate" % name] = timeCall(
+              lambda: fitter.function(parameters), num_repeat)
+        start = time.perf_counter()
+        fitter.fit()
+        result["%s_fit" % name] = 1e3*(time.perf_counter() - start)
+        result["%s_rssq" % name] = fitter.rssq
+    result["evaluate_speedup"] = result["full_evaluate"]  \
+          /result["aware_evaluate"]
+    result["fit_speedup"] = result["full_fit"]/result["aware_fit"]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+          description="Benchmark of observation aware user functions")
+    parser.add_argument("--num_step", type=int, default=10000)
+    parser.add_argument("--num_observation", type=int, default=12)
+    parser.add_argument("--num_repeat", type=int, default=20)
+    args = parser.parse_args()
+    result = measure(args.num_step, args.num_observation,
+          num_repeat=args.num_repeat)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+"""
+Workloads for benchmarking fits.
+
+A workload is a fitting problem with known parameters. The data are
+created by the model at the true parameters plus noise from a seeded
+generator, so a workload is the same in every run. The target residual
+sum of squares is slightly above the residual sum of squares at the
+true parameters.
+
+The models return a DataFrame if is_dataframe is True and otherwise the
+values of the DataFrame (2d array).
+"""
+
+import collections
+import lmfit
+import numpy as np
+import pandas as pd
+
+SEED = 0
+TARGET_FACTOR = 1.1  # Target rssq relative to the rssq at the true parameters
+Y = "y"
+
+# Fitting problem
+#   name: str
+#   user_function: Function (see Fitterpp)
+#   initial_params: lmfit.Parameters
+#   data_df: pd.DataFrame
+#   target_rssq: float
+Workload = collections.namedtuple("Workload",
+      ["name", "user_function", "initial_params", "data_df", "target_rssq"])
+
+
+def _mkWorkload(name, user_function, true_dct, bound_dct, noise_std,
+      initial_fraction=0.5):
+    """
+    Creates a workload for a model.
+
+    Parameters
+    ----------
+    name: str
+    user_function: Function (see Fitterpp)
+    true_dct: dict (key: parameter, value: true value)
+    bound_dct: dict (key: parameter, value: (min, max))
+    noise_std: float (standard deviation of the noise in the data)
+    initial_fraction: float (initial value relative to the bounds)
+
+    Returns
+    -------
+    Workload
+    """
+    rng = np.random.default_rng(SEED)
+    true_df = user_function(is_dataframe=True, **true_dct)
+    data_df = true_df + rng.normal(0, noise_std, true_df.shape)
+    initial_params = lmfit.Parameters()
+    for parameter_name, (min_value, max_value) in bound_dct.items():
+        initial_params.add(parameter_name, min=min_value, max=max_value,
+              value=min_value + initial_fraction*(max_value - min_value))
+    residuals_arr = data_df.values - true_df.values
+    target_rssq = TARGET_FACTOR*float(np.sum(residuals_arr**2))
+    return Workload(name=name, user_function=user_function,
+          initial_params=initial_params, data_df=data_df,
+          target_rssq=target_rssq)
+
+def _toOutput(arr, index, is_dataframe):
+    """
+    Provides the output of a model with one variable.
+
+    Parameters
+    ----------
+    arr: np.array (1d)
+    index: array
+    is_dataframe: bool
+
+    Returns
+    -------
+    pd.DataFrame/np.array (2d)
+    """
+    if is_dataframe:
+        return pd.DataFrame({Y: arr}, index=index)
+    return np.reshape(arr, (-1, 1))
+
+
+############### PARABOLA #################
+class Parabola():
+    # mult*(x - center)**2 evaluated at size points
+
+    def __init__(self, size):
+        self.xvalues = np.linspace(0, 20, size)
+
+    def __call__(self, center=0, mult=1, is_dataframe=True):
+        arr = mult*(self.xvalues - center)**2
+        return _toOutput(arr, self.xvalues, is_dataframe)
+
+def mkParabola(size=10000):
+    return _mkWorkload("parabola_%d" % size, Parabola(size),
+          dict(center=10, mult=2), dict(center=(0, 20), mult=(0, 20)),
+          noise_std=1.0)
+
+
+############### MULTI-EXPONENTIAL DECAY #################
+class MultiExponential():
+    # Sum of amplitude_i*exp(-rate_i*t)
+
+    def __init__(self, num_term, size):
+        self.num_term = num_term
+        self.times = np.linspace(0, 10, size)
+
+    def __call__(self, is_dataframe=True, **kwargs):
+        arr = np.zeros(len(self.times))
+        for idx in range(self.num_term):
+            arr += kwargs["amplitude%d" % idx]  \
+                  *np.exp(-kwargs["rate%d" % idx]*self.times)
+        return _toOutput(arr, self.times, is_dataframe)
+
+def mkMultiExponential(num_term=3, size=1000):
+    true_dct = {}
+    bound_dct = {}
+    for idx in range(num_term):
+        true_dct["amplitude%d" % idx] = 1.0 + idx
+        true_dct["rate%d" % idx] = 0.2*4**idx
+        bound_dct["amplitude%d" % idx] = (0, 10)
+        bound_dct["rate%d" % idx] = (0, 20)
+    return _mkWorkload("multi_exponential_%d" % num_term,
+          MultiExponential(num_term, size), true_dct, bound_dct,
+          noise_std=0.01)
+
+
+############### STIFF ODE #################
+class StiffODE():
+    # Robertson chemical kinetics. A -> B (k1), 2B -> B + C (k2),
+    # B + C -> A + C (k3). The rate constants differ by orders of magnitude,
+    # so the system is stiff. Parameters are log10 of the rate constants.
+    # The output is the concentration of A and C.
+
+    def __init__(self, size):
+        self.times = np.logspace(-2, 3, size)
+
+    def __call__(self, log_k1=0, log_k2=0, log_k3=0, is_dataframe=True):
+        import scipy.integrate
+        k1, k2, k3 = 10**log_k1, 10**log_k2, 10**log_k3
+        def calcDerivatives(_, state):
+            a, b, c = state
+            return [-k1*a + k3*b*c, k1*a - k2*b*b - k3*b*c, k2*b*b]
+        result = scipy.integrate.solve_ivp(calcDerivatives,
+              (0, self.times[-1]), [1, 0, 0], method="BDF",
+              t_eval=self.times, rtol=1e-6, atol=1e-10)
+        arr = np.zeros((len(self.times), 2))
+        if result.success:
+            arr = result.y[[0, 2], :].T
+        if is_dataframe:
+            return pd.DataFrame(arr, columns=["A", "C"], index=self.times)
+        return arr
+
+def mkStiffODE(size=50):
+    return _mkWorkload("stiff_ode", StiffODE(size),
+          dict(log_k1=np.log10(0.04), log_k2=np.log10(3e7),
+          log_k3=np.log10(1e4)),
+          dict(log_k1=(-3, 0), log_k2=(5, 9), log_k3=(2, 6)),
+          noise_std=1e-3)
+
+
+############### LINEAR MODEL #################
+class LinearModel():
+    # Design matrix times the parameters
+
+    def __init__(self, num_parameter, size):
+        rng = np.random.default_rng(SEED)
+        self.design_arr = rng.normal(0, 1, (size, num_parameter))
+        self.parameter_names = ["p%d" % n for n in range(num_parameter)]
+
+    def __call__(self, is_dataframe=True, **kwargs):
+        values = np.array([kwargs[n] for n in self.parameter_names])
+        arr = np.matmul(self.design_arr, values)
+        return _toOutput(arr, range(len(arr)), is_dataframe)
+
+def mkLinearModel(num_parameter=100, size=500):
+    model = LinearModel(num_parameter, size)
+    rng = np.random.default_rng(SEED + 1)
+    true_dct = {n: v for n, v in zip(model.parameter_names,
+          rng.uniform(-1, 1, num_parameter))}
+    bound_dct = {n: (-2, 2) for n in model.parameter_names}
+    return _mkWorkload("linear_%d" % num_parameter, model, true_dct,
+          bound_dct, noise_std=0.1)
+
+
+############### LARGE DATA #################
+def mkLargeData(size=1000000):
+    workload = mkParabola(size=size)
+    return workload._replace(name="large_data_%d" % size)
+
+
+WORKLOAD_DCT = {
+      "parabola": mkParabola,
+      "multi_exponential": mkMultiExponential,
+      "stiff_ode": mkStiffODE,
+      "linear": mkLinearModel,
+      "large_data": mkLargeData,
+      }
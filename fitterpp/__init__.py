@@ -2,5 +2,10 @@ from fitterpp.constants import METHOD_LEASTSQ, \
     METHOD_DIFFERENTIAL_EVOLUTION,  \
     METHOD_BOTH, METHOD_FITTER_DEFAULTS, MAX_NFEV
 from fitterpp.fitterpp import Fitterpp
+from fitterpp.fitterpp_batch import FitterppBatch
+from fitterpp.evaluation_cache import EvaluationCache
+from fitterpp.result_store import ResultStore
+from fitterpp.convergence import WindowConvergence, TargetConvergence
+from fitterpp.mapped_data import MappedData
 from fitterpp.util import dictToParameters
 from fitterpp import constants
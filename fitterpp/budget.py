@@ -0,0 +1,122 @@
+"""Budget of function evaluations and wall clock time for a fit."""
+
+import numpy as np
+import time
+
+
+class FitBudget():
+    # Limits the evaluations of the user function and the time of a fit.
+    # The budget is divided among the remaining parts (starts or methods)
+    # as they begin, so that parts that use less than their share leave
+    # more for later parts. The share of time is converted to evaluations
+    # using the measured time per evaluation. A budget is a small object
+    # that can be sent to worker processes; the deadline is a time.time().
+
+    def __init__(self, max_evaluation=None, max_duration=None, deadline=None,
+          seconds_per_evaluation=None):
+        """
+        Parameters
+        ----------
+        max_evaluation: int (maximum number of evaluations)
+        max_duration: float (maximum seconds from the creation of the budget)
+        deadline: float (time.time() by which the fit ends)
+        seconds_per_evaluation: float (cost used before it is measured)
+        """
+        self.max_evaluation = max_evaluation
+        self.deadline = deadline
+        if max_duration is not None:
+            end_time = time.time() + max_duration
+            if (self.deadline is None) or (end_time < self.deadline):
+                self.deadline = end_time
+        # Usage
+        self.num_evaluation = 0
+        self.duration = 0.0  # Seconds of the parts with evaluations
+        self._seconds_per_evaluation = seconds_per_evaluation
+
+    @property
+    def seconds_per_evaluation(self):
+        if self.num_evaluation == 0:
+            return self._seconds_per_evaluation
+        return self.duration/self.num_evaluation
+
+    def add(self, num_evaluation, duration):
+        """
+        Records the use of the budget by a part.
+
+        Parameters
+        ----------
+        num_evaluation: int
+        duration: float (seconds)
+        """
+        self.num_evaluation += num_evaluation
+        self.duration += duration
+
+    def isExhausted(self, num_evaluation=0):
+        """
+        Determines if the budget is used.
+
+        Parameters
+        ----------
+        num_evaluation: int (evaluations of a part that is running)
+
+        Returns
+        -------
+        bool
+        """
+        if (self.deadline is not None) and (time.time() >= self.deadline):
+            return True
+        if self.max_evaluation is None:
+            return False
+        return self.num_evaluation + num_evaluation >= self.max_evaluation
+
+    def allocate(self, num_part, is_time_sliced=True):
+        """
+        Calculates the evaluations of the next of num_part parts.
+
+        Parameters
+        ----------
+        num_part: int (parts that remain, including the next part)
+        is_time_sliced: bool (see makePart)
+
+        Returns
+        -------
+        int (None if evaluations are not limited)
+        """
+        num_part = max(1, num_part)
+        allocations = []
+        if self.max_evaluation is not None:
+            allocations.append(
+                  (self.max_evaluation - self.num_evaluation)/num_part)
+        cost = self.seconds_per_evaluation
+        if (self.deadline is not None) and (cost is not None) and (cost > 0):
+            remaining_time = max(0.0, self.deadline - time.time())
+            if is_time_sliced:
+                remaining_time = remaining_time/num_part
+            allocations.append(remaining_time/cost)
+        if len(allocations) == 0:
+            return None
+        return max(1, int(np.floor(min(allocations))))
+
+    def makePart(self, num_part, is_time_sliced=True):
+        """
+        Creates the budget of the next of num_part parts.
+
+        Parameters
+        ----------
+        num_part: int (parts that remain, including the next part)
+        is_time_sliced: bool
+            the part has its share of the remaining time; otherwise,
+            it has the deadline of this budget (parts run concurrently)
+
+        Returns
+        -------
+        FitBudget
+        """
+        deadline = self.deadline
+        if is_time_sliced and (deadline is not None):
+            now = time.time()
+            deadline = now + max(0.0, deadline - now)/max(1, num_part)
+        return FitBudget(max_evaluation=self.allocate(num_part,
+              is_time_sliced=is_time_sliced),
+              deadline=deadline,
+              seconds_per_evaluation=self.seconds_per_evaluation)
@@ -0,0 +1,154 @@
+"""Checkpoint of the starts completed in a multistart fit.
+
+The file is text with one JSON record per line. The first line has the
+parameter names and the initial values of the starts. A line is appended
+for each completed start with its best parameter values, rssq and counts
+of evaluations, so that writing a start does not rewrite the file. A last
+line that is incomplete (e.g., the fit was preempted while writing) is
+ignored when the file is read.
+"""
+
+import collections
+import json
+import numpy as np
+import os
+
+VERSION = 2
+# Summary of a completed start
+#   values: list-float (best parameter values; None if the start failed)
+#   rssq: float
+#   num_evaluation: int
+#   cache_stats: list-(int, int) ((hits, misses) for each method)
+StartResult = collections.namedtuple("StartResult",
+      ["values", "rssq", "num_evaluation", "cache_stats"])
+
+
+class Checkpoint():
+    # Saves the initial values of the starts of a fit and a StartResult
+    # for each completed start.
+
+    def __init__(self, path, parameter_names, initial_arr):
+        """
+        Parameters
+        ----------
+        path: str (path of the checkpoint file)
+        parameter_names: list-str
+        initial_arr: np.array (row is a start; column is a parameter)
+        """
+        self.path = path
+        self.parameter_names = list(parameter_names)
+        self.initial_arr = np.array(initial_arr, dtype=float)
+        self.results = {}  # key: index of start, value: StartResult
+        # The file read had an incomplete last line
+        self.is_truncated = False
+
+    @property
+    def best_result(self):
+        """
+        Returns the completed start with the smallest rssq.
+
+        Returns
+        -------
+        StartResult (None if no start is completed)
+        """
+        if len(self.results) == 0:
+            return None
+        return min(self.results.values(), key=lambda r: r.rssq)
+
+    @staticmethod
+    def makeStartResult(result):
+        """
+        Summarizes the result of a start.
+
+        Parameters
+        ----------
+        result: FitterResult
+
+        Returns
+        -------
+        StartResult
+        """
+        values = None
+        if result.prm is not None:
+            values = [float(v) for v in result.prm.valuesdict().values()]
+        return StartResult(values=values, rssq=float(result.rssq),
+              num_evaluation=int(result.num_evaluation),
+              cache_stats=[(int(h), int(m)) for h, m in result.cache_stats])
+
+    def addResult(self, idx, result):
+        """
+        Records a completed start and appends it to the checkpoint file.
+
+        Parameters
+        ----------
+        idx: int (index of the start)
+        result: FitterResult/StartResult
+        """
+        if not isinstance(result, StartResult):
+            result = self.makeStartResult(result)
+        self.results[idx] = result
+        with open(self.path, "a") as fd:
+            fd.write(self._makeLine(idx, result))
+            fd.flush()
+            os.fsync(fd.fileno())
+
+    @staticmethod
+    def _makeLine(idx, result):
+        dct = dict(result._asdict(), start=idx)
+        return json.dumps(dct) + "\n"
+
+    def write(self):
+        """
+        Writes the checkpoint file atomically.
+        """
+        header = dict(version=VERSION, parameter_names=self.parameter_names,
+              initial_arr=self.initial_arr.tolist())
+        tmp_path = "%s.%d.tmp" % (self.path, os.getpid())
+        with open(tmp_path, "w") as fd:
+            fd.write(json.dumps(header) + "\n")
+            for idx in sorted(self.results.keys()):
+                fd.write(self._makeLine(idx, self.results[idx]))
+        os.replace(tmp_path, self.path)
+
+    @classmethod
+    def read(cls, path):
+        """
+        Reads a checkpoint file.
+
+        Parameters
+        ----------
+        path: str
+
+        Returns
+        -------
+        Checkpoint (None if there is no file)
+        """
+        if not os.path.isfile(path):
+            return None
+        try:
+            with open(path, "r") as fd:
+                lines = fd.read().split("\n")
+            header = json.loads(lines[0])
+        except ValueError:
+            raise ValueError("%s is not a checkpoint file." % path)
+        if header.get("version", None) != VERSION:
+            raise ValueError("Checkpoint %s has version %s, not %s."
+                  % (path, header.get("version", None), VERSION))
+        checkpoint = cls(path, header["parameter_names"],
+              header["initial_arr"])
+        for line_idx, line in enumerate(lines[1:]):
+            if len(line) == 0:
+                continue
+            try:
+                dct = json.loads(line)
+            except ValueError:
+                if line_idx == len(lines) - 2:
+                    # Incomplete last line
+                    checkpoint.is_truncated = True
+                    break
+                raise ValueError("Checkpoint %s has an invalid line %d."
+                      % (path, line_idx + 2))
+            idx = dct.pop("start")
+            dct["cache_stats"] = [tuple(v) for v in dct["cache_stats"]]
+            checkpoint.results[idx] = StartResult(**dct)
+        return checkpoint
@@ -14,14 +14,57 @@ ALL = "#all#"  # Model for all parameters
 METHOD_DIFFERENTIAL_EVOLUTION = "differential_evolution"
 METHOD_BOTH = "both"
 METHOD_LEASTSQ = "leastsq"
+METHOD_LEAST_SQUARES = "least_squares"
 METHOD_FITTER_DEFAULTS = [METHOD_DIFFERENTIAL_EVOLUTION, METHOD_LEASTSQ]
 METHOD_BOOTSTRAP_DEFAULTS = [METHOD_DIFFERENTIAL_EVOLUTION]
 ROW_KEY = "row_key"
 #
 MAX_NFEV_DFT = 1000
 MAX_NFEV = "max_nfev"
+#  Keyword arguments for jacobians
+DFUN = "Dfun"  # leastsq
+JAC = "jac"  # least_squares
+JACOBIAN_KWARGS = {METHOD_LEASTSQ: DFUN, METHOD_LEAST_SQUARES: JAC}
+#  Calculation of jacobians
+JACOBIAN_USER = "user"  # Function provided by the user
+JACOBIAN_BATCH = "batch"  # Finite differences in one batch
+JACOBIAN_THREAD = "thread"  # Finite differences in a thread pool
+JACOBIAN_PROCESS = "process"  # Finite differences in a process pool
+JACOBIAN_MODES = [JACOBIAN_USER, JACOBIAN_BATCH, JACOBIAN_THREAD,
+      JACOBIAN_PROCESS]
 #
 SEC_TO_MS = 1000
+# Screening of latin cube points
+SCREEN_BATCH_SIZE = 1000  # Candidates evaluated in one batch
+RSSQ = "rssq"
+IS_STARTED = "is_started"
+# Phases timed by PhaseTimer
+PHASE_START = "start_generation"  # Constructing the initial parameters
+PHASE_USER_FUNCTION = "user_function"  # Calls to the user function
+PHASE_RESIDUAL = "residual"  # Gathering the residuals from the output
+PHASE_PARAMETERS = "parameters"  # Copying and converting lmfit.Parameters
+PHASE_MINIMIZER = "minimizer"  # Remaining time of the method (lmfit, scipy)
+PHASE_TOTAL = "total"  # Time of a method or a fit
+PHASES_MEASURED = [PHASE_USER_FUNCTION, PHASE_RESIDUAL, PHASE_PARAMETERS]
+PHASES = [PHASE_START] + PHASES_MEASURED + [PHASE_MINIMIZER, PHASE_TOTAL]
+# Columns of timing DataFrames
+START = "start"
+METHOD = "method"
+PHASE = "phase"
+SECONDS = "seconds"
+COUNT = "count"
+# Columns of FitterppBatch results
+DATASET = "dataset"
+DURATION = "duration"
+NUM_EVALUATION = "num_evaluation"
+# Generators of the initial values of starts
+SAMPLER_LHS = "lhs"  # Latin hypercube
+SAMPLER_MAXIMIN = "maximin"  # Latin hypercube with spread out points
+SAMPLER_SOBOL = "sobol"  # Scrambled Sobol sequence
+SAMPLER_HALTON = "halton"  # Scrambled Halton sequence
+SAMPLER_LHSMDU = "lhsmdu"  # lhsmdu package (quadratic in the samples)
+SAMPLERS = [SAMPLER_LHS, SAMPLER_MAXIMIN, SAMPLER_SOBOL, SAMPLER_HALTON,
+      SAMPLER_LHSMDU]
 
 # Miscellaneous
 VALUE_SEP = "--"
@@ -29,3 +72,6 @@ VALUE_SEP = "--"
 # File paths
 PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(PROJECT_DIR, "data")
+# Per-user cache of values computed on demand (e.g., CPU calibration)
+CACHE_DIR = os.environ.get("FITTERPP_CACHE_DIR",
+      os.path.join(os.path.expanduser("~"), ".fitterpp"))
@@ -0,0 +1,105 @@
+"""Convergence tests that stop a method when it stops making progress.
+
+A convergence test is given the number of evaluations of the method and
+the smallest rssq found by the method after each iteration. A method is
+stopped when any of its tests has converged, and the best parameters
+found are used by the next method. A test is copied and reset for each
+run of a method, so the same test can be used by many methods and starts.
+"""
+
+import collections
+import copy
+
+
+class Convergence():
+    # Base class of convergence tests
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+        Prepares for a new run of a method.
+        """
+        self.is_converged = False
+
+    def _check(self, num_evaluation, rssq):
+        raise NotImplementedError("Must override.")
+
+    def update(self, num_evaluation, rssq):
+        """
+        Records the progress of the method.
+
+        Parameters
+        ----------
+        num_evaluation: int (evaluations by the method)
+        rssq: float (smallest residual sum of squares of the method)
+
+        Returns
+        -------
+        bool (the method has converged)
+        """
+        if not self.is_converged:
+            self.is_converged = self._check(num_evaluation, rssq)
+        return self.is_converged
+
+    def copy(self):
+        """
+        Creates a reset copy of the test.
+
+        Returns
+        -------
+        Convergence
+        """
+        new_convergence = copy.deepcopy(self)
+        new_convergence.reset()
+        return new_convergence
+
+
+class WindowConvergence(Convergence):
+    # Converged if the relative improvement in rssq over the last window
+    # evaluations is less than tolerance.
+
+    def __init__(self, window=100, tolerance=1e-4):
+        """
+        Parameters
+        ----------
+        window: int (evaluations over which improvement is measured)
+        tolerance: float (relative improvement that continues the method)
+        """
+        self.window = window
+        self.tolerance = tolerance
+        super().__init__()
+
+    def reset(self):
+        super().reset()
+        # (num_evaluation, rssq) within the window
+        self._history = collections.deque()
+
+    def _check(self, num_evaluation, rssq):
+        self._history.append((num_evaluation, rssq))
+        # Keep the newest entry that is at least window evaluations old
+        while (len(self._history) > 1)  \
+              and (self._history[1][0] <= num_evaluation - self.window):
+            _ = self._history.popleft()
+        old_num_evaluation, old_rssq = self._history[0]
+        if num_evaluation - old_num_evaluation < self.window:
+            return False
+        improvement = old_rssq - rssq
+        return improvement <= self.tolerance*abs(old_rssq)
+
+
+class TargetConvergence(Convergence):
+    # Converged if rssq is at most target_rssq.
+
+    def __init__(self, target_rssq):
+        """
+        Parameters
+        ----------
+        target_rssq: float
+        """
+        self.target_rssq = target_rssq
+        super().__init__()
+
+    def _check(self, num_evaluation, rssq):
+        return rssq <= self.target_rssq
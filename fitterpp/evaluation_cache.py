@@ -0,0 +1,134 @@
+"""Bounded cache of function evaluations keyed on parameter values."""
+
+import collections
+import numpy as np
+import threading
+
+
+class EvaluationCache():
+    # Least recently used cache of the residuals calculated for parameter
+    # values. Parameter values can be quantized so that values that differ
+    # by less than the quantum share an entry. The cache is bounded by
+    # the number of entries and (optionally) the bytes of the entries.
+    #
+    # A cache should only be used for one user function and data. When
+    # starts are fit in worker processes, each process has its own copy.
+
+    def __init__(self, max_entry=10000, max_byte=None, quantum=None):
+        """
+        Parameters
+        ----------
+        max_entry: int (maximum number of entries)
+        max_byte: int (maximum bytes of residuals and keys)
+        quantum: float/np.array (parameter values are rounded to a multiple)
+        """
+        self.max_entry = max_entry
+        self.max_byte = max_byte
+        self.quantum = quantum
+        if self.quantum is not None:
+            self.quantum = np.asarray(quantum, dtype=float)
+        # Statistics
+        self.num_hit = 0
+        self.num_miss = 0
+        self.num_evict = 0
+        self.num_byte = 0
+        #
+        self._dct = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._dct)
+
+    def makeEmptyCopy(self):
+        """
+        Creates an empty cache with the same limits (e.g., for a fit of
+        other data).
+
+        Returns
+        -------
+        EvaluationCache
+        """
+        return EvaluationCache(max_entry=self.max_entry,
+              max_byte=self.max_byte, quantum=self.quantum)
+
+    def makeKey(self, values):
+        """
+        Creates the key for parameter values.
+
+        Parameters
+        ----------
+        values: iterable-float (parameter values in a fixed order)
+
+        Returns
+        -------
+        bytes
+        """
+        arr = np.asarray(values, dtype=float)
+        if self.quantum is not None:
+            arr = np.round(arr/self.quantum)
+        return arr.tobytes()
+
+    def get(self, key):
+        """
+        Finds the residuals for a key.
+
+        Parameters
+        ----------
+        key: bytes
+
+        Returns
+        -------
+        np.array (copy of the residuals) or None if not present
+        """
+        with self._lock:
+            residuals = self._dct.get(key, None)
+            if residuals is None:
+                self.num_miss += 1
+                return None
+            self._dct.move_to_end(key)
+            self.num_hit += 1
+        return residuals.copy()
+
+    def put(self, key, residuals):
+        """
+        Saves the residuals for a key. Evicts least recently used entries
+        to stay within the bounds.
+
+        Parameters
+        ----------
+        key: bytes
+        residuals: np.array
+        """
+        residuals = np.array(residuals, dtype=float)
+        with self._lock:
+            if key in self._dct:
+                return
+            self._dct[key] = residuals
+            self.num_byte += residuals.nbytes + len(key)
+            while (len(self._dct) > self.max_entry) or  \
+                  ((self.max_byte is not None)
+                  and (self.num_byte > self.max_byte)
+                  and (len(self._dct) > 0)):
+                old_key, old_residuals = self._dct.popitem(last=False)
+                self.num_byte -= old_residuals.nbytes + len(old_key)
+                self.num_evict += 1
+
+    def clear(self):
+        """
+        Removes all entries and statistics.
+        """
+        with self._lock:
+            self._dct.clear()
+            self.num_byte = 0
+            self.num_hit = 0
+            self.num_miss = 0
+            self.num_evict = 0
@@ -0,0 +1,253 @@
+"""Compact record of the evaluations done in a fit."""
+
+import numpy as np
+import os
+import uuid
+
+DURATION = "duration"
+RSSQ = "rssq"
+INITIAL_CAPACITY = 256
+SPILL_FILE = "trace_%s_%d.npy"
+
+
+class EvaluationTrace():
+    # Records the duration, residual sum of squares and parameter values of
+    # each evaluation in preallocated arrays. Column 0 is the duration,
+    # column 1 is the rssq, and the remaining columns are the parameters
+    # in the order of parameter_names. Arrays are in column major order so
+    # that a column is a contiguous view.
+    #
+    # If max_entry is None, the arrays grow by doubling. Otherwise, at most
+    # max_entry evaluations are kept in memory, and a full chunk is written
+    # to a .npy file in spill_dir that is read back memory mapped.
+    # Spill files are owned by the trace and removed by clear().
+
+    def __init__(self, max_entry=None, spill_dir=None):
+        """
+        Parameters
+        ----------
+        max_entry: int (maximum evaluations kept in memory)
+        spill_dir: str (directory of chunks written when max_entry is reached)
+        """
+        if (max_entry is not None) and (spill_dir is None):
+            raise ValueError("max_entry requires a spill_dir.")
+        if (max_entry is not None) and (max_entry < 1):
+            raise ValueError("max_entry must be positive.")
+        self.max_entry = max_entry
+        self.spill_dir = spill_dir
+        self.parameter_names = None  # Set on the first record
+        self.spill_paths = []
+        self._arr = None  # In memory chunk
+        self._num_memory = 0  # Rows used in _arr
+        self._num_spill = 0  # Rows in spill files
+        self._name = uuid.uuid4().hex
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        if self._arr is not None:
+            # Only send the rows used
+            state["_arr"] = np.asfortranarray(self._arr[:self._num_memory])
+        return state
+
+    def __len__(self):
+        return self._num_spill + self._num_memory
+
+    @property
+    def columns(self):
+        if self.parameter_names is None:
+            return [DURATION, RSSQ]
+        return [DURATION, RSSQ] + self.parameter_names
+
+    def _allocate(self, parameter_names):
+        self.parameter_names = list(parameter_names)
+        capacity = INITIAL_CAPACITY
+        if self.max_entry is not None:
+            capacity = min(capacity, self.max_entry)
+        self._arr = np.empty((capacity, len(self.columns)), order="F")
+
+    def _reserve(self, num_row):
+        """
+        Makes room in memory for num_row more rows, spilling if needed.
+
+        Parameters
+        ----------
+        num_row: int
+
+        Returns
+        -------
+        int (number of rows that can be written, at least 1)
+        """
+        if (self.max_entry is not None)  \
+              and (self._num_memory == self.max_entry):
+            self._spill()
+        capacity = len(self._arr)
+        if self._num_memory + num_row > capacity:
+            if self.max_entry is None:
+                new_capacity = max(2*capacity, self._num_memory + num_row)
+            else:
+                new_capacity = min(self.max_entry,
+                      max(2*capacity, self._num_memory + num_row))
+            if new_capacity > capacity:
+                arr = np.empty((new_capacity, len(self.columns)), order="F")
+                arr[:self._num_memory] = self._arr[:self._num_memory]
+                self._arr = arr
+        return min(num_row, len(self._arr) - self._num_memory)
+
+    def _spill(self):
+        """
+        Writes the in-memory rows to a file.
+        """
+        os.makedirs(self.spill_dir, exist_ok=True)
+        path = os.path.join(self.spill_dir,
+              SPILL_FILE % (self._name, len(self.spill_paths)))
+        np.save(path, self._arr[:self._num_memory])
+        self.spill_paths.append(path)
+        self._num_spill += self._num_memory
+        self._num_memory = 0
+
+    def append(self, values, rssq, duration):
+        """
+        Records one evaluation.
+
+        Parameters
+        ----------
+        values: dict (key: parameter name, value: float)
+        rssq: float
+        duration: float
+        """
+        if self._arr is None:
+            self._allocate(values.keys())
+        _ = self._reserve(1)
+        row = self._arr[self._num_memory]
+        row[0] = duration
+        row[1] = rssq
+        row[2:] = list(values.values())
+        self._num_memory += 1
+
+    def extend(self, parameter_names, parameter_arr, rssqs, durations):
+        """
+        Records many evaluations.
+
+        Parameters
+        ----------
+        parameter_names: list-str (columns of parameter_arr)
+        parameter_arr: np.array (2d; row is an evaluation)
+        rssqs: np.array
+        durations: np.array/float
+        """
+        if self._arr is None:
+            self._allocate(parameter_names)
+        num_row = len(rssqs)
+        durations = np.broadcast_to(durations, (num_row,))
+        pos = 0
+        while pos < num_row:
+            num = self._reserve(num_row - pos)
+            rows = slice(self._num_memory, self._num_memory + num)
+            self._arr[rows, 0] = durations[pos:pos + num]
+            self._arr[rows, 1] = rssqs[pos:pos + num]
+            self._arr[rows, 2:] = parameter_arr[pos:pos + num]
+            self._num_memory += num
+            pos += num
+
+    def iterChunks(self):
+        """
+        Provides the recorded evaluations without copying. Spilled chunks
+        are memory mapped.
+
+        Returns
+        -------
+        iterator-np.array (2d, read only; columns are self.columns)
+        """
+        for path in self.spill_paths:
+            yield np.load(path, mmap_mode="r")
+        if self._num_memory > 0:
+            arr = self._arr[:self._num_memory]
+            arr.flags.writeable = False
+            yield arr
+
+    def iterColumn(self, column):
+        """
+        Provides a column of the recorded evaluations without copying.
+
+        Parameters
+        ----------
+        column: str (in self.columns)
+
+        Returns
+        -------
+        iterator-np.array (1d, read only)
+        """
+        idx = self.columns.index(column)
+        for arr in self.iterChunks():
+            yield arr[:, idx]
+
+    def getColumn(self, column):
+        """
+        Provides a column of the recorded evaluations. The array is a view
+        if nothing has been spilled.
+
+        Parameters
+        ----------
+        column: str (in self.columns)
+
+        Returns
+        -------
+        np.array (1d, read only)
+        """
+        arrs = list(self.iterColumn(column))
+        if len(arrs) == 0:
+            return np.zeros(0)
+        if len(arrs) == 1:
+            return arrs[0]
+        return np.concatenate(arrs)
+
+    @property
+    def durations(self):
+        return self.getColumn(DURATION)
+
+    @property
+    def rssqs(self):
+        return self.getColumn(RSSQ)
+
+    @property
+    def values(self):
+        """
+        Parameter values of the evaluations.
+
+        Returns
+        -------
+        np.array (2d, read only; view if nothing has been spilled)
+        """
+        arrs = [a[:, 2:] for a in self.iterChunks()]
+        if len(arrs) == 0:
+            return np.zeros((0, len(self.columns) - 2))
+        if len(arrs) == 1:
+            return arrs[0]
+        return np.concatenate(arrs)
+
+    def sum(self, column):
+        """
+        Sums a column without copying.
+
+        Parameters
+        ----------
+        column: str
+
+        Returns
+        -------
+        float
+        """
+        return float(sum(np.sum(a) for a in self.iterColumn(column)))
+
+    def clear(self):
+        """
+        Removes the evaluations and the spill files.
+        """
+        for path in self.spill_paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.spill_paths = []
+        self._num_spill = 0
+        self._num_memory = 0
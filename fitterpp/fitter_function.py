@@ -0,0 +1,401 @@
+"""Residual function that is optimized by lmfit."""
+
+from fitterpp import constants as cn
+
+import collections
+import concurrent.futures
+import numpy as np
+import os
+import threading
+import time
+
+_worker_function = None  # FitterFunction of a ProcessExecutor worker
+# Cells of the output of the user function that correspond to the data,
+# which are the rows row_idxs and columns column_idxs of an output with
+# num_column columns. Unlike the flat indices, the size is not that of the
+# data, so it is what is pickled.
+GatherIndices = collections.namedtuple("GatherIndices",
+      ["row_idxs", "column_idxs", "num_column"])
+
+
+def _initializeWorker(function):
+    global _worker_function
+    _worker_function = function
+
+def _calcWorkerResiduals(values):
+    return _worker_function._calcResiduals(values)
+
+
+class ProcessExecutor(concurrent.futures.ProcessPoolExecutor):
+    # Process pool that evaluates a FitterFunction. The function (with its
+    # data and user function) is sent to a worker once, when the worker
+    # starts, instead of with each candidate.
+
+    def __init__(self, function, max_workers=None):
+        """
+        Parameters
+        ----------
+        function: FitterFunction
+        max_workers: int (default is the number of CPUs)
+        """
+        if max_workers is None:
+            max_workers = os.cpu_count()
+        super().__init__(max_workers=max_workers,
+              initializer=_initializeWorker, initargs=(function,))
+        self.function = function
+        self.max_workers = max_workers
+
+
+class FitterFunction():
+    # Calculates the residuals between the observational data and the output
+    # of the user function. Unlike a closure, an instance can be pickled
+    # (provided the user function can be pickled) so that it can be sent
+    # to worker processes.
+    #
+    # The output of the user function that corresponds to the data is
+    # gathered into the residuals, which are returned in a new array since
+    # lmfit and scipy may retain them. So, an evaluation allocates one
+    # array the size of the data (the residuals) and no other. If
+    # chunk_size is not None, the residuals are calculated in chunks of
+    # chunk_size observations.
+    #
+    # If a PhaseTimer is provided, the time of the user function, the
+    # assembly of residuals and the conversion of parameters is recorded.
+    #
+    # If is_declared_output, the user function does not have the
+    # is_dataframe argument and always returns an array.
+
+    def __init__(self, user_function, parameter_names, data_arr, gather_idxs,
+          is_vectorized=False, jacobian_function=None,
+          is_declared_output=False, chunk_size=None, data_source=None):
+        """
+        Parameters
+        ----------
+        user_function: Function
+            Parameters
+                keyword parameters that correspond to parameter_names
+                is_dataframe (boolean)
+            Returns
+                np.array (2d)
+        parameter_names: list-str (names of the parameters fitted)
+        data_arr: np.array (flattened observational data)
+        gather_idxs: np.array-int/GatherIndices
+            indices in the flattened output of the user function that
+            correspond to data_arr (None if the flattened output
+            corresponds to data_arr). Flat indices are calculated from
+            GatherIndices when first used and are not pickled.
+        is_vectorized: bool
+            user_function has the vectorized protocol
+            Parameters
+                np.array (2d; row is a candidate; column is a parameter
+                    in the order of parameter_names)
+                is_dataframe (boolean)
+            Returns
+                np.array (3d; candidate, row, column)
+        jacobian_function: Function
+            derivatives of the output of user_function with respect to
+            the parameters. Called in the same way as user_function
+            (without is_dataframe).
+            Returns
+                np.array (3d; row, column, parameter) or
+                np.array (4d; candidate, row, column, parameter)
+                    if is_vectorized
+        is_declared_output: bool (user_function is called without is_dataframe)
+        chunk_size: int (observations in a chunk of the calculations)
+        data_source: MappedData
+            mapped file whose values are data_arr; data_arr is mapped
+            instead of copied when the function is pickled
+        """
+        self.user_function = user_function
+        self.parameter_names = list(parameter_names)
+        self.kw_names = set(parameter_names)
+        self.data_arr = np.ascontiguousarray(data_arr, dtype=float)
+        self.is_gathered = gather_idxs is not None
+        self.gather_indices = None
+        self._gather_idxs = None
+        if isinstance(gather_idxs, GatherIndices):
+            self.gather_indices = GatherIndices(
+                  np.asarray(gather_idxs.row_idxs, dtype=np.intp),
+                  np.asarray(gather_idxs.column_idxs, dtype=np.intp),
+                  int(gather_idxs.num_column))
+        elif self.is_gathered:
+            self._gather_idxs = np.asarray(gather_idxs, dtype=np.intp)
+        self.chunk_size = chunk_size
+        if self.chunk_size is None:
+            self.chunk_size = max(1, len(self.data_arr))
+        self.data_source = data_source
+        self.is_vectorized = is_vectorized
+        self.jacobian_function = jacobian_function
+        self.is_declared_output = is_declared_output
+        # Keyword arguments of the user function other than the parameters
+        self._kwargs = {} if is_declared_output else {"is_dataframe": False}
+        self._validated_names = None  # Names of the last valid call
+        self._lock = threading.Lock()  # Calculation of gather_idxs
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state["_lock"]
+        if self.data_source is not None:
+            del state["data_arr"]
+        if self.gather_indices is not None:
+            state["_gather_idxs"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.data_source is not None:
+            self.data_arr = np.ravel(np.asarray(self.data_source.values,
+                  dtype=float))
+        self._lock = threading.Lock()
+
+    @property
+    def gather_idxs(self):
+        """
+        Indices in the flattened output of the user function that
+        correspond to data_arr.
+
+        Returns
+        -------
+        np.array-int (None if the flattened output corresponds to data_arr)
+        """
+        if (self._gather_idxs is None) and (self.gather_indices is not None):
+            with self._lock:
+                if self._gather_idxs is None:
+                    row_idxs, column_idxs, num_column = self.gather_indices
+                    self._gather_idxs = (row_idxs[:, np.newaxis]*num_column
+                          + column_idxs[np.newaxis, :]).flatten()
+        return self._gather_idxs
+
+    def _gather(self, flat_arr, out, start=0):
+        """
+        Gathers the output of the user function that corresponds to the data.
+
+        Parameters
+        ----------
+        flat_arr: np.array (flattened output of the user function)
+        out: np.array (1d array in which the result is placed)
+        start: int (position in data_arr of the first value of out)
+        """
+        end = start + len(out)
+        if not self.is_gathered:
+            out[:] = flat_arr[start:end]
+        else:
+            # mode="clip" avoids the buffering done for mode="raise"; the
+            # indices are known to be valid.
+            np.take(flat_arr, self.gather_idxs[start:end], out=out,
+                  mode="clip")
+
+    @staticmethod
+    def _flatten(function_arr):
+        return np.ravel(np.asarray(function_arr, dtype=float))
+
+    def _makeResiduals(self, function_arr):
+        """
+        Calculates the residuals from the output of the user function.
+
+        Parameters
+        ----------
+        function_arr: np.array (output of the user function)
+
+        Returns
+        -------
+        np.array-float
+        """
+        flat_arr = self._flatten(function_arr)
+        if (not self.is_gathered)  \
+              and (self.chunk_size >= len(self.data_arr)):
+            return np.subtract(self.data_arr, flat_arr)
+        residuals = np.empty(len(self.data_arr))
+        for start in range(0, len(self.data_arr), self.chunk_size):
+            end = start + self.chunk_size
+            self._gather(flat_arr, residuals[start:end], start=start)
+            np.subtract(self.data_arr[start:end], residuals[start:end],
+                  out=residuals[start:end])
+        return residuals
+
+    def _validate(self, parameter_names):
+        """
+        Validates the names of the parameters. Names that are the same
+        as those of the last valid call are not checked again.
+
+        Parameters
+        ----------
+        parameter_names: iterable-str
+        """
+        parameter_names = tuple(parameter_names)
+        if parameter_names == self._validated_names:
+            return
+        diff = self.kw_names.symmetric_difference(parameter_names)
+        if len(diff) > 0:
+            msg = "Missing or extra keywards on call to fitter "
+            msg += "function: %s" % diff
+            raise ValueError(msg)
+        self._validated_names = parameter_names
+
+    def __call__(self, parameters, timer=None):
+        """
+        Calculates the residuals for the parameters.
+
+        Parameters
+        ----------
+        parameters: lmfit.Parameters
+        timer: PhaseTimer
+
+        Returns
+        -------
+        np.array-float
+        """
+        if timer is not None:
+            return self._callTimed(parameters, timer)
+        dct  = parameters.valuesdict()
+        self._validate(dct.keys())
+        if self.is_vectorized:
+            parameter_arr = np.array([[dct[n] for n in self.parameter_names]])
+            return self.calcResidualsBatch(parameter_arr)[0]
+        function_arr = self.user_function(**self._kwargs, **dct)
+        return self._makeResiduals(function_arr)
+
+    def _callTimed(self, parameters, timer):
+        """
+        Calculates the residuals and records the time of the phases.
+
+        Parameters
+        ----------
+        parameters: lmfit.Parameters
+        timer: PhaseTimer
+
+        Returns
+        -------
+        np.array-float
+        """
+        start_ns = time.perf_counter_ns()
+        dct  = parameters.valuesdict()
+        self._validate(dct.keys())
+        if self.is_vectorized:
+            parameter_arr = np.array([[dct[n] for n in self.parameter_names]])
+            _ = timer.addSince(cn.PHASE_PARAMETERS, start_ns)
+            return self.calcResidualsBatch(parameter_arr, timer=timer)[0]
+        start_ns = timer.addSince(cn.PHASE_PARAMETERS, start_ns)
+        function_arr = self.user_function(**self._kwargs, **dct)
+        start_ns = timer.addSince(cn.PHASE_USER_FUNCTION, start_ns)
+        residuals = self._makeResiduals(function_arr)
+        _ = timer.addSince(cn.PHASE_RESIDUAL, start_ns)
+        return residuals
+
+    def calcJacobian(self, parameters, timer=None):
+        """
+        Calculates the jacobian of the residuals using jacobian_function.
+
+        Parameters
+        ----------
+        parameters: lmfit.Parameters
+        timer: PhaseTimer (jacobian_function is timed as the user function)
+
+        Returns
+        -------
+        np.array-float (2d; row is a residual; column is a parameter in
+            the order of parameter_names)
+        """
+        dct  = parameters.valuesdict()
+        self._validate(dct.keys())
+        if timer is not None:
+            start_ns = time.perf_counter_ns()
+        if self.is_vectorized:
+            parameter_arr = np.array([[dct[n] for n in self.parameter_names]])
+            jacobian_arr = self.jacobian_function(parameter_arr)[0]
+        else:
+            jacobian_arr = self.jacobian_function(**dct)
+        if timer is not None:
+            _ = timer.addSince(cn.PHASE_USER_FUNCTION, start_ns)
+        jacobian_arr = np.reshape(np.asarray(jacobian_arr, dtype=float),
+              (-1, len(self.parameter_names)))
+        # The residuals are the data minus the function output
+        if not self.is_gathered:
+            return -jacobian_arr
+        return -jacobian_arr[self.gather_idxs, :]
+
+    def _calcResiduals(self, values):
+        """
+        Calculates the residuals for one candidate of a batch.
+
+        Parameters
+        ----------
+        values: np.array (parameter values in the order of parameter_names)
+
+        Returns
+        -------
+        np.array-float
+        """
+        function_arr = self.user_function(**self._kwargs,
+              **dict(zip(self.parameter_names, values)))
+        return self._makeResiduals(function_arr)
+
+    def calcResidualsBatch(self, parameter_arr, executor=None, timer=None):
+        """
+        Calculates the residuals for many candidate parameter values.
+        If the user function is not vectorized, it is called once
+        for each candidate, concurrently if there is an executor.
+
+        Parameters
+        ----------
+        parameter_arr: np.array (2d; row is a candidate; column is a parameter
+            in the order of parameter_names)
+        executor: concurrent.futures.Executor
+            A ProcessExecutor of this function evaluates the candidates
+            with the function sent to its workers when they start.
+        timer: PhaseTimer
+            Concurrent evaluations are timed as the user function.
+
+        Returns
+        -------
+        np.array-float (2d; row is a candidate; column is a residual)
+        """
+        if timer is not None:
+            start_ns = time.perf_counter_ns()
+        parameter_arr = np.atleast_2d(parameter_arr)
+        num_candidate = len(parameter_arr)
+        if self.is_vectorized:
+            function_arr = self.user_function(parameter_arr, **self._kwargs)
+            if timer is not None:
+                start_ns = timer.addSince(cn.PHASE_USER_FUNCTION, start_ns)
+            function_arr = np.reshape(np.asarray(function_arr, dtype=float),
+                  (num_candidate, -1))
+            if not self.is_gathered:
+                residuals_arr = np.subtract(self.data_arr, function_arr)
+                if timer is not None:
+                    _ = timer.addSince(cn.PHASE_RESIDUAL, start_ns)
+                return residuals_arr
+            residuals_arr = np.take(function_arr, self.gather_idxs, axis=1)
+        elif isinstance(executor, ProcessExecutor)  \
+              and (executor.function is self):
+            chunksize = int(np.ceil(num_candidate/executor.max_workers))
+            residuals_arr = np.array(list(executor.map(_calcWorkerResiduals,
+                  parameter_arr, chunksize=max(1, chunksize))))
+            if timer is not None:
+                _ = timer.addSince(cn.PHASE_USER_FUNCTION, start_ns)
+            return residuals_arr
+        elif executor is not None:
+            residuals_arr = np.array(list(executor.map(self._calcResiduals,
+                  parameter_arr)))
+            if timer is not None:
+                _ = timer.addSince(cn.PHASE_USER_FUNCTION, start_ns)
+            return residuals_arr
+        elif timer is not None:
+            residuals_arr = np.empty((num_candidate, len(self.data_arr)))
+            for idx, values in enumerate(parameter_arr):
+                function_arr = self.user_function(**self._kwargs,
+                      **dict(zip(self.parameter_names, values)))
+                start_ns = timer.addSince(cn.PHASE_USER_FUNCTION, start_ns)
+                self._gather(self._flatten(function_arr), residuals_arr[idx])
+                start_ns = timer.addSince(cn.PHASE_RESIDUAL, start_ns)
+        else:
+            residuals_arr = np.empty((num_candidate, len(self.data_arr)))
+            for idx, values in enumerate(parameter_arr):
+                function_arr = self.user_function(**self._kwargs,
+                      **dict(zip(self.parameter_names, values)))
+                self._gather(self._flatten(function_arr), residuals_arr[idx])
+        residuals_arr = np.subtract(self.data_arr, residuals_arr,
+              out=residuals_arr)
+        if timer is not None:
+            _ = timer.addSince(cn.PHASE_RESIDUAL, start_ns)
+        return residuals_arr
@@ -17,6 +17,32 @@ The fitting function should operate as follows:
     Returns:
         DataFrame for numpy.array. Index is the row key.
         Arr: 2d array (even if only 1 column)
+
+A vectorized fitting function (is_vectorized=True) evaluates many
+candidate parameter values in one call:
+    Inputs:
+        2d array whose rows are candidates and whose columns are
+            parameters in the order of initial_params
+        is_dataframe kewyword argument: returns DataFrame for the first
+            candidate if True
+    Returns:
+        DataFrame (as above) or
+        Arr: 3d array (candidate, row, column)
+
+If the labels of the output are declared (output_index and output_columns),
+the fitting function does not have the is_dataframe argument and always
+returns an array whose rows and columns are the declared labels. The
+function is called once during construction (to validate the shape of its
+output) and no DataFrames are created when it is evaluated.
+
+An observation aware fitting function (is_observation_aware=True) has
+a method that is called once during construction with the labels of the
+rows and columns of its output that are in the data:
+    setObservations(index, columns)
+        index: pd.Index (row labels in the order of the data)
+        columns: pd.Index (column labels in the order of the data)
+Afterwards, the output of the function has only these rows and columns
+(in this order), so the function can compute only what is observed.
 """
 
 from fitterpp.logs import Logger
@@ -24,19 +50,51 @@ import fitterpp.latin_cube as lc
 from fitterpp import util
 from fitterpp import constants as cn
 from fitterpp.function_wrapper import FunctionWrapper
+from fitterpp.fitter_function import FitterFunction, GatherIndices,  \
+      ProcessExecutor
+from fitterpp.checkpoint import Checkpoint
+from fitterpp.evaluation_trace import DURATION, EvaluationTrace
+from fitterpp.phase_timer import PhaseTimer
+from fitterpp import start_generator
+from fitterpp.result_store import ResultStore
+from fitterpp.progress import FitMonitor, PROGRESS_INTERVAL
+from fitterpp.budget import FitBudget
+from fitterpp.convergence import TargetConvergence
+from fitterpp.mapped_data import MappedData
 
 import collections
+import concurrent.futures
 import copy
+import functools
 import lmfit
-import lhsmdu
-import matplotlib.pyplot as plt
+from lmfit.minimizer import AbortFitException
+import multiprocessing
 import pandas as pd
 import numpy as np
+import threading
 import time
 
 
 ITERATION = "iteration"
-LATINCUBE_DF = lc.read()
+# Declared labels of the output of a user function
+#   index: pd.Index (row labels)
+#   columns: pd.Index (column labels)
+OutputLabels = collections.namedtuple("OutputLabels", ["index", "columns"])
+SET_OBSERVATIONS = "setObservations"  # Method of observation aware functions
+IDX_ATTRIBUTES = ["row_idxs", "column_idxs", "flat_idxs", "other_row_idxs",
+      "other_column_idxs", "other_flat_idxs"]
+# Result of fitting from one set of initial parameters
+FitterResult = collections.namedtuple("FitterResult",
+      ["mzr", "rssq", "prm", "traces", "cache_stats", "num_evaluation",
+      "timers", "saved_evaluations", "duration", "is_budget_limited"],
+      defaults=[None, None, None, None])
+
+
+def __getattr__(name):
+    # Reads the latin cube table on first access of LATINCUBE_DF
+    if name == "LATINCUBE_DF":
+        return lc.get()
+    raise AttributeError("module %s has no attribute %s" % (__name__, name))
 
 
 class DFIntersectionFinder:
@@ -45,26 +103,119 @@ class DFIntersectionFinder:
     # Provides the array index for the common rows and columns.
     #    self.row_idxs
     #    self.column_idxs
+    #    self.flat_idxs (index of the common cells in the flattened values)
+    # and the aligned positions of the same labels in other_df
+    #    self.other_row_idxs
+    #    self.other_column_idxs
+    #    self.other_flat_idxs
+    # Lookups use hashing (or binary search for sorted indices) so that
+    # the cost is linear in the number of rows. MultiIndex rows are supported.
+    # If the DataFrames have the same labels in the same order
+    # (is_identical), the indices are calculated on first access so that
+    # large data do not require large indices.
 
     def __init__(self, df, other_df):
         """
         Parameters
         ----------
-        df: DataFrame
-        other_df: DataFram
+        df: DataFrame/OutputLabels/MappedData
+        other_df: DataFrame/OutputLabels/MappedData
         """
         self.df = df
         self.other_df = other_df
+        self.is_identical = df.index.equals(other_df.index)  \
+              and df.columns.equals(other_df.columns)
+        if not self.is_identical:
+            self._calculate()
+
+    def __getattr__(self, name):
+        # Indices of identical DataFrames are calculated on first access
+        if name in IDX_ATTRIBUTES:
+            self._calculate()
+            return self.__dict__[name]
+        raise AttributeError("%s has no attribute %s"
+              % (self.__class__.__name__, name))
+
+    def _calculate(self):
+        """
+        Calculates the indices of the common rows and columns.
+        """
+        df = self.df
+        other_df = self.other_df
         # Common row indices
-        indices = list(df.index)
-        other_indices = list(other_df.index)
-        self.row_idxs = np.array([i for i in range(len(df))
-              if indices[i] in other_indices])
+        self.row_idxs, self.other_row_idxs = self._intersect(df.index,
+              other_df.index)
         # Common column indices
-        columns = list(df.columns)
-        other_columns = list(other_df.columns)
-        self.column_idxs = np.array([i for i in range(len(df.columns))
-              if columns[i] in other_columns])
+        self.column_idxs, self.other_column_idxs = self._intersect(df.columns,
+              other_df.columns)
+        self.flat_idxs = self._flatten(self.row_idxs, self.column_idxs,
+              len(df.columns))
+        self.other_flat_idxs = self._flatten(self.other_row_idxs,
+              self.other_column_idxs, len(other_df.columns))
+
+    @staticmethod
+    def _flatten(row_idxs, column_idxs, num_column):
+        """
+        Calculates the index of cells in the flattened values of a DataFrame.
+
+        Parameters
+        ----------
+        row_idxs: np.array-int
+        column_idxs: np.array-int
+        num_column: int (number of columns in the DataFrame)
+
+        Returns
+        -------
+        np.array-int
+        """
+        return (row_idxs[:, np.newaxis]*num_column
+              + column_idxs[np.newaxis, :]).flatten()
+
+    @staticmethod
+    def _intersect(index, other_index):
+        """
+        Finds the labels in index that are in other_index.
+        If other_index has duplicate labels, the first is used.
+
+        Parameters
+        ----------
+        index: pd.Index
+        other_index: pd.Index
+
+        Returns
+        -------
+        np.array-int (positions in index of common labels)
+        np.array-int (positions in other_index of the same labels)
+        """
+        is_sorted = (not isinstance(index, pd.MultiIndex))  \
+              and (not isinstance(other_index, pd.MultiIndex))  \
+              and index.is_monotonic_increasing  \
+              and other_index.is_monotonic_increasing  \
+              and other_index.is_unique
+        if is_sorted:
+            # Binary search of sorted labels
+            other_values = other_index.values
+            positions = np.searchsorted(other_values, index.values)
+            positions = np.minimum(positions, len(other_values) - 1)
+            if len(other_values) > 0:
+                is_common = other_values[positions] == index.values
+            else:
+                is_common = np.repeat(False, len(index))
+            idxs = np.flatnonzero(is_common)
+            return idxs, positions[idxs].astype(int)
+        # Hash lookup
+        if other_index.is_unique:
+            unique_positions = None
+            unique_index = other_index
+        else:
+            unique_positions = np.flatnonzero(~other_index.duplicated())
+            unique_index = other_index[unique_positions]
+        positions = unique_index.get_indexer(index)
+        idxs = np.flatnonzero(positions >= 0)
+        other_idxs = positions[idxs]
+        if unique_positions is not None:
+            other_idxs = unique_positions[other_idxs]
+        return idxs, other_idxs.astype(int)
 
     def isCorrectShape(self, arr):
         """
@@ -95,6 +246,14 @@ class Fitterpp():
 
     If latincube_idx is not None, then use a precomputed latin cube position.
 
+    The starts (latin cube points, which may be screened, and stored
+    results of similar data) are fit in sequence, in parallel (n_workers
+    or executor; user_function must be picklable), or by successive
+    halving. A method stops when the fit is cancelled, its share of the
+    budget is used, it has converged or target_rssq is reached, and the
+    best result found is kept. Options that cannot be combined raise
+    ValueError.
+
     Usage
     -----
     fitter = fitterpp(calcResiduals, params, [cn.METHOD_LEASTSQ])
@@ -103,7 +262,16 @@ class Fitterpp():
 
     def __init__(self, user_function, initial_params, data_df,
           method_names=None, max_fev=cn.MAX_NFEV_DFT, num_latincube=None,
-          latincube_idx=None, logger=None, is_collect=False):
+          latincube_idx=None, logger=None, is_collect=False, n_workers=1,
+          executor=None, is_vectorized=False, num_screen=None,
+          num_screen_top=None, cache=None, jacobian=None,
+          num_jacobian_worker=None, halving_factor=None,
+          checkpoint_path=None, max_trace_entry=None, trace_dir=None,
+          is_timed=False, sampler=cn.SAMPLER_LHS, seed=None,
+          result_store=None, num_warm_start=1, max_total_fev=None,
+          max_duration=None, convergences=None, target_rssq=None,
+          output_index=None, output_columns=None, chunk_size=None,
+          is_observation_aware=False):
         """
         Parameters
         ----------
@@ -118,14 +286,65 @@ class Fitterpp():
            Arguments
             lmfit.parameters
         initial_params: lmfit.Parameters (initial values of parameters)
-        data_df: pd.DataFrame
+        data_df: pd.DataFrame/MappedData
             Observational data (same structure as the output of the function)
         method_names: list-str/FitterppMethod
             Examples of names: "leastsq", "differential_evolution"
         max_fev: int (Maximum number of function evaluations)
         num_latincube: int (Num samples for latin cube of parameter initial values)
             A value of 0 means that "value" in each parameter will be used
-        latincube_idx: position to use in pre-computed latin_cube
+        latincube_idx: position to use in pre-computed latin_cube (1-based;
+            any number of strips)
+        n_workers: int (number of processes used to fit the starts)
+        executor: concurrent.futures.Executor (used to fit the starts;
+            not with n_workers)
+        is_vectorized: bool (user_function evaluates many candidates per call)
+        num_screen: int (number of latin cube points screened)
+        num_screen_top: int (number of best screened points used as starts;
+            scores are in screening_df)
+        cache: EvaluationCache (residuals shared by the methods and starts)
+        jacobian: Function/str
+            Function: derivatives of the output of user_function with
+                respect to the parameters (see FitterFunction)
+            str: finite difference calculation in cn.JACOBIAN_MODES
+            The default is cn.JACOBIAN_BATCH if is_vectorized and otherwise
+            the calculation done by lmfit.
+        num_jacobian_worker: int (workers for thread and process jacobians)
+        halving_factor: float (> 1; allocate evaluations to starts by
+            successive halving)
+        checkpoint_path: str (file in which completed starts are saved;
+            fit(is_resume=True) continues an interrupted fit)
+        max_trace_entry: int (evaluations of a trace kept in memory)
+        trace_dir: str (directory to which traces spill)
+        is_timed: bool (record the wall clock time of the phases of the fit
+            in timers, timer and timing_df)
+        sampler: str (generator of latin cube points in cn.SAMPLERS)
+            The default latin hypercube replaces lhsmdu (cn.SAMPLER_LHSMDU),
+            which earlier versions used.
+        seed: int (seed of the sampler and the latin cube table)
+        result_store: ResultStore (results of earlier fits)
+            A fit of the same model to the same data is taken from the
+            store. Otherwise, results of similar data are added to the
+            starts, and the result is saved in the store.
+        num_warm_start: int (stored results of similar data used as starts)
+        max_total_fev: int (evaluations of the user function by fit)
+        max_duration: float (seconds of fit)
+            If the budget is used, the fit ends with is_budget_limited.
+        convergences: Convergence/list-Convergence
+            stops each method that does not have its own convergences;
+            unused evaluations are in saved_evaluations
+        target_rssq: float (rssq at which the fit stops)
+            Skipped starts are in num_skipped_start and their estimated
+            time in saved_duration.
+        output_index: list/pd.Index (row labels of the output of user_function)
+        output_columns: list/pd.Index (column labels of the output)
+            If declared, user_function does not have is_dataframe
+            and returns an array.
+        chunk_size: int (observations in a chunk of residual calculations;
+            not with is_vectorized)
+        is_observation_aware: bool
+            user_function has setObservations and outputs only the rows
+            and columns that are observed (not with declared output)
         """
         self.initial_params = initial_params.copy()
         self.user_function = user_function
@@ -136,8 +355,74 @@ class Fitterpp():
         self.latincube_idx = latincube_idx
         # The values array does not include the key
         self.is_collect = is_collect
+        self.n_workers = n_workers
+        self.executor = executor
+        if (self.executor is not None) and (self.n_workers > 1):
+            raise ValueError("Specify n_workers or executor, not both.")
+        self.is_vectorized = is_vectorized
+        self.num_screen = num_screen
+        if self.num_screen is None:
+            self.num_screen = self.num_latincube
+        self.num_screen_top = num_screen_top
+        if (self.num_screen_top is not None)  \
+              and (self.latincube_idx is not None):
+            raise ValueError("Screening is not supported with latincube_idx.")
+        self.cache = cache
+        if callable(jacobian):
+            self.jacobian_function = jacobian
+            self.jacobian = cn.JACOBIAN_USER
+        else:
+            self.jacobian_function = None
+            self.jacobian = jacobian
+            if (self.jacobian is None) and self.is_vectorized:
+                self.jacobian = cn.JACOBIAN_BATCH
+            if not self.jacobian in [None] + cn.JACOBIAN_MODES[1:]:
+                raise ValueError("Invalid jacobian: %s" % str(jacobian))
+            if self.is_vectorized and (self.jacobian
+                  in [cn.JACOBIAN_THREAD, cn.JACOBIAN_PROCESS]):
+                raise ValueError("A vectorized user_function uses jacobian %s."
+                      % cn.JACOBIAN_BATCH)
+        self.num_jacobian_worker = num_jacobian_worker
+        self.max_trace_entry = max_trace_entry
+        self.trace_dir = trace_dir
+        self.is_timed = is_timed
+        self.sampler = sampler
+        if not self.sampler in cn.SAMPLERS:
+            raise ValueError("Invalid sampler: %s" % str(sampler))
+        self.seed = seed
+        self.result_store = result_store
+        self.num_warm_start = num_warm_start
+        self.monitor = None  # FitMonitor of the fit that is running
+        self.max_total_fev = max_total_fev
+        self.max_duration = max_duration
+        self.budget = None  # FitBudget of the fit that is running
+        self.target_rssq = target_rssq
+        self.chunk_size = chunk_size
+        if (self.chunk_size is not None) and self.is_vectorized:
+            raise ValueError("chunk_size is not supported with is_vectorized.")
+        self.is_observation_aware = is_observation_aware
+        if self.is_observation_aware  \
+              and (not hasattr(self.user_function, SET_OBSERVATIONS)):
+            raise ValueError("An observation aware user function must have %s."
+                  % SET_OBSERVATIONS)
+        self.is_declared_output = (output_index is not None)  \
+              or (output_columns is not None)
+        if self.is_declared_output and ((output_index is None)
+              or (output_columns is None)):
+            raise ValueError("Must declare both output_index and output_columns.")
+        if self.is_declared_output and self.is_observation_aware:
+            raise ValueError(
+                  "The output of an observation aware user_function is declared.")
+        if (self.max_trace_entry is not None) and (self.trace_dir is None):
+            raise ValueError("max_trace_entry requires a trace_dir.")
+        self.halving_factor = halving_factor
+        if (self.halving_factor is not None) and (self.halving_factor <= 1):
+            raise ValueError("halving_factor must be larger than 1.")
+        self.checkpoint_path = checkpoint_path
+        if (self.checkpoint_path is not None)  \
+              and (self.halving_factor is not None):
+            raise ValueError("Checkpoints are not supported with halving_factor.")
         self.fitting_columns = list(data_df.columns)
-        self.function = self._mkFitterFunction()
         if method_names is None:
             self.methods = self.mkFitterppMethod(max_fev=max_fev)
         elif isinstance(method_names[0], util.FitterppMethod):
@@ -147,33 +432,197 @@ class Fitterpp():
                 max_fev=max_fev)
         else:
             raise ValueError("Invalid specification of method_names")
+        if convergences is not None:
+            self.methods = [m if len(m.convergences) > 0
+                  else util.FitterppMethod(m.method, m.kwargs,
+                  convergences=convergences) for m in self.methods]
         self.logger = logger
         if self.logger is None:
             self.logger = Logger()
         # Common indexes 
+        initial_arr = np.array([list(
+              self.initial_params.valuesdict().values())])
         kwargs = self.makeKwargs(self.initial_params)
-        function_df = self.user_function(is_dataframe=True, **kwargs)
+        if self.is_declared_output:
+            function_df = OutputLabels(index=pd.Index(output_index),
+                  columns=pd.Index(output_columns))
+        elif self.is_vectorized:
+            function_df = self.user_function(initial_arr, is_dataframe=True)
+        else:
+            function_df = self.user_function(is_dataframe=True, **kwargs)
         self.function_common = DFIntersectionFinder(function_df,
               self.data_df)
         self.data_common = DFIntersectionFinder(self.data_df, function_df)
-        self.data_arr = self.data_df.values[:, self.data_common.column_idxs]
-        self.data_arr = self.data_arr[self.data_common.row_idxs, :]
-        self.data_arr = self.data_arr.flatten()
+        if self.is_observation_aware:
+            function_df = self._setObservations()
+            self.function_common = DFIntersectionFinder(function_df,
+                  self.data_df)
+            self.data_common = DFIntersectionFinder(self.data_df, function_df)
+        self.data_arr = self._makeDataArr(self.data_df)
+        self.function = self._mkFitterFunction()
         # Validate the output
-        function_arr = self.user_function(is_dataframe=False, **kwargs)
-        if not self.function_common.isCorrectShape(function_arr):
+        if self.is_declared_output:
+            if self.is_vectorized:
+                function_arr = self.user_function(initial_arr)[0]
+            else:
+                function_arr = self.user_function(**kwargs)
+        else:
+            if self.is_vectorized:
+                function_arr = self.user_function(initial_arr,
+                      is_dataframe=False)[0]
+            else:
+                function_arr = self.user_function(is_dataframe=False, **kwargs)
+        # The array has all rows and columns of the DataFrame
+        is_correct_shape = np.shape(function_arr)  \
+              == (len(function_df.index), len(function_df.columns))
+        if not is_correct_shape:
             msg = "The user function does not create an array "
             msg += "shape consistent with its DataFrame."
             raise ValueError(msg)
+        self._initializeOutputs()
+
+    def _initializeOutputs(self):
+        """
+        Initializes the statistics and results of fitting.
+        """
         # Statistics
-        self.performance_stats = []  # durations of function executions
-        self.quality_stats = []  # residual sum of squares, a quality measure
+        self.traces = []  # EvaluationTrace for each start and method
+        self.cache_stats = []  # (hits, misses) of the cache
+        self.num_evaluation = 0  # Evaluations of the user function
+        self.timers = []  # PhaseTimer for each start and method
+        self.timer = None  # PhaseTimer for the fit
+        # Evaluations of max_nfev not used because a method converged,
+        # for each start and method
+        self.saved_evaluations = []
  
         # Outputs
         self.duration = None  # Duration of parameter search
+        self.screening_df = None  # Scores of screened latin cube points
+        self.timing_df = None  # Times of phases for each start and method
         self.final_params = None
         self.minimizer_result = None
         self.rssq = None
+        self.is_stored_result = False  # Result is from the result_store
+        self.is_cancelled = False  # The fit was stopped before completing
+        self.is_budget_limited = False  # The fit was limited by the budget
+        self.is_target_reached = False  # A start reached target_rssq
+        self.num_skipped_start = 0  # Starts not fit because of target_rssq
+        self.saved_duration = 0.0  # Estimated seconds of the skipped starts
+
+    def _setObservations(self):
+        """
+        Tells the user function the rows and columns of its output that
+        are in the data.
+
+        Returns
+        -------
+        OutputLabels (labels of the output of the user function)
+        """
+        index = self.data_df.index[self.data_common.row_idxs].drop_duplicates()
+        columns = self.data_df.columns[
+              self.data_common.column_idxs].drop_duplicates()
+        getattr(self.user_function, SET_OBSERVATIONS)(index, columns)
+        return OutputLabels(index=index, columns=columns)
+
+    def isSameStructure(self, data_df):
+        """
+        Determines if data have the same index and columns as data_df.
+
+        Parameters
+        ----------
+        data_df: pd.DataFrame
+
+        Returns
+        -------
+        bool
+        """
+        return self.data_df.index.equals(data_df.index)  \
+              and self.data_df.columns.equals(data_df.columns)
+
+    def copyWithData(self, data_df, checkpoint_path=None):
+        """
+        Creates a Fitterpp for other data with the same index and columns.
+        The common indices and the validation of the user function are
+        reused, so the user function is not called. The copy has an empty
+        cache since residuals depend on the data.
+
+        Parameters
+        ----------
+        data_df: pd.DataFrame
+        checkpoint_path: str
+            checkpoint of the copy; required if self has a checkpoint
+
+        Returns
+        -------
+        Fitterpp (not fitted)
+        """
+        if not self.isSameStructure(data_df):
+            raise ValueError("data_df must have the same index and columns.")
+        if (self.checkpoint_path is not None) and ((checkpoint_path is None)
+              or (checkpoint_path == self.checkpoint_path)):
+            raise ValueError("Must provide another checkpoint_path for the copy.")
+        fitter = copy.copy(self)
+        if self.cache is not None:
+            fitter.cache = self.cache.makeEmptyCopy()
+        fitter.checkpoint_path = checkpoint_path
+        fitter.data_df = data_df
+        fitter.data_arr = fitter._makeDataArr(data_df)
+        fitter.function = fitter._mkFitterFunction()
+        fitter._initializeOutputs()
+        return fitter
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        if self._isMappedDataArr():
+            # Worker processes map the file instead of copying the data
+            del state["data_arr"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if not "data_arr" in state:
+            self.data_arr = self._makeDataArr(self.data_df)
+
+    def _isMappedDataArr(self):
+        """
+        Determines if data_arr is a view of MappedData.
+
+        Returns
+        -------
+        bool
+        """
+        return isinstance(self.data_df, MappedData)  \
+              and self.data_common.is_identical
+
+    def _makeDataArr(self, data_df):
+        """
+        Finds the observations in the output of the user function, in the
+        order of data_df. If the labels of the output are the same as
+        data_df, the values of data_df are used without a copy
+        (if they are float).
+
+        Parameters
+        ----------
+        data_df: pd.DataFrame/MappedData
+
+        Returns
+        -------
+        np.array-float
+        """
+        if self.data_common.is_identical:
+            return np.ravel(np.asarray(data_df.values, dtype=float))
+        return np.ravel(data_df.values)[
+              self.data_common.flat_idxs].astype(float)
+
+    @property
+    def performance_stats(self):
+        # Durations of function executions for each start and method
+        return [t.durations for t in self.traces]
+
+    @property
+    def quality_stats(self):
+        # Residual sum of squares for each start and method
+        return [t.rssqs for t in self.traces]
 
     @staticmethod
     def makeKwargs(parameters):
@@ -193,60 +642,972 @@ class Fitterpp():
             kwargs[key] = value
         return kwargs
 
-    def fit(self):
+    def fit(self, is_resume=False, monitor=None):
         """
         Performs parameter fitting function.
         Result is self.final_params
+
+        Parameters
+        ----------
+        is_resume: bool
+            continue from the checkpoint file, skipping completed starts.
+            Starts read from the checkpoint have no minimizer result or
+            traces.
+        monitor: FitMonitor
+            reports progress; if cancelled, the result is the best found
+        """
+        self.monitor = monitor
+        self.is_budget_limited = False
+        self.is_target_reached = False
+        self.num_skipped_start = 0
+        self.saved_duration = 0.0
+        if (self.max_total_fev is not None) or (self.max_duration is not None):
+            self.budget = FitBudget(max_evaluation=self.max_total_fev,
+                  max_duration=self.max_duration)
+        try:
+            self._fit(is_resume=is_resume)
+        finally:
+            self.monitor = None
+            self.budget = None
+        self.is_cancelled = (monitor is not None) and monitor.is_cancelled
+
+    async def iterFitAsync(self, executor=None, is_resume=False,
+          interval=PROGRESS_INTERVAL):
         """
-        FitterResult = collections.namedtuple("FitterResult",
-              ["mzr", "rssq", "prm"])
+        Fits in an executor, providing the progress of the fit. If the task
+        is cancelled, the current method is stopped and the best result
+        found is in self.final_params before CancelledError is raised.
+
+        Parameters
+        ----------
+        executor: concurrent.futures.ThreadPoolExecutor
+            default is the executor of the event loop
+        is_resume: bool (see fit)
+        interval: int (evaluations between progress events of a method)
+
+        Returns
+        -------
+        async iterator-ProgressEvent
+        """
+        import asyncio
         #
-        start_time = time.process_time()
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        def callback(event):
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+        monitor = FitMonitor(callback=callback, interval=interval)
+        future = loop.run_in_executor(executor,
+              functools.partial(self.fit, is_resume=is_resume,
+              monitor=monitor))
+        # Events are placed in the queue before the fit completes
+        future.add_done_callback(
+              lambda _: loop.call_soon(queue.put_nowait, None))
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                yield event
+            await future
+        finally:
+            if not future.done():
+                monitor.cancel()
+                await asyncio.shield(future)
+
+    async def fitAsync(self, callback=None, executor=None, is_resume=False,
+          interval=PROGRESS_INTERVAL):
+        """
+        Fits in an executor. See iterFitAsync.
+
+        Parameters
+        ----------
+        callback: Function
+            Parameters
+                ProgressEvent
+        executor: concurrent.futures.ThreadPoolExecutor
+        is_resume: bool
+        interval: int
+
+        Returns
+        -------
+        lmfit.Parameters (self.final_params)
+        """
+        async for event in self.iterFitAsync(executor=executor,
+              is_resume=is_resume, interval=interval):
+            if callback is not None:
+                callback(event)
+        return self.final_params
+
+    def _fit(self, is_resume=False):
+        """
+        Performs parameter fitting function. See fit.
+
+        Parameters
+        ----------
+        is_resume: bool
+        """
+        start_time = time.time()
+        if self.is_timed:
+            self.timer = PhaseTimer()
+            start_ns = time.perf_counter_ns()
         last_excp = None
-        minimizer = None
+        store_keys = None
+        if self.result_store is not None:
+            store_keys = ResultStore.makeKeys(self.user_function,
+                  self.initial_params, self.data_df)
+            values, rssq = self.result_store.get(store_keys)
+            if values is not None:
+                self.final_params = self._makeParameters(self.initial_params,
+                      values)
+                self.rssq = rssq
+                self.is_stored_result = True
+                self.duration = time.time() - start_time
+                return
         # Construct the list of parameters to fit
-        if self.latincube_idx is None:
-            if self.num_latincube == 0:
-                parameters_lst = [self.initial_params]
-            else:
-                parameters_lst = self.makeParameterCube(self.initial_params,
-                      self.num_latincube)
+        checkpoint = None
+        if is_resume:
+            if self.checkpoint_path is None:
+                raise ValueError("Must have a checkpoint_path to resume.")
+            checkpoint = Checkpoint.read(self.checkpoint_path)
+        if checkpoint is None:
+            parameters_lst = list(self._makeStartParameters())
+            if store_keys is not None:
+                parameters_lst.extend([
+                      self._makeParameters(self.initial_params, v)
+                      for v in self.result_store.getNearest(store_keys,
+                      self.data_df, num_entry=self.num_warm_start)])
+        else:
+            if checkpoint.parameter_names != self.function.parameter_names:
+                raise ValueError("Checkpoint %s has different parameters."
+                      % self.checkpoint_path)
+            parameters_lst = [self._makeParameters(self.initial_params, v)
+                  for v in checkpoint.initial_arr]
+        if self.is_timed:
+            _ = self.timer.addSince(cn.PHASE_START, start_ns)
+        if (self.budget is not None) and (self.num_evaluation > 0):
+            # Screening
+            self.budget.add(self.num_evaluation, time.time() - start_time)
+        # Fit from each set of initial parameters
+        if (self.halving_factor is not None) and (len(parameters_lst) > 1):
+            results = self._fitSuccessiveHalving(parameters_lst)
+        elif self.checkpoint_path is None:
+            results = self._fitStarts(self.methods, parameters_lst)
         else:
-            parameters_lst = [self.makeParametersFromLatincubeStrip(
-                  self.initial_params, self.latincube_idx)]
-        best_result = FitterResult(mzr=None, rssq=1e10, prm=None)
-        for parameters in parameters_lst:
-            result_params = parameters.copy()
-            for fitter_method in self.methods:
-                method = fitter_method.method
-                kwargs = fitter_method.kwargs
-                wrapper_function = FunctionWrapper(self.function,
-                      is_collect=self.is_collect)
-                minimizer = lmfit.Minimizer(wrapper_function.execute, result_params)
-                minimizer_result = minimizer.minimize(method=method, **kwargs)
-                self.performance_stats.append(list(wrapper_function.perfStatistics))
-                self.quality_stats.append(list(wrapper_function.rssqStatistics))
-                # Update the parameters
-                rssq = wrapper_function.rssq
-                if wrapper_function.bestParamDct is not None:
-                    util.updateParameterValues(result_params,
-                          wrapper_function.bestParamDct)
-            if rssq < best_result.rssq:
-                best_result = FitterResult(mzr=minimizer_result, rssq=rssq,
-                      prm=result_params)
+            results = self._fitStartsWithCheckpoint(parameters_lst, checkpoint)
+        # Merge the results in the order of the starts
+        best_result = FitterResult(mzr=None, rssq=1e10, prm=None,
+              traces=None, cache_stats=None, num_evaluation=0)
+        for result in results:
+            if result is None:
+                # Start that was not fit because the fit was cancelled
+                continue
+            self.traces.extend(result.traces)
+            self.cache_stats.extend(result.cache_stats)
+            self.num_evaluation += result.num_evaluation
+            if result.saved_evaluations is not None:
+                self.saved_evaluations.extend(result.saved_evaluations)
+            if result.is_budget_limited:
+                self.is_budget_limited = True
+            if self.is_timed and (result.timers is not None):
+                self.timers.extend(result.timers)
+                for timer in result.timers:
+                    self.timer.merge(timer)
+            if result.rssq < best_result.rssq:
+                best_result = result
+        if self.is_timed:
+            self.timing_df = self._makeTimingDF(results)
         # Check if successful
-        if best_result.mzr is None:
+        if best_result.prm is None:
             msg = "*** Optimization failed."
             self.logger.error(msg, last_excp)
         else:
-            self.duration = time.process_time() - start_time
+            self.duration = time.time() - start_time
         # Seve the best result
         self.final_params = best_result.prm
         self.minimizer_result = best_result.mzr
         self.rssq = best_result.rssq
+        if (store_keys is not None) and (self.final_params is not None):
+            self.result_store.put(store_keys, self.data_df,
+                  list(self.final_params.valuesdict().values()), self.rssq)
+
+    def _makeTimingDF(self, results):
+        """
+        Tabulates the times of the phases. The rows for the whole fit
+        have cn.ALL as the start and method. Their total is the sum of
+        the times of the methods, which exceeds duration if the starts
+        are fit in parallel.
+
+        Parameters
+        ----------
+        results: list-FitterResult (in the order of the starts)
+
+        Returns
+        -------
+        pd.DataFrame
+            columns: cn.START, cn.METHOD, cn.PHASE, cn.SECONDS, cn.COUNT
+        """
+        rows = []
+        def addRows(start, method, timer, phases):
+            for phase in phases:
+                rows.append({cn.START: start, cn.METHOD: method,
+                      cn.PHASE: phase, cn.SECONDS: timer.getSeconds(phase),
+                      cn.COUNT: timer.getCount(phase)})
+        method_phases = [p for p in cn.PHASES if p != cn.PHASE_START]
+        for start, result in enumerate(results):
+            if (result is None) or (result.timers is None):
+                continue
+            for timer in result.timers:
+                addRows(start, timer.method, timer, method_phases)
+        addRows(cn.ALL, cn.ALL, self.timer, cn.PHASES)
+        return pd.DataFrame(rows)
+
+    def _makeStartParameters(self):
+        """
+        Constructs the initial values of the starts.
+
+        Returns
+        -------
+        list-lmfit.Parameters
+        """
+        if self.latincube_idx is None:
+            if (self.num_screen_top is not None) and (self.num_screen > 0):
+                return self.screen()
+            elif self.num_latincube == 0:
+                return [self.initial_params]
+            else:
+                return self.makeParameterCube(self.initial_params,
+                      self.num_latincube, sampler=self.sampler,
+                      seed=self.seed)
+        return [self.makeParametersFromLatincubeStrip(
+              self.initial_params, self.latincube_idx, seed=self.seed)]
+
+    def _fitStartsWithCheckpoint(self, parameters_lst, checkpoint):
+        """
+        Fits the starts that are not in the checkpoint, and writes the
+        checkpoint as each start completes.
+
+        Parameters
+        ----------
+        parameters_lst: list-lmfit.Parameters
+        checkpoint: Checkpoint (None if not resuming)
+
+        Returns
+        -------
+        list-FitterResult (in the order of parameters_lst)
+        """
+        if checkpoint is None:
+            initial_arr = [list(p.valuesdict().values()) for p in parameters_lst]
+            checkpoint = Checkpoint(self.checkpoint_path,
+                  self.function.parameter_names, initial_arr)
+            checkpoint.write()
+        start_idxs = [i for i in range(len(parameters_lst))
+              if not i in checkpoint.results]
+        if len(start_idxs) == 0:
+            return [self.makeCheckpointResult(checkpoint.results[i],
+                  self.initial_params) for i in range(len(parameters_lst))]
+        if checkpoint.is_truncated:
+            # Drops the incomplete line of a preempted fit
+            checkpoint.write()
+            checkpoint.is_truncated = False
+        def callback(idx, result):
+            checkpoint.addResult(start_idxs[idx], result)
+        fit_results = self._fitStarts(self.methods,
+              [parameters_lst[i] for i in start_idxs], callback=callback)
+        results = [None if i not in checkpoint.results else
+              self.makeCheckpointResult(checkpoint.results[i],
+              self.initial_params) for i in range(len(parameters_lst))]
+        # Starts fit now keep their statistics
+        for idx, result in zip(start_idxs, fit_results):
+            if result is not None:
+                results[idx] = result
+        return results
+
+    @staticmethod
+    def makeCheckpointResult(start_result, parameters):
+        """
+        Constructs the FitterResult of a start read from a checkpoint.
+        It has no minimizer result or traces; there is an empty trace
+        for each method.
+
+        Parameters
+        ----------
+        start_result: StartResult
+        parameters: lmfit.Parameters (names and bounds of the parameters)
+
+        Returns
+        -------
+        FitterResult
+        """
+        prm = None
+        if start_result.values is not None:
+            prm = Fitterpp._makeParameters(parameters, start_result.values)
+        return FitterResult(mzr=None, rssq=start_result.rssq, prm=prm,
+              traces=[EvaluationTrace() for _ in start_result.cache_stats],
+              cache_stats=list(start_result.cache_stats),
+              num_evaluation=start_result.num_evaluation)
+
+    def _fitStarts(self, methods, parameters_lst, callback=None):
+        """
+        Fits the starts, in parallel if there is an executor or n_workers > 1.
+
+        Parameters
+        ----------
+        methods: list-FitterppMethod
+        parameters_lst: list-lmfit.Parameters
+        callback: Function (called when a start completes)
+            Parameters
+                int (index in parameters_lst)
+                FitterResult
+
+        Returns
+        -------
+        list-FitterResult (in the order of parameters_lst)
+            If the fit is cancelled, starts that are not fit are None or
+            are omitted at the end of the list.
+        """
+        if self.executor is not None:
+            return self._mapFitStart(self.executor, methods, parameters_lst,
+                  callback=callback)
+        if (self.n_workers > 1) and (len(parameters_lst) > 1):
+            with concurrent.futures.ProcessPoolExecutor(
+                  max_workers=self.n_workers) as executor:
+                return self._mapFitStart(executor, methods, parameters_lst,
+                      callback=callback)
+        results = []
+        for idx, parameters in enumerate(parameters_lst):
+            start_budget = None
+            if self.budget is not None:
+                if self.budget.isExhausted():
+                    self.is_budget_limited = True
+                    break
+                start_budget = self.budget.makePart(len(parameters_lst) - idx)
+            start_time = time.time()
+            result = self._fitStart(self.function, methods, parameters,
+                  self.is_collect, cache=self.cache, jacobian=self.jacobian,
+                  num_jacobian_worker=self.num_jacobian_worker,
+                  max_trace_entry=self.max_trace_entry,
+                  trace_dir=self.trace_dir, is_timed=self.is_timed,
+                  monitor=self.monitor, start_idx=idx,
+                  budget=copy.copy(start_budget), target_rssq=self.target_rssq)
+            self._addToBudget(start_budget, result, time.time() - start_time)
+            if callback is not None:
+                callback(idx, result)
+            results.append(result)
+            if (self.monitor is not None) and self.monitor.is_cancelled:
+                break
+            if self._isTargetReached(result):
+                self._skipStarts(len(parameters_lst) - len(results), results)
+                break
+        return results
+
+    def _isTargetReached(self, result):
+        """
+        Determines if a start reached target_rssq.
+
+        Parameters
+        ----------
+        result: FitterResult
+
+        Returns
+        -------
+        bool
+        """
+        if (self.target_rssq is None) or (result is None):
+            return False
+        if result.rssq <= self.target_rssq:
+            self.is_target_reached = True
+        return self.is_target_reached
+
+    def _skipStarts(self, num_skipped, results, scale=1.0):
+        """
+        Records the starts skipped because target_rssq was reached. The
+        time saved is estimated from the durations of the starts that
+        are fit.
+
+        Parameters
+        ----------
+        num_skipped: int
+        results: list-FitterResult (starts that are fit; None if not fit)
+        scale: float (duration of a skipped start relative to a fit start)
+        """
+        self.num_skipped_start += num_skipped
+        durations = [r.duration for r in results
+              if (r is not None) and (r.duration is not None)]
+        if (num_skipped > 0) and (len(durations) > 0):
+            self.saved_duration += scale*num_skipped*np.mean(durations)
+
+    def _addToBudget(self, start_budget, result, duration):
+        """
+        Records the use of the budget by a start.
+
+        Parameters
+        ----------
+        start_budget: FitBudget (budget of the start; None if no budget)
+        result: FitterResult
+        duration: float (seconds of the start; 0 if not measured)
+        """
+        if start_budget is None:
+            return
+        self.budget.add(result.num_evaluation, duration)
+        start_budget.add(result.num_evaluation, duration)
+        if start_budget.isExhausted():
+            self.is_budget_limited = True
+
+    def _fitSuccessiveHalving(self, parameters_lst):
+        """
+        Allocates function evaluations to starts by successive halving.
+        All starts are fit with a small budget (max_nfev of each method).
+        The best 1/halving_factor of the starts continue from their best
+        parameters with a budget that is halving_factor times larger. This
+        is repeated until one start remains, which has the full budget.
+        The budget of the fit (max_total_fev, max_duration) is shared by
+        the starts of a rung as they begin; the rungs stop when it is used.
+
+        Parameters
+        ----------
+        parameters_lst: list-lmfit.Parameters
+
+        Returns
+        -------
+        list-FitterResult (in the order of parameters_lst)
+        """
+        for fitter_method in self.methods:
+            if fitter_method.kwargs.get(cn.MAX_NFEV, None) is None:
+                raise ValueError("Successive halving requires %s for %s"
+                      % (cn.MAX_NFEV, fitter_method.method))
+        num_start = len(parameters_lst)
+        num_rung = int(np.ceil(np.log(num_start)/np.log(self.halving_factor)))
+        results = [None]*num_start
+        survivor_idxs = list(range(num_start))
+        for rung in range(num_rung + 1):
+            fraction = self.halving_factor**(rung - num_rung)
+            methods = [util.FitterppMethod(m.method, dict(m.kwargs),
+                  convergences=m.convergences) for m in self.methods]
+            for method in methods:
+                method.kwargs[cn.MAX_NFEV] = max(1,
+                      int(method.kwargs[cn.MAX_NFEV]*fraction))
+            # Continue from the best parameters of the previous rung
+            rung_parameters_lst = [parameters_lst[i] if results[i] is None
+                  else results[i].prm for i in survivor_idxs]
+            rung_results = self._fitStarts(methods, rung_parameters_lst)
+            for idx, result in zip(survivor_idxs, rung_results):
+                if result is not None:
+                    results[idx] = self._mergeFitterResult(results[idx],
+                          result)
+            if (self.monitor is not None) and self.monitor.is_cancelled:
+                break
+            if (self.budget is not None) and self.budget.isExhausted():
+                self.is_budget_limited = True
+                break
+            if self.is_target_reached:
+                # Starts of the later rungs, which have larger budgets
+                num_survivor = len(survivor_idxs)
+                for later_rung in range(rung + 1, num_rung + 1):
+                    num_survivor = int(np.ceil(num_survivor
+                          /self.halving_factor))
+                    self._skipStarts(num_survivor, rung_results,
+                          scale=self.halving_factor**(later_rung - rung))
+                break
+            # Keep the best starts
+            num_survivor = int(np.ceil(len(survivor_idxs)/self.halving_factor))
+            survivor_idxs = sorted(survivor_idxs,
+                  key=lambda i: results[i].rssq)[:num_survivor]
+        return results
+
+    @staticmethod
+    def _mergeFitterResult(result, other_result):
+        """
+        Combines the results of fitting a start twice. Statistics are
+        concatenated and the better fit is kept.
+
+        Parameters
+        ----------
+        result: FitterResult (may be None)
+        other_result: FitterResult
+
+        Returns
+        -------
+        FitterResult
+        """
+        if result is None:
+            return other_result
+        best_result = other_result
+        if result.rssq < other_result.rssq:
+            best_result = result
+        duration = None
+        if (result.duration is not None)  \
+              and (other_result.duration is not None):
+            duration = result.duration + other_result.duration
+        return FitterResult(mzr=best_result.mzr, rssq=best_result.rssq,
+              prm=best_result.prm, traces=result.traces + other_result.traces,
+              cache_stats=result.cache_stats + other_result.cache_stats,
+              num_evaluation=result.num_evaluation
+                  + other_result.num_evaluation,
+              timers=Fitterpp._concatenate(result.timers, other_result.timers),
+              saved_evaluations=Fitterpp._concatenate(
+                  result.saved_evaluations, other_result.saved_evaluations),
+              duration=duration,
+              is_budget_limited=result.is_budget_limited
+                  or other_result.is_budget_limited)
+
+    @staticmethod
+    def _concatenate(lst, other_lst):
+        """
+        Concatenates lists that may be None.
+
+        Parameters
+        ----------
+        lst: list (may be None)
+        other_lst: list (may be None)
+
+        Returns
+        -------
+        list (None if both are None)
+        """
+        if lst is None:
+            return other_lst
+        if other_lst is None:
+            return lst
+        return lst + other_lst
+
+    def _mapFitStart(self, executor, methods, parameters_lst, callback=None):
+        """
+        Fits the starts using an executor.
+
+        Parameters
+        ----------
+        executor: concurrent.futures.Executor
+        methods: list-FitterppMethod
+        parameters_lst: list-lmfit.Parameters
+        callback: Function (see _fitStarts)
+
+        Returns
+        -------
+        list-FitterResult (in the order of parameters_lst)
+        """
+        # Starts run concurrently, so each has the deadline of the fit
+        start_budget = None
+        if self.budget is not None:
+            start_budget = self.budget.makePart(len(parameters_lst),
+                  is_time_sliced=False)
+        is_stoppable = (self.monitor is not None)  \
+              or (self.budget is not None) or (self.target_rssq is not None)
+        # Aborts the starts that are running when the fit stops
+        manager = None
+        stop_event = None
+        if is_stoppable:
+            if isinstance(executor, concurrent.futures.ProcessPoolExecutor):
+                manager = multiprocessing.Manager()
+                stop_event = manager.Event()
+            else:
+                stop_event = threading.Event()
+        try:
+            return self._mapFitStartWithEvent(executor, methods,
+                  parameters_lst, start_budget, stop_event,
+                  callback=callback)
+        finally:
+            if manager is not None:
+                manager.shutdown()
+
+    def _mapFitStartWithEvent(self, executor, methods, parameters_lst,
+          start_budget, stop_event, callback=None):
+        """
+        Fits the starts using an executor. See _mapFitStart.
+
+        Parameters
+        ----------
+        start_budget: FitBudget (budget of each start)
+        stop_event: threading.Event/multiprocessing.Event
+            Set to abort the starts that are running.
+
+        Returns
+        -------
+        list-FitterResult (in the order of parameters_lst)
+        """
+        futures = [executor.submit(self._fitStart, self.function,
+              methods, p, self.is_collect, cache=self.cache,
+              jacobian=self.jacobian,
+              num_jacobian_worker=self.num_jacobian_worker,
+              max_trace_entry=self.max_trace_entry, trace_dir=self.trace_dir,
+              is_timed=self.is_timed, budget=start_budget,
+              target_rssq=self.target_rssq, stop_event=stop_event)
+              for p in parameters_lst]
+        if (callback is not None) or (stop_event is not None):
+            idx_dct = {f: i for i, f in enumerate(futures)}
+            for future in concurrent.futures.as_completed(futures):
+                if future.cancelled() or (future.result() is None):
+                    continue
+                result = future.result()
+                if callback is not None:
+                    callback(idx_dct[future], result)
+                if self.monitor is not None:
+                    self.monitor.report(idx_dct[future], methods[-1].method,
+                          result.num_evaluation, result.rssq)
+                is_stop = (self.monitor is not None)  \
+                      and self.monitor.is_cancelled
+                if self.budget is not None:
+                    self._addToBudget(copy.copy(start_budget), result, 0)
+                    if self.budget.isExhausted():
+                        self.is_budget_limited = True
+                        is_stop = True
+                is_stop = self._isTargetReached(result) or is_stop
+                if is_stop:
+                    # Starts that are running abort at their next evaluation
+                    stop_event.set()
+                    for other_future in futures:
+                        _ = other_future.cancel()
+        results = [None if f.cancelled() else f.result() for f in futures]
+        if self.is_target_reached:
+            self._skipStarts(len([r for r in results if r is None]), results)
+        return results
+
+    @staticmethod
+    def _fitStart(function, methods, parameters, is_collect, cache=None,
+          jacobian=None, num_jacobian_worker=None, max_trace_entry=None,
+          trace_dir=None, is_timed=False, monitor=None, start_idx=0,
+          budget=None, target_rssq=None, stop_event=None):
+        """
+        Runs the sequence of methods from one set of initial parameters.
+        The parameters found by a method are the initial values for the
+        next method.
+
+        Parameters
+        ----------
+        function: FitterFunction
+        methods: list-FitterppMethod
+        parameters: lmfit.Parameters (initial values)
+        is_collect: bool (collect statistics)
+        cache: EvaluationCache (shared by the methods)
+        jacobian: str (in cn.JACOBIAN_MODES or None for lmfit's calculation)
+        num_jacobian_worker: int (workers for thread and process jacobians)
+        max_trace_entry: int (evaluations of a trace kept in memory)
+        trace_dir: str (directory to which traces spill)
+        is_timed: bool (record the time of the phases of each method)
+        monitor: FitMonitor (progress and cancellation of the methods)
+        start_idx: int (index of the start reported to the monitor)
+        budget: FitBudget (evaluations and time of the start)
+        target_rssq: float (rssq at which the start stops)
+        stop_event: threading.Event/multiprocessing.Event
+            The start stops when the event is set (e.g., another start
+            reached target_rssq). The event is set when the start reaches
+            target_rssq.
+
+        Returns
+        -------
+        FitterResult (None if stop_event is set before the start begins)
+        """
+        if (stop_event is not None) and stop_event.is_set():
+            return None
+        if jacobian == cn.JACOBIAN_THREAD:
+            executor = concurrent.futures.ThreadPoolExecutor(
+                  max_workers=num_jacobian_worker)
+        elif jacobian == cn.JACOBIAN_PROCESS:
+            # Workers receive the function once
+            executor = ProcessExecutor(function,
+                  max_workers=num_jacobian_worker)
+        else:
+            return Fitterpp._fitMethods(function, methods, parameters,
+                  is_collect, cache, jacobian, None,
+                  max_trace_entry=max_trace_entry, trace_dir=trace_dir,
+                  is_timed=is_timed, monitor=monitor, start_idx=start_idx,
+                  budget=budget, target_rssq=target_rssq,
+                  stop_event=stop_event)
+        with executor:
+            return Fitterpp._fitMethods(function, methods, parameters,
+                  is_collect, cache, jacobian, executor,
+                  max_trace_entry=max_trace_entry, trace_dir=trace_dir,
+                  is_timed=is_timed, monitor=monitor, start_idx=start_idx,
+                  budget=budget, target_rssq=target_rssq,
+                  stop_event=stop_event)
+
+    @staticmethod
+    def _fitMethods(function, methods, parameters, is_collect, cache,
+          jacobian, executor, max_trace_entry=None, trace_dir=None,
+          is_timed=False, monitor=None, start_idx=0, budget=None,
+          target_rssq=None, stop_event=None):
+        """
+        Runs the sequence of methods. See _fitStart.
+
+        Parameters
+        ----------
+        executor: concurrent.futures.Executor (evaluates finite differences)
+
+        Returns
+        -------
+        FitterResult
+        """
+        start_time = time.time()
+        timer = None
+        timers = None
+        if is_timed:
+            timers = []
+            timer = PhaseTimer()
+            start_ns = time.perf_counter_ns()
+        result_params = parameters.copy()
+        if is_timed:
+            _ = timer.addSince(cn.PHASE_PARAMETERS, start_ns)
+        traces = []
+        cache_stats = []
+        saved_evaluations = []
+        num_evaluation = 0
+        minimizer_result = None
+        rssq = 1e10
+        # The budget lowered max_nfev, stopped a method or skipped methods
+        is_budget_limited = False
+        for method_idx, fitter_method in enumerate(methods):
+            method = fitter_method.method
+            kwargs = dict(fitter_method.kwargs)
+            method_budget = None
+            if (stop_event is not None) and stop_event.is_set():
+                break
+            if budget is not None:
+                if budget.isExhausted():
+                    is_budget_limited = True
+                    break
+                method_budget = budget.makePart(len(methods) - method_idx)
+                max_nfev = method_budget.max_evaluation
+                if max_nfev is not None:
+                    if kwargs.get(cn.MAX_NFEV, None) is not None:
+                        max_nfev = min(max_nfev, kwargs[cn.MAX_NFEV])
+                    if max_nfev != kwargs.get(cn.MAX_NFEV, None):
+                        is_budget_limited = True
+                    kwargs[cn.MAX_NFEV] = max_nfev
+                method_time = time.time()
+            if is_timed and (timer is None):
+                timer = PhaseTimer()
+                start_ns = time.perf_counter_ns()
+            if is_timed:
+                timer.method = method
+            wrapper_function = FunctionWrapper(function,
+                  is_collect=is_collect, cache=cache, executor=executor,
+                  max_trace_entry=max_trace_entry, trace_dir=trace_dir,
+                  timer=timer)
+            convergences = [c.copy() for c in fitter_method.convergences]
+            if target_rssq is not None:
+                convergences.append(TargetConvergence(target_rssq))
+            if function.is_vectorized  \
+                  and (method == cn.METHOD_DIFFERENTIAL_EVOLUTION):
+                minimizer_result = Fitterpp._minimizeVectorized(
+                      wrapper_function, result_params, kwargs,
+                      monitor=monitor, start_idx=start_idx,
+                      budget=method_budget, convergences=convergences,
+                      stop_event=stop_event)
+            else:
+                if (jacobian is not None)  \
+                      and (method in cn.JACOBIAN_KWARGS.keys()):
+                    jacobian_kwarg = cn.JACOBIAN_KWARGS[method]
+                    if kwargs.get(jacobian_kwarg, None) is None:
+                        kwargs[jacobian_kwarg] = wrapper_function.calcJacobian
+                iter_cb = Fitterpp._makeIterCallback(monitor, method_budget,
+                      start_idx, method, wrapper_function,
+                      convergences=convergences, stop_event=stop_event)
+                minimizer = lmfit.Minimizer(wrapper_function.execute,
+                      result_params, iter_cb=iter_cb)
+                try:
+                    minimizer_result = minimizer.minimize(method=method,
+                          **kwargs)
+                except AbortFitException:
+                    # Some methods (e.g., differential_evolution) evaluate
+                    # again after iter_cb stops them. The best parameters
+                    # are in wrapper_function.
+                    minimizer_result = minimizer.result
+            traces.append(wrapper_function.trace)
+            cache_stats.append((wrapper_function.numHit,
+                  wrapper_function.numMiss))
+            num_evaluation += wrapper_function.numEvaluation
+            num_saved = 0
+            if any(c.is_converged for c in convergences)  \
+                  and (kwargs.get(cn.MAX_NFEV, None) is not None):
+                num_saved = max(0,
+                      kwargs[cn.MAX_NFEV] - wrapper_function.numEvaluation)
+            saved_evaluations.append(num_saved)
+            if budget is not None:
+                budget.add(wrapper_function.numEvaluation,
+                      time.time() - method_time)
+                if method_budget.isExhausted(wrapper_function.numEvaluation):
+                    is_budget_limited = True
+            # Update the parameters
+            rssq = wrapper_function.rssq
+            if is_timed:
+                parameters_ns = time.perf_counter_ns()
+            if wrapper_function.bestParamDct is not None:
+                util.updateParameterValues(result_params,
+                      wrapper_function.bestParamDct)
+            if is_timed:
+                _ = timer.addSince(cn.PHASE_PARAMETERS, parameters_ns)
+                _ = timer.addSince(cn.PHASE_TOTAL, start_ns)
+                timers.append(timer)
+                timer = None
+            if monitor is not None:
+                monitor.report(start_idx, method,
+                      wrapper_function.numEvaluation, rssq)
+                if monitor.is_cancelled:
+                    break
+            if (target_rssq is not None) and (rssq <= target_rssq):
+                if stop_event is not None:
+                    stop_event.set()
+                break
+        return FitterResult(mzr=minimizer_result, rssq=rssq, prm=result_params,
+              traces=traces,
+              cache_stats=cache_stats, num_evaluation=num_evaluation,
+              timers=timers, saved_evaluations=saved_evaluations,
+              duration=time.time() - start_time,
+              is_budget_limited=is_budget_limited)
+
+    @staticmethod
+    def _makeIterCallback(monitor, budget, start_idx, method, wrapper_function,
+          convergences=None, stop_event=None):
+        """
+        Creates the iteration callback of lmfit.Minimizer that reports
+        progress and aborts the method if the fit is cancelled or stopped,
+        the budget of the method is used, or the method has converged.
+
+        Parameters
+        ----------
+        monitor: FitMonitor
+        budget: FitBudget (budget of the method)
+        start_idx: int
+        method: str
+        wrapper_function: FunctionWrapper
+        convergences: list-Convergence
+        stop_event: threading.Event/multiprocessing.Event
+
+        Returns
+        -------
+        Function (None if there is nothing to check)
+        """
+        if convergences is None:
+            convergences = []
+        if (monitor is None) and (budget is None) and (len(convergences) == 0)  \
+              and (stop_event is None):
+            return None
+        monitor_callback = None
+        if monitor is not None:
+            monitor_callback = monitor.makeIterCallback(start_idx, method,
+                  wrapper_function)
+        def iterCallback(params, iteration, resid, *args, **kwargs):
+            is_stop = False
+            if monitor_callback is not None:
+                is_stop = monitor_callback(params, iteration, resid, *args,
+                      **kwargs)
+            if budget is not None:
+                is_stop = is_stop  \
+                      or budget.isExhausted(wrapper_function.numEvaluation)
+            if stop_event is not None:
+                is_stop = is_stop or stop_event.is_set()
+            return Fitterpp._isConverged(convergences, wrapper_function)  \
+                  or is_stop
+        return iterCallback
+
+    @staticmethod
+    def _isConverged(convergences, wrapper_function):
+        """
+        Updates the convergence tests of a method.
+
+        Parameters
+        ----------
+        convergences: list-Convergence
+        wrapper_function: FunctionWrapper
+
+        Returns
+        -------
+        bool (some test has converged)
+        """
+        is_converged = False
+        for convergence in convergences:
+            # Update all tests so that each records its state
+            is_converged = convergence.update(wrapper_function.numEvaluation,
+                  wrapper_function.rssq) or is_converged
+        return is_converged
+
+    @staticmethod
+    def _minimizeVectorized(wrapper_function, parameters, kwargs,
+          monitor=None, start_idx=0, budget=None, convergences=None,
+          stop_event=None):
+        """
+        Does differential evolution using the vectorized mode of scipy so that
+        a population of candidates is evaluated in one call.
+
+        Parameters
+        ----------
+        wrapper_function: FunctionWrapper (with a vectorized function)
+        parameters: lmfit.Parameters (initial values)
+        kwargs: dict (keyword arguments for differential evolution)
+        monitor: FitMonitor (reports each generation; stops if cancelled)
+        start_idx: int (index of the start reported to the monitor)
+        budget: FitBudget (stops when the budget of the method is used)
+        convergences: list-Convergence (stop when the method has converged)
+        stop_event: threading.Event/multiprocessing.Event (stops when set)
+
+        Returns
+        -------
+        lmfit.MinimizerResult
+        """
+        import scipy.optimize
+        #
+        minimizer = lmfit.Minimizer(wrapper_function.execute, parameters)
+        result = minimizer.prepare_fit()
+        result.method = cn.METHOD_DIFFERENTIAL_EVOLUTION
+        names = wrapper_function._function.parameter_names
+        var_idxs = [names.index(n) for n in result.var_names]
+        base_arr = np.array([result.params[n].value for n in names])
+        bounds = [(result.params[n].min, result.params[n].max)
+              for n in result.var_names]
+        # Keyword arguments for scipy
+        de_kwargs = dict(popsize=15, polish=False, init="latinhypercube")
+        for key in ["strategy", "popsize", "tol", "mutation", "recombination",
+              "seed", "init", "atol"]:
+            if key in kwargs:
+                de_kwargs[key] = kwargs[key]
+        max_nfev = kwargs.get(cn.MAX_NFEV, None)
+        if max_nfev is not None:
+            population_size = de_kwargs["popsize"]*len(var_idxs)
+            de_kwargs["maxiter"] = max(1, max_nfev//population_size - 1)
+        #
+        def calcSSQs(x_arr):
+            # x_arr: varying parameters (rows) by candidates (columns)
+            x_arr = np.reshape(x_arr, (len(var_idxs), -1))
+            parameter_arr = np.tile(base_arr, (np.shape(x_arr)[1], 1))
+            parameter_arr[:, var_idxs] = x_arr.T
+            residuals_arr = wrapper_function.executeBatch(parameter_arr)
+            return np.sum(residuals_arr**2, axis=1)
+        #
+        if convergences is None:
+            convergences = []
+        if (monitor is not None) or (budget is not None)  \
+              or (len(convergences) > 0) or (stop_event is not None):
+            def callback(*_):
+                is_stop = False
+                if monitor is not None:
+                    monitor.report(start_idx, cn.METHOD_DIFFERENTIAL_EVOLUTION,
+                          wrapper_function.numEvaluation, wrapper_function.rssq)
+                    is_stop = monitor.is_cancelled
+                if budget is not None:
+                    is_stop = is_stop  \
+                          or budget.isExhausted(wrapper_function.numEvaluation)
+                if stop_event is not None:
+                    is_stop = is_stop or stop_event.is_set()
+                return Fitterpp._isConverged(convergences, wrapper_function)  \
+                      or is_stop
+            de_kwargs["callback"] = callback
+        ret = scipy.optimize.differential_evolution(calcSSQs, bounds,
+              vectorized=True, updating="deferred", **de_kwargs)
+        # Construct the lmfit result at the best parameters
+        for name, value in zip(result.var_names, np.atleast_1d(ret.x)):
+            result.params[name].value = value
+        result.x = np.atleast_1d(ret.x)
+        result.residual = wrapper_function.execute(result.params)
+        result.nfev = ret.nfev + 1
+        result.success = ret.success
+        result.message = ret.message
+        result.call_kws = {k: v for k, v in de_kwargs.items()
+              if k != "callback"}
+        result._calculate_statistics()
+        return result
 
     @staticmethod
-    def makeParameterCube(parameters, num_sample):
+    def makeParameterCube(parameters, num_sample, sampler=cn.SAMPLER_LHS,
+          seed=None):
         """
         Creates an lmfit.Parameters based on the number of Latin Cube samples desired.
 
@@ -254,51 +1615,115 @@ class Fitterpp():
         ----------
         parameters: lmfit.Parameters
         num_sample: int (number of values of each parameter)
+        sampler: str (in cn.SAMPLERS)
+        seed: int (seed of the sampler)
 
         Returns
         -------
         list-lmfit.Parameters
         """
-        parameters_lst = []
-        num_parameter = len(parameters.valuesdict())
-        samples = lhsmdu.sample(num_sample, num_parameter).tolist()
-        for sample in samples:
-            new_parameters = lmfit.Parameters()
-            for idx, name in enumerate(parameters.valuesdict().keys()):
-                parameter = parameters.get(name)
-                initial_value = parameter.min  \
-                      + sample[idx]*(parameter.max - parameter.min)
-                new_parameters.add(name=name, min=parameter.min, max=parameter.max,
-                      value=initial_value)
-            parameters_lst.append(new_parameters)
-        return parameters_lst
+        parameter_arr = Fitterpp._makeCubeArray(parameters, num_sample,
+              sampler=sampler, seed=seed)
+        return [Fitterpp._makeParameters(parameters, v) for v in parameter_arr]
 
     @staticmethod
-    def makeParametersFromLatincubeStrip(parameters, sample_idx):
+    def _makeCubeArray(parameters, num_sample, sampler=cn.SAMPLER_LHS,
+          seed=None):
         """
-        Creates an lmfit.Parameters based on the index of the Latin Cube sample.
+        Creates Latin Cube samples of parameter values.
 
         Parameters
         ----------
         parameters: lmfit.Parameters
-        sample_idx: int (1-based index into latin cube table)
+        num_sample: int (number of values of each parameter)
+        sampler: str (in cn.SAMPLERS)
+        seed: int (seed of the sampler)
+
+        Returns
+        -------
+        np.array (row is a sample; column is a parameter)
+        """
+        return start_generator.makeStartArray(parameters, num_sample,
+              sampler=sampler, seed=seed)
+
+    @staticmethod
+    def _makeParameters(parameters, values):
+        """
+        Creates an lmfit.Parameters with the bounds of parameters and
+        the specified values.
+
+        Parameters
+        ----------
+        parameters: lmfit.Parameters
+        values: list-float (in the order of parameters)
 
         Returns
         -------
         lmfit.Parameters
         """
-        indices = list(LATINCUBE_DF.loc[sample_idx, :].values)
-        num_parameter = len(parameters.valuesdict())
-        indices = indices[0:num_parameter]
         new_parameters = lmfit.Parameters()
-        for idx, name in enumerate(parameters.valuesdict().keys()):
+        for name, value in zip(parameters.valuesdict().keys(), values):
             parameter = parameters.get(name)
-            initial_value = parameter.min  \
-                  + indices[idx]*(parameter.max - parameter.min)
             new_parameters.add(name=name, min=parameter.min, max=parameter.max,
-                  value=initial_value)
+                  value=value)
         return new_parameters
 
+    def screen(self):
+        """
+        Evaluates the residual sum of squares of num_screen latin cube points
+        and selects the num_screen_top best points as starts.
+        The scores are saved in self.screening_df
+            index: position of the point in the latin cube
+            columns: parameter names, cn.RSSQ, cn.IS_STARTED
+            rows are sorted by cn.RSSQ
+
+        Returns
+        -------
+        list-lmfit.Parameters
+        """
+        parameter_arr = self._makeCubeArray(self.initial_params,
+              self.num_screen, sampler=self.sampler, seed=self.seed)
+        wrapper_function = FunctionWrapper(self.function)
+        rssqs = []
+        for idx in range(0, self.num_screen, cn.SCREEN_BATCH_SIZE):
+            residuals_arr = wrapper_function.executeBatch(
+                  parameter_arr[idx:idx+cn.SCREEN_BATCH_SIZE])
+            rssqs.extend(np.sum(residuals_arr**2, axis=1))
+        self.num_evaluation += wrapper_function.numEvaluation
+        rssqs = np.array(rssqs)
+        sort_idxs = np.argsort(rssqs, kind="stable")
+        num_top = min(self.num_screen_top, self.num_screen)
+        #
+        self.screening_df = pd.DataFrame(parameter_arr[sort_idxs, :],
+              columns=self.function.parameter_names, index=sort_idxs)
+        self.screening_df[cn.RSSQ] = rssqs[sort_idxs]
+        self.screening_df[cn.IS_STARTED] = np.arange(len(sort_idxs)) < num_top
+        return [self._makeParameters(self.initial_params, v)
+              for v in parameter_arr[sort_idxs[:num_top], :]]
+
+    @staticmethod
+    def makeParametersFromLatincubeStrip(parameters, sample_idx, seed=None):
+        """
+        Creates an lmfit.Parameters based on the index of the Latin Cube sample.
+
+        Parameters
+        ----------
+        parameters: lmfit.Parameters
+        sample_idx: int (1-based index into latin cube table)
+        seed: int (seed of the table; default is lc.TABLE_SEED)
+
+        Returns
+        -------
+        lmfit.Parameters
+        """
+        if seed is None:
+            seed = lc.TABLE_SEED
+        unit_arr = lc.getStrip(sample_idx, len(parameters), seed=seed)
+        values = start_generator.scale(unit_arr,
+              [p.min for p in parameters.values()],
+              [p.max for p in parameters.values()])
+        return Fitterpp._makeParameters(parameters, values)
+
     def report(self):
         """
         Reports the result of an optimization.
@@ -333,13 +1758,14 @@ class Fitterpp():
 
     @staticmethod
     def mkFitterppMethod(method_names=None, method_kwargs=None,
-          max_fev=cn.MAX_NFEV_DFT):
+          max_fev=cn.MAX_NFEV_DFT, convergences=None):
         """
         Constructs an FitterppMethod
         Parameters
         ----------
         method_names: list-str/str
         method_kwargs: list-dict/dict
+        convergences: Convergence/list-Convergence (stop each method)
 
         Returns
         -------
@@ -359,8 +1785,8 @@ class Fitterpp():
             del new_method_kwargs[cn.MAX_NFEV]
         method_kwargs = np.repeat(new_method_kwargs, len(method_names))
         #
-        results = [util.FitterppMethod(n, k) for n, k  \
-              in zip(method_names, method_kwargs)]
+        results = [util.FitterppMethod(n, k, convergences=convergences)
+              for n, k in zip(method_names, method_kwargs)]
         return results
 
     def plotPerformance(self, is_plot=True):
@@ -378,6 +1804,8 @@ class Fitterpp():
                 tot: total_times
                 cnt: counts
                 avg: averages
+                hit: cache hits (if there is a cache)
+                mis: cache misses (if there is a cache)
             index: method
 
         """
@@ -385,18 +1813,26 @@ class Fitterpp():
             msg = "Must construct with isCollect = True "
             msg += "to get performance plot."
             raise ValueError(msg)
+        import matplotlib.pyplot as plt
         # Compute statistics
         TOT = "tot"
         CNT = "cnt"
         AVG = "avg"
-        total_times = [sum(v) for v in self.performance_stats]
-        counts = [len(v) for v in self.performance_stats]
-        averages = [np.mean(v) for v in self.performance_stats]
+        HIT = "hit"
+        MISS = "mis"
+        # Statistics are calculated from the traces without copying
+        total_times = [t.sum(DURATION) for t in self.traces]
+        counts = [len(t) for t in self.traces]
+        averages = [t/c if c > 0 else np.nan
+              for t, c in zip(total_times, counts)]
         df = pd.DataFrame({
             TOT: total_times,
             CNT: counts,
             AVG: averages,
             })
+        if self.cache is not None:
+            df[HIT] = [v[0] for v in self.cache_stats]
+            df[MISS] = [v[1] for v in self.cache_stats]
         # Construct the index
         tick_names = [m.method for m in self.methods]
         tick_vals = list(range(len(tick_names)))
@@ -441,6 +1877,7 @@ class Fitterpp():
             msg = "Must construct with isCollect = True "
             msg += "to get quality plots."
             raise ValueError(msg)
+        import matplotlib.pyplot as plt
         _, axes = plt.subplots(1, len(self.methods))
         # Compute statistics
         dct = {self.methods[i].method: self.quality_stats[i]
@@ -502,25 +1939,22 @@ class Fitterpp():
 
         Returns
         -------
-        Function
+        FitterFunction
             Parameters: lmfit.Parameters
             Returns: array(float)
         """
-        kw_names = set(self.initial_params.valuesdict().keys())
-        def fitter_func(parameters):
-            dct  = parameters.valuesdict()
-            parameter_names = dct.keys()
-            diff = kw_names.symmetric_difference(parameter_names)
-            if len(diff) > 0:
-                msg = "Missing or extra keywards on call to fitter "
-                msg += "function: %s" % diff
-                raise ValueError(msg)
-            function_arr = self.user_function(is_dataframe=False, **dct)
-            function_arr = function_arr[:, self.function_common.column_idxs]
-            function_arr = function_arr[self.function_common.row_idxs, :]
-            function_arr = function_arr.flatten()
-            residuals = self.data_arr - function_arr
-            trues = [isinstance(v, float) for v in residuals.flatten()]
-            return residuals
-        #
-        return fitter_func
+        parameter_names = list(self.initial_params.valuesdict().keys())
+        gather_idxs = None
+        if not self.data_common.is_identical:
+            gather_idxs = GatherIndices(self.data_common.other_row_idxs,
+                  self.data_common.other_column_idxs,
+                  len(self.data_common.other_df.columns))
+        data_source = None
+        if self._isMappedDataArr():
+            data_source = self.data_df
+        return FitterFunction(self.user_function, parameter_names,
+              self.data_arr, gather_idxs,
+              is_vectorized=self.is_vectorized,
+              jacobian_function=self.jacobian_function,
+              is_declared_output=self.is_declared_output,
+              chunk_size=self.chunk_size, data_source=data_source)
@@ -0,0 +1,219 @@
+"""Fits one model to many datasets.
+
+Datasets with the same index and columns share the setup of Fitterpp
+(common indices and validation of the user function). The fits run in
+a worker pool, and results are provided as they complete. Each dataset
+has its own cache and checkpoint file.
+
+Usage
+-----
+batch = FitterppBatch(user_function, initial_params,
+      {"patient1": df1, "patient2": df2}, n_workers=4)
+for result in batch.iterFit():
+    print(result.key, result.rssq)
+batch.result_df  # Row for each dataset in the order of data_dfs
+"""
+
+from fitterpp import constants as cn
+from fitterpp.fitterpp import Fitterpp
+
+import collections
+import concurrent.futures
+import numpy as np
+import pandas as pd
+import re
+import time
+
+CHECKPOINT_FORMAT = "%s.%s"  # checkpoint_path, key of the dataset
+
+# Result of fitting one dataset
+#   key: key of the dataset
+#   params: lmfit.Parameters (None if the fit failed)
+#   rssq: float
+#   duration: float (seconds of fit)
+#   num_evaluation: int (evaluations of the user function)
+BatchResult = collections.namedtuple("BatchResult",
+      ["key", "params", "rssq", "duration", "num_evaluation"])
+
+
+def _fitDataset(key, fitter):
+    """
+    Fits a dataset.
+
+    Parameters
+    ----------
+    key: object (key of the dataset)
+    fitter: Fitterpp
+
+    Returns
+    -------
+    BatchResult
+    """
+    start_time = time.time()
+    fitter.fit()
+    return BatchResult(key=key, params=fitter.final_params,
+          rssq=fitter.rssq if fitter.final_params is not None else np.nan,
+          duration=time.time() - start_time,
+          num_evaluation=fitter.num_evaluation)
+
+
+class FitterppBatch():
+
+    def __init__(self, user_function, initial_params, data_dfs, n_workers=1,
+          executor=None, **kwargs):
+        """
+        Parameters
+        ----------
+        user_function: Function (see Fitterpp)
+        initial_params: lmfit.Parameters
+        data_dfs: dict/list-pd.DataFrame
+            dict: key is the key of the dataset
+            list: key is the position of the dataset
+        n_workers: int (number of processes used to fit the datasets)
+        executor: concurrent.futures.Executor (used to fit the datasets)
+        kwargs: dict (keyword arguments of Fitterpp)
+            cache: copied without entries for each dataset
+            checkpoint_path: CHECKPOINT_FORMAT for each dataset
+        """
+        if not isinstance(data_dfs, dict):
+            data_dfs = {n: d for n, d in enumerate(data_dfs)}
+        self.user_function = user_function
+        self.initial_params = initial_params
+        self.data_dfs = data_dfs
+        self.n_workers = n_workers
+        self.executor = executor
+        self.kwargs = kwargs
+        self.parameter_names = list(initial_params.valuesdict().keys())
+        # Outputs
+        self.results = {}  # key: key of dataset, value: BatchResult
+        self.result_df = None
+
+    def makeFitters(self):
+        """
+        Constructs a Fitterpp for each dataset. A dataset with the same
+        index and columns as an earlier dataset reuses its setup.
+
+        Returns
+        -------
+        dict (key: key of dataset, value: Fitterpp)
+        """
+        templates = []
+        fitter_dct = {}
+        for key, data_df in self.data_dfs.items():
+            checkpoint_path = self._makeCheckpointPath(key)
+            fitter = None
+            for template in templates:
+                if template.isSameStructure(data_df):
+                    fitter = template.copyWithData(data_df,
+                          checkpoint_path=checkpoint_path)
+                    break
+            if fitter is None:
+                kwargs = dict(self.kwargs, checkpoint_path=checkpoint_path)
+                if kwargs.get("cache", None) is not None:
+                    kwargs["cache"] = kwargs["cache"].makeEmptyCopy()
+                fitter = Fitterpp(self.user_function, self.initial_params,
+                      data_df, **kwargs)
+                templates.append(fitter)
+            fitter_dct[key] = fitter
+        return fitter_dct
+
+    def _makeCheckpointPath(self, key):
+        """
+        Constructs the checkpoint file of a dataset.
+
+        Parameters
+        ----------
+        key: object (key of the dataset)
+
+        Returns
+        -------
+        str (None if there is no checkpoint_path)
+        """
+        checkpoint_path = self.kwargs.get("checkpoint_path", None)
+        if checkpoint_path is None:
+            return None
+        return CHECKPOINT_FORMAT % (checkpoint_path,
+              re.sub(r"[^\w.-]", "_", str(key)))
+
+    def iterFit(self):
+        """
+        Fits the datasets, providing each result when it completes.
+        The results are also saved in self.results.
+
+        Returns
+        -------
+        iterator-BatchResult
+        """
+        fitter_dct = self.makeFitters()
+        if self.executor is not None:
+            yield from self._iterMap(self.executor, fitter_dct)
+        elif (self.n_workers > 1) and (len(fitter_dct) > 1):
+            with concurrent.futures.ProcessPoolExecutor(
+                  max_workers=self.n_workers) as executor:
+                yield from self._iterMap(executor, fitter_dct)
+        else:
+            for key, fitter in fitter_dct.items():
+                result = _fitDataset(key, fitter)
+                self.results[key] = result
+                yield result
+
+    def _iterMap(self, executor, fitter_dct):
+        """
+        Fits the datasets using an executor.
+
+        Parameters
+        ----------
+        executor: concurrent.futures.Executor
+        fitter_dct: dict (key: key of dataset, value: Fitterpp)
+
+        Returns
+        -------
+        iterator-BatchResult (in the order of completion)
+        """
+        futures = [executor.submit(_fitDataset, k, f)
+              for k, f in fitter_dct.items()]
+        for future in concurrent.futures.as_completed(futures):
+            result = future.result()
+            self.results[result.key] = result
+            yield result
+
+    def fit(self):
+        """
+        Fits the datasets. The result is self.result_df
+            index: key of dataset (in the order of data_dfs)
+            columns: parameter names, cn.RSSQ, cn.DURATION, cn.NUM_EVALUATION
+
+        Returns
+        -------
+        pd.DataFrame
+        """
+        for _ in self.iterFit():
+            pass
+        self.result_df = self.makeResultDF()
+        return self.result_df
+
+    def makeResultDF(self):
+        """
+        Tabulates the results of the datasets that are fit.
+
+        Returns
+        -------
+        pd.DataFrame (see fit)
+        """
+        rows = []
+        keys = [k for k in self.data_dfs.keys() if k in self.results]
+        for key in keys:
+            result = self.results[key]
+            if result.params is None:
+                row = {n: np.nan for n in self.parameter_names}
+            else:
+                row = dict(result.params.valuesdict())
+            row[cn.RSSQ] = result.rssq
+            row[cn.DURATION] = result.duration
+            row[cn.NUM_EVALUATION] = result.num_evaluation
+            rows.append(row)
+        columns = self.parameter_names + [cn.RSSQ, cn.DURATION,
+              cn.NUM_EVALUATION]
+        df = pd.DataFrame(rows, index=keys, columns=columns)
+        df.index.name = cn.DATASET
+        return df
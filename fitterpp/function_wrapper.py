@@ -1,18 +1,27 @@
 """Abstraction for a function that has parameters to fit."""
 
+from fitterpp import constants as cn
+from fitterpp.evaluation_trace import EvaluationTrace
 
+import numpy as np
+import os
+import socket
 import time
 
+REFERENCE_TIME_FILE = "reference_time_%s.txt"
+# Relative step used for finite difference jacobians
+FD_STEP = np.sqrt(np.finfo(float).eps)
+
 
 class FunctionWrapper:
     # Wraps a function used for fitting.
 
-    # Calculate reference time to adjust for CPU differences
-    base_time = time.process_time()
-    _ = sum(range(int(1e8)))  # Calculation
-    reference_time = time.process_time() - base_time
+    # Time for a reference calculation, used to adjust for CPU differences.
+    # Computed on first use and cached on disk for the host.
+    _reference_time = None
 
-    def __init__(self, function, is_collect=False):
+    def __init__(self, function, is_collect=False, cache=None, executor=None,
+          max_trace_entry=None, trace_dir=None, timer=None):
         """
         Parameters
         ----------
@@ -24,23 +33,98 @@ class FunctionWrapper:
                returns: np.array (residuals)
         is_collect: bool
             collect performance statistics on function execution
+        cache: EvaluationCache (previously calculated residuals)
+        executor: concurrent.futures.Executor (evaluates batches concurrently)
+        max_trace_entry: int (evaluations of the trace kept in memory)
+        trace_dir: str (directory to which the trace spills)
+        timer: PhaseTimer (wall clock time of the phases of evaluations)
         """
         self._function = function
         self.is_collect = is_collect
+        if self.is_collect:
+            self.reference_time = FunctionWrapper.getReferenceTime()
         # Results
-        self.perfStatistics = []  # durations of function executions
-        self.rssqStatistics = []  # residual sum of squares, a quality measure
+        # Durations, residual sum of squares and parameters of executions
+        self.trace = EvaluationTrace(max_entry=max_trace_entry,
+              spill_dir=trace_dir)
         self.rssq = 10e10
         self.bestParamDct = None
+        self.cache = cache
+        self.executor = executor
+        self.timer = timer
+        self.numJacobian = 0  # Calls to calcJacobian
+        self.numEvaluation = 0  # Evaluations of the function
+        self.numHit = 0  # Evaluations found in the cache
+        self.numMiss = 0  # Evaluations not found in the cache
+
+    @property
+    def perfStatistics(self):
+        # Durations of function executions
+        return self.trace.durations
+
+    @property
+    def rssqStatistics(self):
+        # Residual sum of squares, a quality measure
+        return self.trace.rssqs
+
+    @classmethod
+    def getReferenceTime(cls, cache_dir=None):
+        """
+        Provides the time of a reference calculation on this host.
+        The time is calculated on first use and cached on disk.
+
+        Parameters
+        ----------
+        cache_dir: str (directory of the cache file; default is cn.CACHE_DIR)
+
+        Returns
+        -------
+        float
+        """
+        if cls._reference_time is not None:
+            return cls._reference_time
+        if cache_dir is None:
+            cache_dir = cn.CACHE_DIR
+        path = os.path.join(cache_dir,
+              REFERENCE_TIME_FILE % socket.gethostname())
+        try:
+            with open(path, "r") as fd:
+                reference_time = float(fd.read())
+        except (OSError, ValueError):
+            reference_time = cls.calibrate()
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                tmp_path = "%s.%d" % (path, os.getpid())
+                with open(tmp_path, "w") as fd:
+                    fd.write(str(reference_time))
+                os.replace(tmp_path, path)
+            except OSError:
+                pass  # Caching is an optimization
+        cls._reference_time = reference_time
+        return reference_time
+
+    @staticmethod
+    def calibrate():
+        """
+        Measures the time of a reference calculation.
+
+        Returns
+        -------
+        float
+        """
+        base_time = time.process_time()
+        _ = sum(range(int(1e8)))  # Calculation
+        return time.process_time() - base_time
 
     @staticmethod
     def calcSSQ(arr):
-        return sum(arr**2)
+        arr = np.ravel(arr)
+        return np.dot(arr, arr)
 
     def execute(self, params, **kwargs):
         """
-        Runs the function using its keyword arguments.
-        Accumulates statistics.
+        Runs the function using its keyword arguments, or finds the result
+        in the cache. Accumulates statistics.
 
         Parameters
         ----------
@@ -53,7 +137,22 @@ class FunctionWrapper:
         """
         if self.is_collect:
             startTime = time.process_time()
-        result = self._function(params, **kwargs)
+        if self.timer is not None:
+            # Only functions that accept a timer are given one
+            kwargs = dict(kwargs, timer=self.timer)
+        if self.cache is None:
+            self.numEvaluation += 1
+            result = self._function(params, **kwargs)
+        else:
+            key = self.cache.makeKey(list(params.valuesdict().values()))
+            result = self.cache.get(key)
+            if result is None:
+                self.numMiss += 1
+                self.numEvaluation += 1
+                result = self._function(params, **kwargs)
+                self.cache.put(key, result)
+            else:
+                self.numHit += 1
         if self.is_collect:
             duration = (time.process_time() - startTime)/self.reference_time
         rssq = FunctionWrapper.calcSSQ(result)
@@ -61,6 +160,78 @@ class FunctionWrapper:
             self.rssq = rssq
             self.bestParamDct = dict(params.valuesdict())
         if self.is_collect:
-            self.perfStatistics.append(duration )
-            self.rssqStatistics.append(rssq)
+            self.trace.append(params.valuesdict(), rssq, duration)
         return result
+
+    def executeBatch(self, parameter_arr):
+        """
+        Runs the function for many candidate parameter values in one call.
+        Accumulates statistics for each candidate.
+        The function must provide calcResidualsBatch and parameter_names
+        (e.g., FitterFunction).
+
+        Parameters
+        ----------
+        parameter_arr: np.array (2d; row is a candidate; column is a parameter
+            in the order of function.parameter_names)
+
+        Returns
+        -------
+        np.array-float (2d; row is a candidate; column is a residual)
+        """
+        if self.is_collect:
+            startTime = time.process_time()
+        residuals_arr = self._function.calcResidualsBatch(parameter_arr,
+              executor=self.executor, timer=self.timer)
+        self.numEvaluation += len(residuals_arr)
+        if self.is_collect:
+            duration = (time.process_time() - startTime)/self.reference_time
+        rssqs = np.einsum("ij,ij->i", residuals_arr, residuals_arr)
+        idx = np.argmin(rssqs)
+        if rssqs[idx] < self.rssq:
+            self.rssq = rssqs[idx]
+            self.bestParamDct = dict(zip(self._function.parameter_names,
+                  parameter_arr[idx]))
+        if self.is_collect:
+            self.trace.extend(self._function.parameter_names, parameter_arr,
+                  rssqs, duration/len(rssqs))
+        return residuals_arr
+
+    def calcJacobian(self, params, **kwargs):
+        """
+        Calculates the jacobian of the residuals with respect to the varying
+        parameters. Uses the jacobian_function of the function if it has one.
+        Otherwise, calculates forward differences by evaluating the perturbed
+        parameter values in one call to executeBatch (which is concurrent if
+        there is an executor). Usable as the Dfun (jac) of
+        lmfit.Minimizer.leastsq (least_squares).
+
+        Parameters
+        ----------
+        params: lmfit.Parameters
+        kwargs: dict
+
+        Returns
+        -------
+        np.array-float (2d; row is a residual; column is a varying parameter)
+        """
+        names = self._function.parameter_names
+        var_idxs = [i for i, n in enumerate(names)
+              if params[n].vary and (params[n].expr is None)]
+        self.numJacobian += 1
+        if getattr(self._function, "jacobian_function", None) is not None:
+            return self._function.calcJacobian(params,
+                  timer=self.timer)[:, var_idxs]
+        values = np.array([params[n].value for n in names], dtype=float)
+        parameter_arr = np.tile(values, (len(var_idxs) + 1, 1))
+        steps = []
+        for pos, idx in enumerate(var_idxs):
+            step = FD_STEP*max(abs(values[idx]), 1.0)
+            # Stay within the bounds of the parameter
+            if values[idx] + step > params[names[idx]].max:
+                step = -step
+            parameter_arr[pos + 1, idx] += step
+            steps.append(parameter_arr[pos + 1, idx] - values[idx])
+        residuals_arr = self.executeBatch(parameter_arr)
+        jacobian = (residuals_arr[1:, :] - residuals_arr[0, :]).T
+        return jacobian/np.array(steps)
@@ -1,44 +1,129 @@
-"""Creates Latin Cube Entries
+"""Latin Cube Table
 
-Creates a CSV file whose rows are strips in the latin cube and whose
-columns are random numbers within the strp.
+The table has a row (strip) for each start and a column for each parameter.
+The values are random numbers in [0, 1).
 
+The table is stored in blocks of BLOCK_SIZE strips. Each block is a latin
+hypercube in a .npy file that is generated on first use, cached in
+cn.CACHE_DIR, and memory mapped. A column of a block is generated from
+(seed, block, column) so that the values of a strip do not depend on the
+number of strips or parameters used. Files are named by TABLE_VERSION,
+which changes if the generation changes.
 """
 
 import fitterpp.constants as cn
 
-import lhsmdu
 import os
 import pandas as pd
 import numpy as np
 
 
-NUM_PARAMETER = 500
-NUM_LATINCUBE = 10
-OUT_PATH = os.path.join(cn.DATA_DIR, "latin_cube.csv")
+TABLE_VERSION = 1
+TABLE_SEED = 0  # Default seed of the table
+BLOCK_SIZE = 1024  # Strips in a block
+NUM_PARAMETER = 500  # Minimum number of columns of a block
+NUM_LATINCUBE = 10  # Strips in the DataFrame provided by get
+BLOCK_FILE = "latin_cube_v%d_seed%d_block%d_width%d.npy"
+_latincube_df = None  # Table read on first access
+_block_dct = {}  # key: (seed, block, width), value: memory mapped array
 
 
-def make():
+def makeBlock(block_idx, num_parameter, seed=TABLE_SEED):
     """
-    Constructs the table of random numbers.
+    Constructs the values of a block.
+
+    Parameters
+    ----------
+    block_idx: int (0-based)
+    num_parameter: int (number of columns)
+    seed: int
+
+    Returns
+    -------
+    np.array (row is a strip; column is a parameter)
+    """
+    arr = np.empty((BLOCK_SIZE, num_parameter))
+    for column in range(num_parameter):
+        rng = np.random.default_rng([seed, block_idx, column])
+        # A random stratum of each strip
+        arr[:, column] = (rng.permutation(BLOCK_SIZE)
+              + rng.random(BLOCK_SIZE))/BLOCK_SIZE
+    return arr
+
+def getBlock(block_idx, num_parameter, seed=TABLE_SEED, cache_dir=None):
+    """
+    Provides the memory mapped values of a block, creating the file if needed.
+
+    Parameters
+    ----------
+    block_idx: int (0-based)
+    num_parameter: int (minimum number of columns)
+    seed: int
+    cache_dir: str (directory of the block files; default is cn.CACHE_DIR)
+
+    Returns
+    -------
+    np.array (row is a strip; column is a parameter)
+    """
+    width = max(num_parameter, NUM_PARAMETER)
+    key = (seed, block_idx, width)
+    if key in _block_dct:
+        return _block_dct[key]
+    if cache_dir is None:
+        cache_dir = cn.CACHE_DIR
+    path = os.path.join(cache_dir,
+          BLOCK_FILE % (TABLE_VERSION, seed, block_idx, width))
+    try:
+        arr = np.load(path, mmap_mode="r")
+    except (OSError, ValueError):
+        arr = makeBlock(block_idx, width, seed=seed)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = "%s.%d.npy" % (path, os.getpid())
+            np.save(tmp_path, arr)
+            os.replace(tmp_path, path)
+            arr = np.load(path, mmap_mode="r")
+        except OSError:
+            pass  # Use the values in memory
+    _block_dct[key] = arr
+    return arr
+
+def getStrip(strip_idx, num_parameter, seed=TABLE_SEED, cache_dir=None):
+    """
+    Provides the values of a strip. Only the block of the strip is read.
+
+    Parameters
+    ----------
+    strip_idx: int (1-based)
+    num_parameter: int
+    seed: int
+    cache_dir: str (directory of the block files)
+
+    Returns
+    -------
+    np.array (value for each parameter)
     """
-    samples = lhsmdu.sample(NUM_PARAMETER, NUM_LATINCUBE)
-    df = pd.DataFrame(samples).transpose()
-    df.to_csv(OUT_PATH, index=True)
+    if strip_idx < 1:
+        raise ValueError("Latin cube strips start at 1, not %d." % strip_idx)
+    block_idx, row = divmod(strip_idx - 1, BLOCK_SIZE)
+    arr = getBlock(block_idx, num_parameter, seed=seed, cache_dir=cache_dir)
+    return np.array(arr[row, :num_parameter])
 
-def read():
+def get():
     """
-    Returns a dataframe of table numbers.
+    Returns a dataframe of the first NUM_LATINCUBE strips, reading it on
+    first access.
     """
-    df = pd.read_csv(OUT_PATH)
-    del_columns = [c for c in df.columns if "Unnamed" in str(c)]
-    for column in del_columns:
-        del df[column]
-    df.index = range(1, len(df.index) + 1)
-    df.index.name = "strip"
-    return df
+    global _latincube_df
+    if _latincube_df is None:
+        arr = getBlock(0, NUM_PARAMETER)[:NUM_LATINCUBE, :]
+        df = pd.DataFrame(np.array(arr))
+        df.index = range(1, len(df.index) + 1)
+        df.index.name = "strip"
+        _latincube_df = df
+    return _latincube_df
 
 
 if __name__ == '__main__':
-    make()
-    print("***Latin cube written to %s" % OUT_PATH)
+    _ = getBlock(0, NUM_PARAMETER)
+    print("***Latin cube written to %s" % cn.CACHE_DIR)
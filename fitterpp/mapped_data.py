@@ -0,0 +1,147 @@
+"""Observational data in a memory mapped .npy file.
+
+MappedData is used in place of data_df for data that are too large to
+copy. If the labels of the output of the user function are the same as
+the labels of the data (e.g., declared with output_index=data.index and
+output_columns=data.columns), the observations are used directly from
+the mapped file and are not read into memory. Worker processes open the
+same file, so the pages of the data are shared instead of copied.
+
+Usage
+-----
+data = MappedData.fromParquet("data.parquet", "data.npy",
+      columns=["y1", "y2"])
+fitter = Fitterpp(user_function, params, data, output_index=data.index,
+      output_columns=data.columns, chunk_size=100000)
+"""
+
+import numpy as np
+import os
+import pandas as pd
+
+BATCH_SIZE = 1000000  # Rows of a parquet file read at once
+
+
+class MappedData():
+    # A 2d .npy file (row, column) that is memory mapped read only.
+    # Provides the parts of the interface of pd.DataFrame used by Fitterpp:
+    # index, columns, values and shape. An instance is pickled as the path
+    # of the file and its labels.
+
+    def __init__(self, path, index=None, columns=None):
+        """
+        Parameters
+        ----------
+        path: str (.npy file of float values)
+        index: list/pd.Index (row labels; default is the row position)
+        columns: list/pd.Index (column labels; default is the column position)
+        """
+        self.path = path
+        self.values = np.load(path, mmap_mode="r")
+        if self.values.ndim != 2:
+            raise ValueError("%s must have 2 dimensions, not %d."
+                  % (path, self.values.ndim))
+        num_row, num_column = self.values.shape
+        if index is None:
+            index = pd.RangeIndex(num_row)
+        if columns is None:
+            columns = pd.RangeIndex(num_column)
+        self.index = pd.Index(index)
+        self.columns = pd.Index(columns)
+        if (len(self.index) != num_row) or (len(self.columns) != num_column):
+            raise ValueError("Labels of %s do not have shape %s."
+                  % (path, str(self.values.shape)))
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state["values"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.values = np.load(self.path, mmap_mode="r")
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def toDataFrame(self):
+        """
+        Reads the data into memory.
+
+        Returns
+        -------
+        pd.DataFrame
+        """
+        return pd.DataFrame(np.array(self.values), index=self.index,
+              columns=self.columns)
+
+    @classmethod
+    def fromDataFrame(cls, path, data_df):
+        """
+        Writes the values of a DataFrame to path.
+
+        Parameters
+        ----------
+        path: str (.npy file)
+        data_df: pd.DataFrame
+
+        Returns
+        -------
+        MappedData
+        """
+        np.save(path, np.ascontiguousarray(data_df.values, dtype=float))
+        return cls(path, index=data_df.index, columns=data_df.columns)
+
+    @classmethod
+    def fromParquet(cls, parquet_path, path, columns=None, index_column=None,
+          batch_size=BATCH_SIZE):
+        """
+        Writes columns of a parquet file to path, reading batch_size rows at
+        a time. Requires pyarrow.
+
+        Parameters
+        ----------
+        parquet_path: str
+        path: str (.npy file)
+        columns: list-str (columns of the data; default is all columns
+            other than index_column)
+        index_column: str (column of row labels, which are kept in memory)
+        batch_size: int
+
+        Returns
+        -------
+        MappedData
+        """
+        import pyarrow.parquet
+        #
+        parquet_file = pyarrow.parquet.ParquetFile(parquet_path)
+        if columns is None:
+            columns = [n for n in parquet_file.schema_arrow.names
+                  if n != index_column]
+        read_columns = list(columns)
+        if index_column is not None:
+            read_columns.append(index_column)
+        num_row = parquet_file.metadata.num_rows
+        tmp_path = "%s.%d.npy" % (path, os.getpid())
+        arr = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=float,
+              shape=(num_row, len(columns)))
+        labels = []
+        row = 0
+        for batch in parquet_file.iter_batches(batch_size=batch_size,
+              columns=read_columns):
+            batch_df = batch.to_pandas()
+            arr[row:row + len(batch_df), :] = batch_df[columns].values
+            if index_column is not None:
+                labels.append(batch_df[index_column].values)
+            row += len(batch_df)
+        arr.flush()
+        del arr
+        os.replace(tmp_path, path)
+        index = None
+        if index_column is not None:
+            index = pd.Index(np.concatenate(labels), name=index_column)
+        return cls(path, index=index, columns=columns)
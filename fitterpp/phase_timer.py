@@ -0,0 +1,95 @@
+"""Wall clock time spent in the phases of a fit."""
+
+from fitterpp import constants as cn
+
+import time
+
+NS_TO_SEC = 1e-9
+
+
+class PhaseTimer():
+    # Accumulates the nanoseconds (time.perf_counter_ns) and the number of
+    # intervals for each phase in cn.PHASES. Timing is done only if a
+    # PhaseTimer is provided, so there is no cost when timing is disabled.
+
+    def __init__(self, method=None):
+        """
+        Parameters
+        ----------
+        method: str (fitting method that is timed; None for a whole fit)
+        """
+        self.method = method
+        self.ns_dct = {}  # key: phase, value: nanoseconds
+        self.count_dct = {}  # key: phase, value: number of intervals
+
+    def add(self, phase, ns, count=1):
+        """
+        Adds an interval to a phase.
+
+        Parameters
+        ----------
+        phase: str
+        ns: int (nanoseconds)
+        count: int (number of intervals)
+        """
+        self.ns_dct[phase] = self.ns_dct.get(phase, 0) + ns
+        self.count_dct[phase] = self.count_dct.get(phase, 0) + count
+
+    def addSince(self, phase, start_ns):
+        """
+        Adds the interval from start_ns to now.
+
+        Parameters
+        ----------
+        phase: str
+        start_ns: int (value of time.perf_counter_ns at the start)
+
+        Returns
+        -------
+        int (current value of time.perf_counter_ns)
+        """
+        now_ns = time.perf_counter_ns()
+        self.add(phase, now_ns - start_ns)
+        return now_ns
+
+    def merge(self, other):
+        """
+        Adds the times of another timer.
+
+        Parameters
+        ----------
+        other: PhaseTimer
+        """
+        for phase, ns in other.ns_dct.items():
+            self.add(phase, ns, count=other.count_dct[phase])
+
+    def getSeconds(self, phase):
+        """
+        Parameters
+        ----------
+        phase: str
+
+        Returns
+        -------
+        float
+        """
+        if phase == cn.PHASE_MINIMIZER:
+            # Time of the method that is not in another phase
+            ns = self.ns_dct.get(cn.PHASE_TOTAL, 0)  \
+                  - sum([self.ns_dct.get(p, 0) for p in cn.PHASES_MEASURED])
+            return max(ns, 0)*NS_TO_SEC
+        return self.ns_dct.get(phase, 0)*NS_TO_SEC
+
+    def getCount(self, phase):
+        """
+        Parameters
+        ----------
+        phase: str
+
+        Returns
+        -------
+        int
+        """
+        if phase == cn.PHASE_MINIMIZER:
+            phase = cn.PHASE_TOTAL
+        return self.count_dct.get(phase, 0)
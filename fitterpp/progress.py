@@ -0,0 +1,86 @@
+"""Progress and cancellation of a fit."""
+
+import collections
+import threading
+
+PROGRESS_INTERVAL = 100  # Evaluations between progress events of a method
+
+# Progress of a fit
+#   start: int (index of the start)
+#   method: str (method being run)
+#   num_evaluation: int (evaluations by the method)
+#   rssq: float (smallest residual sum of squares of the fit)
+ProgressEvent = collections.namedtuple("ProgressEvent",
+      ["start", "method", "num_evaluation", "rssq"])
+
+
+class FitMonitor():
+    # Reports the progress of a fit to a callback and requests that the fit
+    # stop. Starts that are fit in the same process report progress during
+    # the methods and stop the current method when cancelled. Starts fit by
+    # an executor report when they complete, and cancelling prevents
+    # starts that are not running from starting.
+
+    def __init__(self, callback=None, interval=PROGRESS_INTERVAL):
+        """
+        Parameters
+        ----------
+        callback: Function
+            Parameters
+                ProgressEvent
+        interval: int (evaluations between progress events of a method)
+        """
+        self.callback = callback
+        self.interval = interval
+        self.rssq = None  # Smallest residual sum of squares reported
+        self._cancel_event = threading.Event()
+
+    @property
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        """
+        Requests that the fit stop.
+        """
+        self._cancel_event.set()
+
+    def report(self, start, method, num_evaluation, rssq):
+        """
+        Reports progress.
+
+        Parameters
+        ----------
+        start: int (index of the start)
+        method: str
+        num_evaluation: int
+        rssq: float
+        """
+        if (self.rssq is None) or (rssq < self.rssq):
+            self.rssq = rssq
+        if self.callback is not None:
+            self.callback(ProgressEvent(start=start, method=method,
+                  num_evaluation=num_evaluation, rssq=self.rssq))
+
+    def makeIterCallback(self, start, method, wrapper_function):
+        """
+        Creates the iteration callback of lmfit.Minimizer (iter_cb) for a
+        method. The callback reports progress and aborts the minimization
+        if the fit is cancelled.
+
+        Parameters
+        ----------
+        start: int (index of the start)
+        method: str
+        wrapper_function: FunctionWrapper
+
+        Returns
+        -------
+        Function
+        """
+        def iterCallback(params, iteration, resid, *args, **kwargs):
+            if (iteration > 0) and (iteration % self.interval == 0):
+                self.report(start, method, wrapper_function.numEvaluation,
+                      wrapper_function.rssq)
+            return self.is_cancelled
+        return iterCallback
@@ -0,0 +1,258 @@
+"""Store of fit results keyed on fingerprints of the model and the data."""
+
+import contextlib
+import hashlib
+import numpy as np
+import pandas as pd
+import pickle
+import sqlite3
+import time
+
+SKETCH_SIZE = 1000  # Maximum number of data values used to compare data
+TABLE = "results"
+SCHEMA = """CREATE TABLE IF NOT EXISTS %s (
+    model_key TEXT, structure_key TEXT, data_key TEXT,
+    sketch BLOB, params BLOB, rssq REAL, used REAL,
+    PRIMARY KEY (model_key, structure_key, data_key))""" % TABLE
+
+
+def _hash(*values):
+    """
+    Hashes bytes and strings.
+
+    Parameters
+    ----------
+    values: bytes/str
+
+    Returns
+    -------
+    str
+    """
+    hasher = hashlib.sha256()
+    for value in values:
+        if isinstance(value, str):
+            value = value.encode()
+        hasher.update(value)
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+def fingerprintModel(user_function, parameters):
+    """
+    Fingerprints a user function and the bounds of its parameters. The
+    fingerprint of the function is its name, its byte code and (if it can
+    be pickled) its state.
+
+    Parameters
+    ----------
+    user_function: Function
+    parameters: lmfit.Parameters
+
+    Returns
+    -------
+    str
+    """
+    function_type = type(user_function)
+    code = getattr(user_function, "__code__", None)
+    if code is None:
+        code = getattr(getattr(function_type, "__call__", None),
+              "__code__", None)
+    values = [getattr(user_function, "__module__", function_type.__module__),
+          getattr(user_function, "__qualname__", function_type.__qualname__)]
+    if code is not None:
+        values.extend([code.co_code, repr(code.co_consts)])
+    try:
+        values.append(pickle.dumps(user_function))
+    except Exception:
+        pass  # The state of the function is not included
+    for name, parameter in parameters.items():
+        values.append("%s %r %r %r" % (name, parameter.min, parameter.max,
+              parameter.vary))
+    return _hash(*values)
+
+def fingerprintStructure(data_df):
+    """
+    Fingerprints the index and columns of data.
+
+    Parameters
+    ----------
+    data_df: pd.DataFrame
+
+    Returns
+    -------
+    str
+    """
+    return _hash(pd.util.hash_pandas_object(data_df.index).values.tobytes(),
+          pd.util.hash_pandas_object(data_df.columns).values.tobytes())
+
+def fingerprintData(data_df):
+    """
+    Fingerprints the values of data.
+
+    Parameters
+    ----------
+    data_df: pd.DataFrame
+
+    Returns
+    -------
+    str
+    """
+    return _hash(np.ascontiguousarray(data_df.values, dtype=float).tobytes())
+
+def makeSketch(data_df):
+    """
+    Selects at most SKETCH_SIZE data values at fixed positions. Sketches of
+    data with the same structure are compared to find similar data.
+
+    Parameters
+    ----------
+    data_df: pd.DataFrame
+
+    Returns
+    -------
+    np.array-float
+    """
+    arr = np.ravel(np.asarray(data_df.values, dtype=float))
+    if len(arr) > SKETCH_SIZE:
+        arr = arr[np.linspace(0, len(arr) - 1, SKETCH_SIZE).astype(int)]
+    return np.nan_to_num(arr)
+
+
+class ResultStore():
+    # SQLite file of the parameter values and rssq of fits. An entry is
+    # keyed on the fingerprints of the model (user function and parameter
+    # bounds), the structure of the data (index and columns), and the data
+    # values. Entries of the same model and structure are compared by the
+    # distance between sketches of their data. The store is bounded by the
+    # number of entries; the least recently used are evicted.
+    #
+    # A connection is opened for each operation so that the store can be
+    # used by worker processes.
+
+    def __init__(self, path, max_entry=10000):
+        """
+        Parameters
+        ----------
+        path: str (path of the SQLite file)
+        max_entry: int (maximum number of entries)
+        """
+        self.path = path
+        self.max_entry = max_entry
+        # Statistics
+        self.num_hit = 0
+        self.num_miss = 0
+        self.num_evict = 0
+        with self._connect() as connection:
+            connection.execute(SCHEMA)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        # Connection whose changes are committed on success
+        connection = sqlite3.connect(self.path, timeout=60)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def __len__(self):
+        with self._connect() as connection:
+            return connection.execute("SELECT COUNT(*) FROM %s"
+                  % TABLE).fetchone()[0]
+
+    @staticmethod
+    def makeKeys(user_function, parameters, data_df):
+        """
+        Creates the keys of a fit.
+
+        Parameters
+        ----------
+        user_function: Function
+        parameters: lmfit.Parameters
+        data_df: pd.DataFrame
+
+        Returns
+        -------
+        tuple-str (model_key, structure_key, data_key)
+        """
+        return (fingerprintModel(user_function, parameters),
+              fingerprintStructure(data_df), fingerprintData(data_df))
+
+    def get(self, keys):
+        """
+        Finds the result of a fit with the same model and data.
+
+        Parameters
+        ----------
+        keys: tuple-str (see makeKeys)
+
+        Returns
+        -------
+        np.array-float (parameter values; None if there is no entry)
+        float (rssq)
+        """
+        with self._connect() as connection:
+            row = connection.execute("SELECT params, rssq FROM %s "
+                  "WHERE model_key=? AND structure_key=? AND data_key=?"
+                  % TABLE, keys).fetchone()
+            if row is None:
+                self.num_miss += 1
+                return None, None
+            self.num_hit += 1
+            connection.execute("UPDATE %s SET used=? WHERE model_key=? "
+                  "AND structure_key=? AND data_key=?" % TABLE,
+                  (time.time(),) + tuple(keys))
+        return np.frombuffer(row[0], dtype=float).copy(), row[1]
+
+    def getNearest(self, keys, data_df, num_entry=1):
+        """
+        Finds the results of fits of the same model whose data have the
+        same structure and are closest to data_df.
+
+        Parameters
+        ----------
+        keys: tuple-str (see makeKeys)
+        data_df: pd.DataFrame
+        num_entry: int (maximum number of results)
+
+        Returns
+        -------
+        list-np.array (parameter values from the closest data)
+        """
+        with self._connect() as connection:
+            rows = connection.execute("SELECT sketch, params FROM %s "
+                  "WHERE model_key=? AND structure_key=?" % TABLE,
+                  keys[:2]).fetchall()
+        if len(rows) == 0:
+            return []
+        sketch = makeSketch(data_df)
+        distances = [np.linalg.norm(np.frombuffer(r[0], dtype=float) - sketch)
+              for r in rows]
+        idxs = np.argsort(distances, kind="stable")[:num_entry]
+        return [np.frombuffer(rows[i][1], dtype=float).copy() for i in idxs]
+
+    def put(self, keys, data_df, values, rssq):
+        """
+        Records the result of a fit, evicting the least recently used
+        entries if there are more than max_entry.
+
+        Parameters
+        ----------
+        keys: tuple-str (see makeKeys)
+        data_df: pd.DataFrame
+        values: array-float (parameter values)
+        rssq: float
+        """
+        params = np.asarray(values, dtype=float).tobytes()
+        with self._connect() as connection:
+            connection.execute("INSERT OR REPLACE INTO %s "
+                  "VALUES (?, ?, ?, ?, ?, ?, ?)" % TABLE,
+                  tuple(keys) + (makeSketch(data_df).tobytes(), params,
+                  float(rssq), time.time()))
+            num_entry = connection.execute("SELECT COUNT(*) FROM %s"
+                  % TABLE).fetchone()[0]
+            num_evict = num_entry - self.max_entry
+            if num_evict > 0:
+                connection.execute("DELETE FROM %s WHERE rowid IN "
+                      "(SELECT rowid FROM %s ORDER BY used LIMIT ?)"
+                      % (TABLE, TABLE), (num_evict,))
+                self.num_evict += num_evict
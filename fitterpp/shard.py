@@ -0,0 +1,211 @@
+"""Fits strips of the latin cube as shards that are run on separate nodes.
+
+A shard is a range of latin cube strips (1-based, inclusive). Fitting a shard
+writes one checkpoint file per strip in the output directory. Shards can be
+run concurrently on different nodes that share the output directory, and a
+shard that is rerun skips the strips that are already fit. The merge step
+combines the strip files into the global best fit with the statistics of
+all strips.
+
+The model is a python module (an importable name or the path of a .py file)
+that defines:
+    user_function: the user function of Fitterpp
+    initial_params: lmfit.Parameters
+The data file is a CSV file (first column is the index) or a pickled
+DataFrame (.pkl).
+
+Usage:
+    python -m fitterpp.shard fit --model model.py --data data.csv
+          --first 1 --last 5 --out_dir results
+    python -m fitterpp.shard merge --out_dir results
+"""
+
+from fitterpp import constants as cn
+from fitterpp.checkpoint import Checkpoint
+from fitterpp.fitterpp import Fitterpp
+
+import argparse
+import glob
+import importlib
+import importlib.util
+import lmfit
+import os
+import pandas as pd
+import re
+import sys
+
+STRIP_FILE = "strip_%06d.ckpt"
+STRIP_PATTERN = re.compile(r"strip_(\d+)\.ckpt$")
+MERGE_FILE = "merged.ckpt"
+USER_FUNCTION = "user_function"
+INITIAL_PARAMS = "initial_params"
+
+
+def loadModel(model):
+    """
+    Imports the module that describes the model.
+
+    Parameters
+    ----------
+    model: str (module name or path of a .py file)
+
+    Returns
+    -------
+    module
+    """
+    if model.endswith(".py"):
+        name = os.path.splitext(os.path.basename(model))[0]
+        spec = importlib.util.spec_from_file_location(name, model)
+        module = importlib.util.module_from_spec(spec)
+        # Registering the module allows the user function to be pickled
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    else:
+        module = importlib.import_module(model)
+    for attribute in [USER_FUNCTION, INITIAL_PARAMS]:
+        if not hasattr(module, attribute):
+            raise ValueError("Model %s does not define %s."
+                  % (model, attribute))
+    return module
+
+def readData(path):
+    """
+    Reads the observational data.
+
+    Parameters
+    ----------
+    path: str (.csv or .pkl)
+
+    Returns
+    -------
+    pd.DataFrame
+    """
+    if path.endswith(".pkl"):
+        return pd.read_pickle(path)
+    return pd.read_csv(path, index_col=0)
+
+def fitShard(model, data_path, first_idx, last_idx, out_dir, **kwargs):
+    """
+    Fits the strips of a shard, writing a checkpoint for each strip.
+    Strips that are already fit are skipped.
+
+    Parameters
+    ----------
+    model: str (module name or path of a .py file)
+    data_path: str
+    first_idx: int (first strip of the latin cube)
+    last_idx: int (last strip, inclusive)
+    out_dir: str
+    kwargs: dict (optional keyword arguments of Fitterpp)
+
+    Returns
+    -------
+    list-str (paths of the strip files)
+    """
+    if first_idx > last_idx:
+        raise ValueError("First strip %d is after the last strip %d."
+              % (first_idx, last_idx))
+    module = loadModel(model)
+    data_df = readData(data_path)
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for strip_idx in range(first_idx, last_idx + 1):
+        path = os.path.join(out_dir, STRIP_FILE % strip_idx)
+        fitter = Fitterpp(module.user_function, module.initial_params,
+              data_df, latincube_idx=strip_idx, checkpoint_path=path,
+              **kwargs)
+        fitter.fit(is_resume=True)
+        paths.append(path)
+    return paths
+
+def mergeShards(out_dir, out_path=None):
+    """
+    Merges the strip files in a directory. The statistics are
+    concatenated in the order of the strips and the best fit is kept.
+
+    Parameters
+    ----------
+    out_dir: str (directory with the strip files)
+    out_path: str
+        where the merged checkpoint is written; the results are keyed by
+        strip. Not written if None.
+
+    Returns
+    -------
+    int (strip with the best fit)
+    FitterResult
+    """
+    strip_dct = {}
+    for path in glob.glob(os.path.join(out_dir, "strip_*.ckpt")):
+        match = STRIP_PATTERN.search(path)
+        if match is None:
+            continue
+        checkpoint = Checkpoint.read(path)
+        if len(checkpoint.results) == 0:
+            continue
+        strip_dct[int(match.group(1))] = checkpoint
+    if len(strip_dct) == 0:
+        raise ValueError("No strips are fit in %s." % out_dir)
+    strip_idxs = sorted(strip_dct.keys())
+    parameters = lmfit.Parameters()
+    for name in strip_dct[strip_idxs[0]].parameter_names:
+        parameters.add(name)
+    merged_result = None
+    best_strip_idx = None
+    for strip_idx in strip_idxs:
+        result = Fitterpp.makeCheckpointResult(
+              strip_dct[strip_idx].best_result, parameters)
+        if (merged_result is None) or (result.rssq < merged_result.rssq):
+            best_strip_idx = strip_idx
+        merged_result = Fitterpp._mergeFitterResult(merged_result, result)
+    if out_path is not None:
+        first_checkpoint = strip_dct[strip_idxs[0]]
+        checkpoint = Checkpoint(out_path, first_checkpoint.parameter_names,
+              [strip_dct[i].initial_arr[0] for i in strip_idxs])
+        checkpoint.results = {i: strip_dct[i].best_result for i in strip_idxs}
+        checkpoint.write()
+    return best_strip_idx, merged_result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+          description="Fit latin cube strips as shards and merge them.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    fit_parser = subparsers.add_parser("fit", help="fit a range of strips")
+    fit_parser.add_argument("--model", required=True,
+          help="module name or .py file with user_function and initial_params")
+    fit_parser.add_argument("--data", required=True,
+          help="CSV (first column is the index) or pickled DataFrame")
+    fit_parser.add_argument("--first", type=int, required=True,
+          help="first strip (1-based)")
+    fit_parser.add_argument("--last", type=int, required=True,
+          help="last strip (inclusive)")
+    fit_parser.add_argument("--out_dir", required=True)
+    fit_parser.add_argument("--method_names", nargs="+", default=None,
+          help="fitting methods (default: %s)"
+          % " ".join(cn.METHOD_FITTER_DEFAULTS))
+    fit_parser.add_argument("--max_fev", type=int, default=cn.MAX_NFEV_DFT)
+    merge_parser = subparsers.add_parser("merge",
+          help="find the best fit of the strips")
+    merge_parser.add_argument("--out_dir", required=True)
+    merge_parser.add_argument("--out_path", default=None,
+          help="merged result file (default: %s in out_dir)" % MERGE_FILE)
+    args = parser.parse_args(argv)
+    if args.command == "fit":
+        paths = fitShard(args.model, args.data, args.first, args.last,
+              args.out_dir, method_names=args.method_names,
+              max_fev=args.max_fev)
+        print("Wrote %d strips to %s" % (len(paths), args.out_dir))
+    else:
+        out_path = args.out_path
+        if out_path is None:
+            out_path = os.path.join(args.out_dir, MERGE_FILE)
+        strip_idx, result = mergeShards(args.out_dir, out_path=out_path)
+        print("Best strip: %d" % strip_idx)
+        print("rssq: %g" % result.rssq)
+        for name, value in result.prm.valuesdict().items():
+            print("%s: %g" % (name, value))
+        print("Wrote %s" % out_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""Generates the initial values of starts.
+
+Samples are generated in the unit hypercube (row is a sample; column is a
+parameter) and scaled to the bounds of the parameters in one array
+operation. The samplers are in cn.SAMPLERS. All but cn.SAMPLER_LHSMDU are
+vectorized and seedable.
+"""
+
+import fitterpp.constants as cn
+
+import numpy as np
+import warnings
+
+NUM_MAXIMIN_CANDIDATE = 10  # Latin hypercubes considered by maximin
+MAX_MAXIMIN_SAMPLE = 1000  # Samples used to estimate the minimum distance
+
+
+def sample(num_sample, num_parameter, sampler=cn.SAMPLER_LHS, seed=None):
+    """
+    Generates samples in the unit hypercube.
+
+    Parameters
+    ----------
+    num_sample: int
+    num_parameter: int
+    sampler: str (in cn.SAMPLERS)
+    seed: int/np.random.Generator
+
+    Returns
+    -------
+    np.array (row is a sample; column is a parameter)
+    """
+    rng = np.random.default_rng(seed)
+    if sampler == cn.SAMPLER_LHS:
+        return _sampleLHS(num_sample, num_parameter, rng)
+    if sampler == cn.SAMPLER_MAXIMIN:
+        return _sampleMaximin(num_sample, num_parameter, rng)
+    if sampler in [cn.SAMPLER_SOBOL, cn.SAMPLER_HALTON]:
+        import scipy.stats.qmc
+        if sampler == cn.SAMPLER_SOBOL:
+            engine = scipy.stats.qmc.Sobol(num_parameter, scramble=True,
+                  seed=rng)
+        else:
+            engine = scipy.stats.qmc.Halton(num_parameter, scramble=True,
+                  seed=rng)
+        with warnings.catch_warnings():
+            # Sobol warns if num_sample is not a power of 2
+            warnings.simplefilter("ignore")
+            return engine.random(num_sample)
+    if sampler == cn.SAMPLER_LHSMDU:
+        import lhsmdu
+        return np.array(lhsmdu.sample(num_parameter, num_sample)).T
+    raise ValueError("Invalid sampler: %s" % str(sampler))
+
+def _sampleLHS(num_sample, num_parameter, rng):
+    """
+    Creates a latin hypercube. Each parameter has one sample in each of
+    num_sample equal strata.
+
+    Parameters
+    ----------
+    num_sample: int
+    num_parameter: int
+    rng: np.random.Generator
+
+    Returns
+    -------
+    np.array (row is a sample; column is a parameter)
+    """
+    # Random permutation of the strata for each parameter
+    strata_arr = np.argsort(rng.random((num_parameter, num_sample)),
+          axis=1).T
+    return (strata_arr + rng.random((num_sample, num_parameter)))/num_sample
+
+def _sampleMaximin(num_sample, num_parameter, rng):
+    """
+    Chooses the latin hypercube with the largest minimum distance between
+    samples among NUM_MAXIMIN_CANDIDATE hypercubes. The minimum distance is
+    estimated on at most MAX_MAXIMIN_SAMPLE samples.
+
+    Parameters
+    ----------
+    num_sample: int
+    num_parameter: int
+    rng: np.random.Generator
+
+    Returns
+    -------
+    np.array (row is a sample; column is a parameter)
+    """
+    num_subsample = min(num_sample, MAX_MAXIMIN_SAMPLE)
+    best_arr = None
+    best_distance = -1
+    for _ in range(NUM_MAXIMIN_CANDIDATE):
+        arr = _sampleLHS(num_sample, num_parameter, rng)
+        if num_subsample < 2:
+            return arr
+        sub_arr = arr[rng.choice(num_sample, num_subsample, replace=False)]
+        # Squared distances between the samples
+        norms = np.einsum("ij,ij->i", sub_arr, sub_arr)
+        distance_arr = norms[:, np.newaxis] + norms[np.newaxis, :]  \
+              - 2*np.matmul(sub_arr, sub_arr.T)
+        np.fill_diagonal(distance_arr, np.inf)
+        distance = np.min(distance_arr)
+        if distance > best_distance:
+            best_distance = distance
+            best_arr = arr
+    return best_arr
+
+def scale(unit_arr, mins, maxs):
+    """
+    Scales samples in the unit hypercube to the bounds of the parameters.
+
+    Parameters
+    ----------
+    unit_arr: np.array (row is a sample; column is a parameter)
+    mins: array-float (lower bound of each parameter)
+    maxs: array-float (upper bound of each parameter)
+
+    Returns
+    -------
+    np.array
+    """
+    mins = np.asarray(mins, dtype=float)
+    return mins + unit_arr*(np.asarray(maxs, dtype=float) - mins)
+
+def makeStartArray(parameters, num_sample, sampler=cn.SAMPLER_LHS, seed=None):
+    """
+    Generates initial values within the bounds of the parameters.
+
+    Parameters
+    ----------
+    parameters: lmfit.Parameters
+    num_sample: int
+    sampler: str (in cn.SAMPLERS)
+    seed: int/np.random.Generator
+
+    Returns
+    -------
+    np.array (row is a sample; column is a parameter in the order of
+        parameters)
+    """
+    unit_arr = sample(num_sample, len(parameters), sampler=sampler,
+          seed=seed)
+    mins = [p.min for p in parameters.values()]
+    maxs = [p.max for p in parameters.values()]
+    return scale(unit_arr, mins, maxs)
@@ -239,6 +239,18 @@ class FitterppMethod():
 
     """Container for optimization information"""
 
-    def __init__(self, method, kwargs):
+    def __init__(self, method, kwargs, convergences=None):
+        """
+        Parameters
+        ----------
+        method: str
+        kwargs: dict (keyword arguments of the method)
+        convergences: Convergence/list-Convergence (stop the method)
+        """
         self.method = method
         self.kwargs = dict(kwargs)
+        if convergences is None:
+            convergences = []
+        elif not isinstance(convergences, list):
+            convergences = [convergences]
+        self.convergences = list(convergences)
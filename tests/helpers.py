@@ -5,8 +5,15 @@ Created on July 21, 2022
 @author: joseph-hellerstein
 """
 
+import fitterpp.constants as cn
+from fitterpp import latin_cube as lc
+
 from numpy.testing import assert_array_equal
 import numpy as np
+import os
+import tempfile
+
+CACHE_DIR_ENV = "FITTERPP_CACHE_DIR"
 
 def isArrayEqual(arr1, arr2):
     """
@@ -26,3 +33,27 @@ def isArrayEqual(arr1, arr2):
         return True
     except:
         return False
+
+
+class TemporaryCacheDir():
+    # Points the cache of fitterpp (cn.CACHE_DIR) at a temporary directory,
+    # also for subprocesses, so that tests do not write to the cache of
+    # the user.
+
+    def __init__(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.name = self.tmp_dir.name
+        self._cache_dir = cn.CACHE_DIR
+        self._environ_dir = os.environ.get(CACHE_DIR_ENV, None)
+        cn.CACHE_DIR = self.name
+        os.environ[CACHE_DIR_ENV] = self.name
+
+    def cleanup(self):
+        cn.CACHE_DIR = self._cache_dir
+        if self._environ_dir is None:
+            del os.environ[CACHE_DIR_ENV]
+        else:
+            os.environ[CACHE_DIR_ENV] = self._environ_dir
+        # Blocks are mapped from files in the directory
+        lc._block_dct.clear()
+        self.tmp_dir.cleanup()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Created on July 4, 2022
+
+@author: joseph-hellerstein
+"""
+
+from fitterpp.budget import FitBudget
+
+import time
+import unittest
+
+
+IGNORE_TEST = False
+IS_PLOT = False
+
+
+################ TEST CLASSES #############
+class TestFitBudget(unittest.TestCase):
+
+    def testUnlimited(self):
+        if IGNORE_TEST:
+            return
+        budget = FitBudget()
+        budget.add(1000, 1.0)
+        self.assertFalse(budget.isExhausted())
+        self.assertIsNone(budget.allocate(3))
+
+    def testEvaluations(self):
+        if IGNORE_TEST:
+            return
+        budget = FitBudget(max_evaluation=100)
+        self.assertEqual(budget.allocate(4), 25)
+        part = budget.makePart(4)
+        self.assertEqual(part.max_evaluation, 25)
+        # Evaluations not used by a part are available to later parts
+        budget.add(10, 0.1)
+        self.assertEqual(budget.allocate(3), 30)
+        self.assertFalse(budget.isExhausted())
+        self.assertTrue(budget.isExhausted(90))
+        budget.add(90, 0.1)
+        self.assertTrue(budget.isExhausted())
+        self.assertEqual(budget.allocate(1), 1)
+
+    def testDuration(self):
+        if IGNORE_TEST:
+            return
+        budget = FitBudget(max_duration=10)
+        # No cost is measured
+        self.assertIsNone(budget.allocate(2))
+        budget.add(100, 0.01)
+        self.assertAlmostEqual(budget.seconds_per_evaluation, 1e-4)
+        num_evaluation = budget.allocate(2)
+        self.assertGreater(num_evaluation, 40000)
+        self.assertLessEqual(num_evaluation, 50000)
+        # Concurrent parts have the whole time
+        self.assertGreater(budget.allocate(2, is_time_sliced=False), 90000)
+        part = budget.makePart(2)
+        self.assertLessEqual(part.deadline - time.time(), 5)
+        part = budget.makePart(2, is_time_sliced=False)
+        self.assertEqual(part.deadline, budget.deadline)
+        budget = FitBudget(max_duration=0)
+        self.assertTrue(budget.isExhausted())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Created on July 4, 2022
+
+@author: joseph-hellerstein
+"""
+
+from fitterpp.checkpoint import Checkpoint
+from fitterpp.fitterpp import FitterResult
+
+import json
+import lmfit
+import numpy as np
+import os
+import tempfile
+import unittest
+
+
+IGNORE_TEST = False
+IS_PLOT = False
+NAMES = ["a", "b"]
+INITIAL_ARR = np.array([[1, 2], [3, 4], [5, 6]])
+
+
+def makeResult(rssq):
+    parameters = lmfit.Parameters()
+    parameters.add("a", value=rssq)
+    parameters.add("b", value=2*rssq)
+    return FitterResult(mzr=None, rssq=rssq, prm=parameters, traces=[],
+          cache_stats=[(0, 0)], num_evaluation=1)
+
+
+################ TEST CLASSES #############
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "checkpoint.ckpt")
+        self.checkpoint = Checkpoint(self.path, NAMES, INITIAL_ARR)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def testReadWrite(self):
+        if IGNORE_TEST:
+            return
+        self.assertIsNone(Checkpoint.read(self.path))
+        self.checkpoint.write()
+        self.assertIsNone(self.checkpoint.best_result)
+        self.checkpoint.addResult(2, makeResult(3.0))
+        self.checkpoint.addResult(0, makeResult(1.0))
+        checkpoint = Checkpoint.read(self.path)
+        self.assertEqual(checkpoint.parameter_names, NAMES)
+        self.assertTrue(np.allclose(checkpoint.initial_arr, INITIAL_ARR))
+        self.assertEqual(sorted(checkpoint.results.keys()), [0, 2])
+        self.assertEqual(checkpoint.best_result.rssq, 1.0)
+        self.assertEqual(checkpoint.results[2].values, [3.0, 6.0])
+        self.assertEqual(checkpoint.results[2].cache_stats, [(0, 0)])
+        # No temporary files remain
+        self.assertEqual(os.listdir(self.tmp_dir.name), ["checkpoint.ckpt"])
+
+    def testAppend(self):
+        if IGNORE_TEST:
+            return
+        self.checkpoint.write()
+        for idx in range(3):
+            size = os.path.getsize(self.path)
+            self.checkpoint.addResult(idx, makeResult(float(idx)))
+            with open(self.path, "r") as fd:
+                lines = fd.readlines()
+            self.assertEqual(len(lines), idx + 2)
+            # Only the start is written
+            self.assertEqual(os.path.getsize(self.path) - size,
+                  len(lines[-1]))
+        # An incomplete last line is ignored
+        with open(self.path, "a") as fd:
+            fd.write('{"values": [1')
+        checkpoint = Checkpoint.read(self.path)
+        self.assertEqual(sorted(checkpoint.results.keys()), [0, 1, 2])
+        self.assertTrue(checkpoint.is_truncated)
+
+    def testVersion(self):
+        if IGNORE_TEST:
+            return
+        with open(self.path, "w") as fd:
+            fd.write(json.dumps(dict(version=-1)) + "\n")
+        with self.assertRaises(ValueError):
+            Checkpoint.read(self.path)
+        with open(self.path, "wb") as fd:
+            fd.write(b"\x80\x04not a checkpoint")
+        with self.assertRaises(ValueError):
+            Checkpoint.read(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Created on July 4, 2022
+
+@author: joseph-hellerstein
+"""
+
+from fitterpp.convergence import WindowConvergence, TargetConvergence
+
+import unittest
+
+
+IGNORE_TEST = False
+IS_PLOT = False
+
+
+################ TEST CLASSES #############
+class TestWindowConvergence(unittest.TestCase):
+
+    def setUp(self):
+        self.convergence = WindowConvergence(window=10, tolerance=0.1)
+
+    def testUpdate(self):
+        if IGNORE_TEST:
+            return
+        # Improving
+        results = [self.convergence.update(n, 100.0/n) for n in range(1, 30)]
+        self.assertFalse(any(results))
+        # Flat for less than a window
+        for num_evaluation in range(30, 39):
+            self.assertFalse(self.convergence.update(num_evaluation, 3.0))
+        self.assertTrue(self.convergence.update(40, 3.0))
+        # Remains converged
+        self.assertTrue(self.convergence.update(41, 1.0))
+
+    def testCopy(self):
+        if IGNORE_TEST:
+            return
+        for num_evaluation in range(1, 20):
+            _ = self.convergence.update(num_evaluation, 1.0)
+        self.assertTrue(self.convergence.is_converged)
+        convergence = self.convergence.copy()
+        self.assertFalse(convergence.is_converged)
+        self.assertEqual(convergence.window, 10)
+        self.assertFalse(convergence.update(1, 1.0))
+
+
+class TestTargetConvergence(unittest.TestCase):
+
+    def testUpdate(self):
+        if IGNORE_TEST:
+            return
+        convergence = TargetConvergence(1.0)
+        self.assertFalse(convergence.update(1, 2.0))
+        self.assertTrue(convergence.update(2, 1.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Created on July 4, 2022
+
+@author: joseph-hellerstein
+"""
+
+from fitterpp.evaluation_cache import EvaluationCache
+
+import numpy as np
+import pickle
+import unittest
+
+
+IGNORE_TEST = False
+IS_PLOT = False
+SIZE = 10
+RESIDUALS = np.array(range(SIZE), dtype=float)
+
+
+################ TEST CLASSES #############
+class TestEvaluationCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = EvaluationCache(max_entry=3)
+
+    def testGetPut(self):
+        if IGNORE_TEST:
+            return
+        key = self.cache.makeKey([1, 2])
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, RESIDUALS)
+        residuals = self.cache.get(key)
+        self.assertTrue(np.allclose(residuals, RESIDUALS))
+        # Changes to the result do not change the cache
+        residuals[0] = 100
+        self.assertTrue(np.allclose(self.cache.get(key), RESIDUALS))
+        self.assertEqual(self.cache.num_hit, 2)
+        self.assertEqual(self.cache.num_miss, 1)
+
+    def testEvict(self):
+        if IGNORE_TEST:
+            return
+        keys = [self.cache.makeKey([n]) for n in range(4)]
+        for key in keys[:3]:
+            self.cache.put(key, RESIDUALS)
+        _ = self.cache.get(keys[0])  # Most recently used
+        self.cache.put(keys[3], RESIDUALS)
+        self.assertEqual(len(self.cache), 3)
+        self.assertIsNone(self.cache.get(keys[1]))
+        self.assertIsNotNone(self.cache.get(keys[0]))
+        self.assertEqual(self.cache.num_evict, 1)
+        # Bound on bytes
+        num_byte = RESIDUALS.nbytes + len(keys[0])
+        cache = EvaluationCache(max_byte=2*num_byte)
+        for key in keys:
+            cache.put(key, RESIDUALS)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.num_byte, 2*num_byte)
+
+    def testMakeKey(self):
+        if IGNORE_TEST:
+            return
+        self.assertNotEqual(self.cache.makeKey([1.0]),
+              self.cache.makeKey([1.0 + 1e-12]))
+        cache = EvaluationCache(quantum=1e-6)
+        self.assertEqual(cache.makeKey([1.0]), cache.makeKey([1.0 + 1e-12]))
+        self.assertNotEqual(cache.makeKey([1.0]), cache.makeKey([1.1]))
+
+    def testPickle(self):
+        if IGNORE_TEST:
+            return
+        key = self.cache.makeKey([1, 2])
+        self.cache.put(key, RESIDUALS)
+        cache = pickle.loads(pickle.dumps(self.cache))
+        self.assertTrue(np.allclose(cache.get(key), RESIDUALS))
+
+
+if __name__ == '__main__':
+    unittest.main()
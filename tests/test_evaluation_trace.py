@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Created on July 4, 2022
+
+@author: joseph-hellerstein
+"""
+
+from fitterpp import evaluation_trace as et
+from fitterpp.evaluation_trace import EvaluationTrace
+
+import numpy as np
+import os
+import pickle
+import tempfile
+import unittest
+
+
+IGNORE_TEST = False
+IS_PLOT = False
+NAMES = ["a", "b", "c"]
+NUM_ROW = 1000
+PARAMETER_ARR = np.reshape(np.arange(3*NUM_ROW, dtype=float), (NUM_ROW, 3))
+RSSQS = np.arange(NUM_ROW, dtype=float)
+DURATIONS = 0.5*np.arange(NUM_ROW)
+
+
+################ TEST CLASSES #############
+class TestEvaluationTrace(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.trace = EvaluationTrace()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def check(self, trace):
+        self.assertEqual(len(trace), NUM_ROW)
+        self.assertTrue(np.allclose(trace.rssqs, RSSQS))
+        self.assertTrue(np.allclose(trace.durations, DURATIONS))
+        self.assertTrue(np.allclose(trace.values, PARAMETER_ARR))
+        self.assertTrue(np.isclose(trace.sum(et.DURATION), sum(DURATIONS)))
+        self.assertEqual(trace.columns, [et.DURATION, et.RSSQ] + NAMES)
+
+    def testAppend(self):
+        if IGNORE_TEST:
+            return
+        self.assertEqual(len(self.trace.rssqs), 0)
+        for values, rssq, duration in zip(PARAMETER_ARR, RSSQS, DURATIONS):
+            self.trace.append(dict(zip(NAMES, values)), rssq, duration)
+        self.check(self.trace)
+
+    def testExtend(self):
+        if IGNORE_TEST:
+            return
+        self.trace.extend(NAMES, PARAMETER_ARR[:10], RSSQS[:10], DURATIONS[:10])
+        self.trace.extend(NAMES, PARAMETER_ARR[10:], RSSQS[10:], DURATIONS[10:])
+        self.check(self.trace)
+        # Columns are read only views
+        rssqs = self.trace.rssqs
+        self.assertTrue(np.shares_memory(rssqs, self.trace._arr))
+        with self.assertRaises(ValueError):
+            rssqs[0] = 1
+        self.check(pickle.loads(pickle.dumps(self.trace)))
+
+    def testSpill(self):
+        if IGNORE_TEST:
+            return
+        trace = EvaluationTrace(max_entry=300, spill_dir=self.tmp_dir.name)
+        trace.extend(NAMES, PARAMETER_ARR[:500], RSSQS[:500], DURATIONS[:500])
+        for idx in range(500, NUM_ROW):
+            trace.append(dict(zip(NAMES, PARAMETER_ARR[idx])), RSSQS[idx],
+                  DURATIONS[idx])
+        self.assertEqual(len(trace.spill_paths), 3)
+        self.assertLessEqual(len(trace._arr), 300)
+        self.check(trace)
+        chunks = list(trace.iterChunks())
+        self.assertTrue(isinstance(chunks[0], np.memmap))
+        self.check(pickle.loads(pickle.dumps(trace)))
+        trace.clear()
+        self.assertEqual(len(trace), 0)
+        self.assertEqual(os.listdir(self.tmp_dir.name), [])
+
+    def testErrors(self):
+        if IGNORE_TEST:
+            return
+        with self.assertRaises(ValueError):
+            _ = EvaluationTrace(max_entry=10)
+        with self.assertRaises(ValueError):
+            _ = EvaluationTrace(max_entry=0, spill_dir=self.tmp_dir.name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Created on July 4, 2022
+
+@author: joseph-hellerstein
+"""
+
+from fitterpp.fitter_function import FitterFunction, GatherIndices,  \
+      ProcessExecutor
+
+import concurrent.futures
+import lmfit
+import numpy as np
+import pickle
+import unittest
+
+
+IGNORE_TEST = False
+IS_PLOT = False
+SIZE = 10
+XVALUES = np.array(range(SIZE))
+DATA_ARR = 2*XVALUES.astype(float)
+GATHER_IDXS = 2*np.array(range(SIZE))  # First column of calcLine
+GATHER_INDICES = GatherIndices(np.array(range(SIZE)), np.array([0]), 2)
+PARAMS = lmfit.Parameters()
+PARAMS.add("mult", value=1, min=0, max=10)
+
+
+########## FUNCTIONS #################
+def calcLine(mult=1, is_dataframe=False):
+    """
+    Calculates a line with a slope and a second, unused column.
+    """
+    return np.array([mult*XVALUES, XVALUES]).T
+
+def calcLineArray(mult=1):
+    """
+    calcLine without is_dataframe.
+    """
+    return calcLine(mult=mult)
+
+
+################ TEST CLASSES #############
+class TestFitterFunction(unittest.TestCase):
+
+    def setUp(self):
+        self.function = FitterFunction(calcLine, ["mult"], DATA_ARR,
+              GATHER_IDXS)
+
+    def testCall(self):
+        if IGNORE_TEST:
+            return
+        residuals = self.function(PARAMS)
+        self.assertTrue(np.allclose(residuals, XVALUES))
+        #
+        params = PARAMS.copy()
+        params.add("extra", value=1)
+        with self.assertRaises(ValueError):
+            self.function(params)
+        # Different names of the same length after a valid call
+        params = lmfit.Parameters()
+        params.add("other", value=1)
+        with self.assertRaises(ValueError):
+            self.function(params)
+
+    def testCallDeclaredOutput(self):
+        if IGNORE_TEST:
+            return
+        function = FitterFunction(calcLineArray, ["mult"], DATA_ARR,
+              GATHER_IDXS, is_declared_output=True)
+        self.assertTrue(np.allclose(function(PARAMS), XVALUES))
+        residuals_arr = function.calcResidualsBatch(np.array([[1], [2]]))
+        self.assertTrue(np.allclose(residuals_arr[1], 0))
+
+    def testResidualsNotReused(self):
+        if IGNORE_TEST:
+            return
+        residuals1 = self.function(PARAMS)
+        params = PARAMS.copy()
+        params["mult"].set(value=2)
+        residuals2 = self.function(params)
+        self.assertTrue(np.allclose(residuals1, XVALUES))
+        self.assertTrue(np.allclose(residuals2, 0))
+
+    def testChunk(self):
+        if IGNORE_TEST:
+            return
+        params = PARAMS.copy()
+        params["mult"].set(value=3)
+        for chunk_size in [1, 3, SIZE, 2*SIZE]:
+            function = FitterFunction(calcLine, ["mult"], DATA_ARR,
+                  GATHER_IDXS, chunk_size=chunk_size)
+            self.assertTrue(np.allclose(function(params),
+                  self.function(params)))
+
+    def testIdenticalOutput(self):
+        if IGNORE_TEST:
+            return
+        # The flattened output of the function is the data
+        def calcColumn(mult=1, is_dataframe=False):
+            return calcLine(mult=mult)[:, 0:1]
+        for chunk_size in [None, 3]:
+            function = FitterFunction(calcColumn, ["mult"], DATA_ARR, None,
+                  chunk_size=chunk_size)
+            self.assertTrue(np.allclose(function(PARAMS), XVALUES))
+            residuals_arr = function.calcResidualsBatch(np.array([[1], [2]]))
+            self.assertTrue(np.allclose(residuals_arr[1], 0))
+
+    def testCalcResidualsBatch(self):
+        if IGNORE_TEST:
+            return
+        parameter_arr = np.array([[1], [2], [3]])
+        residuals_arr = self.function.calcResidualsBatch(parameter_arr)
+        self.assertEqual(np.shape(residuals_arr), (3, SIZE))
+        self.assertTrue(np.allclose(residuals_arr[0], XVALUES))
+        self.assertTrue(np.allclose(residuals_arr[1], 0))
+        #
+        def calcLines(parameter_arr, is_dataframe=False):
+            return np.array([calcLine(mult=v[0]) for v in parameter_arr])
+        function = FitterFunction(calcLines, ["mult"], DATA_ARR,
+              GATHER_IDXS, is_vectorized=True)
+        self.assertTrue(np.allclose(function.calcResidualsBatch(parameter_arr),
+              residuals_arr))
+        self.assertTrue(np.allclose(function(PARAMS), XVALUES))
+
+    def testCalcResidualsBatchProcess(self):
+        if IGNORE_TEST:
+            return
+        parameter_arr = np.array([[v] for v in np.linspace(0, 5, 7)])
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            thread_arr = self.function.calcResidualsBatch(parameter_arr,
+                  executor=executor)
+        with ProcessExecutor(self.function, max_workers=2) as executor:
+            process_arr = self.function.calcResidualsBatch(parameter_arr,
+                  executor=executor)
+        self.assertEqual(np.shape(process_arr), (7, SIZE))
+        self.assertTrue(np.allclose(process_arr, thread_arr))
+
+    def testPickle(self):
+        if IGNORE_TEST:
+            return
+        function = pickle.loads(pickle.dumps(self.function))
+        self.assertTrue(np.allclose(function(PARAMS), self.function(PARAMS)))
+
+    def testGatherIndices(self):
+        if IGNORE_TEST:
+            return
+        function = FitterFunction(calcLine, ["mult"], DATA_ARR,
+              GATHER_INDICES, chunk_size=3)
+        self.assertTrue(np.allclose(function(PARAMS), XVALUES))
+        self.assertTrue(np.allclose(function.gather_idxs, GATHER_IDXS))
+        # The flat indices are not pickled
+        other_function = pickle.loads(pickle.dumps(function))
+        self.assertIsNone(other_function._gather_idxs)
+        self.assertTrue(np.allclose(other_function(PARAMS), XVALUES))
+        self.assertTrue(np.allclose(other_function.calcResidualsBatch(
+              np.array([[1], [2]])), self.function.calcResidualsBatch(
+              np.array([[1], [2]]))))
+
+
+if __name__ == '__main__':
+    unittest.main()
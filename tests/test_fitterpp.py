@@ -6,17 +6,32 @@ Created on July 4, 2022
 """
 
 import fitterpp.constants as cn
-from fitterpp.fitterpp import Fitterpp, DFIntersectionFinder
+from fitterpp.fitterpp import Fitterpp, DFIntersectionFinder, FitterResult
 from fitterpp import util
 from fitterpp.logs import Logger
+from fitterpp.function_wrapper import FunctionWrapper
+from fitterpp.evaluation_cache import EvaluationCache
+from fitterpp.checkpoint import Checkpoint
+from fitterpp.result_store import ResultStore
+from fitterpp.convergence import WindowConvergence, TargetConvergence
+from fitterpp.phase_timer import PhaseTimer
 import helpers
 
+import asyncio
 import collections
+import concurrent.futures
 import copy
 import matplotlib
+import matplotlib.pyplot
 import numpy as np
 import pandas as pd
 import lmfit
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
 import unittest
 
 try:
@@ -71,6 +86,77 @@ def calcParabola(center=0, mult=1, xvalues=XVALUES, is_dataframe=True):
         result = np.reshape(result, (len(estimates), 1))
     return result
 
+def calcParabolaVectorized(parameter_arr, xvalues=XVALUES, is_dataframe=False):
+    """
+    Calculates parabolas for many candidate parameter values.
+
+    Parameters
+    ----------
+    parameter_arr: np.array (columns are mult, center)
+    xvalues: int (not a fitted parameter)
+    
+    Returns
+    -------
+    DataFrame (for the first candidate) or np.array (candidate, row, column)
+    """
+    mults = parameter_arr[:, 0:1]
+    centers = parameter_arr[:, 1:2]
+    estimates = mults*(np.array(xvalues)[np.newaxis, :] - centers)**2
+    if is_dataframe:
+        result = pd.DataFrame({ROW_KEY: XVALUES, YKEY: estimates[0]})
+        return result.set_index(ROW_KEY)
+    return estimates[:, :, np.newaxis]
+
+def calcParabolaJacobian(center=0, mult=1, xvalues=XVALUES):
+    """
+    Calculates the derivatives of calcParabola with respect to mult and center.
+
+    Returns
+    -------
+    np.array (row, column, parameter)
+    """
+    xvalues = np.array(xvalues)
+    derivatives = [(xvalues - center)**2, -2*mult*(xvalues - center)]
+    return np.reshape(np.array(derivatives).T, (len(xvalues), 1, 2))
+
+def calcParabolaCounted(center=0, mult=1, xvalues=XVALUES, is_dataframe=True):
+    """
+    calcParabola that counts its calls in NUM_CALL.
+    """
+    NUM_CALL[0] += 1
+    return calcParabola(center=center, mult=mult, xvalues=xvalues,
+          is_dataframe=is_dataframe)
+NUM_CALL = [0]
+
+def calcParabolaArray(center=0, mult=1, xvalues=XVALUES):
+    """
+    calcParabola with declared output labels (XVALUES, [YKEY]).
+    Counts its calls in NUM_CALL.
+    """
+    NUM_CALL[0] += 1
+    return calcParabola(center=center, mult=mult, xvalues=xvalues,
+          is_dataframe=False)
+
+
+class ObservedParabola():
+    # calcParabola that is observation aware. Records the number of rows
+    # of its last output in num_row.
+
+    def __init__(self):
+        self.xvalues = XVALUES
+        self.num_row = None
+
+    def setObservations(self, index, columns):
+        self.xvalues = list(index)
+
+    def __call__(self, center=0, mult=1, is_dataframe=True):
+        result = calcParabola(center=center, mult=mult, xvalues=self.xvalues,
+              is_dataframe=False)
+        self.num_row = len(result)
+        if is_dataframe:
+            result = pd.DataFrame({YKEY: result[:, 0]}, index=self.xvalues)
+        return result
+
 
 ################ TEST CLASSES #############
 class TestDataframeCommon(unittest.TestCase):
@@ -97,6 +183,61 @@ class TestDataframeCommon(unittest.TestCase):
         self.assertTrue(helpers.isArrayEqual(self.common1.column_idxs, [1]))
         self.assertTrue(helpers.isArrayEqual(self.common2.row_idxs, [2, 3]))
         self.assertTrue(helpers.isArrayEqual(self.common2.column_idxs, [0]))
+        self.assertTrue(helpers.isArrayEqual(self.common1.flat_idxs, [1, 3]))
+
+    def testAlignedIndices(self):
+        if IGNORE_TEST:
+            return
+        self.assertTrue(helpers.isArrayEqual(self.common1.other_row_idxs,
+              [2, 3]))
+        self.assertTrue(helpers.isArrayEqual(self.common1.other_column_idxs,
+              [0]))
+        # Unsorted rows with duplicates
+        df = pd.DataFrame({"b": range(4)}, index=[3, 1, 3, 7])
+        other_df = pd.DataFrame({"b": range(3)}, index=[7, 3, 3])
+        common = DFIntersectionFinder(df, other_df)
+        self.assertTrue(helpers.isArrayEqual(common.row_idxs, [0, 2, 3]))
+        self.assertTrue(helpers.isArrayEqual(common.other_row_idxs, [1, 1, 0]))
+        # MultiIndex rows
+        index = pd.MultiIndex.from_tuples([("a", 1), ("a", 2), ("b", 1)])
+        other_index = pd.MultiIndex.from_tuples([("b", 1), ("a", 2)])
+        df = pd.DataFrame({"b": range(3)}, index=index)
+        other_df = pd.DataFrame({"c": range(2), "b": range(2)},
+              index=other_index)
+        common = DFIntersectionFinder(df, other_df)
+        self.assertTrue(helpers.isArrayEqual(common.row_idxs, [1, 2]))
+        self.assertTrue(helpers.isArrayEqual(common.other_row_idxs, [1, 0]))
+        self.assertTrue(helpers.isArrayEqual(common.other_flat_idxs, [3, 1]))
+
+    def testIdentical(self):
+        if IGNORE_TEST:
+            return
+        self.assertFalse(self.common1.is_identical)
+        common = DFIntersectionFinder(self.df1, self.df1.copy())
+        self.assertTrue(common.is_identical)
+        # Indices are calculated on first access
+        self.assertFalse("flat_idxs" in common.__dict__)
+        self.assertTrue(helpers.isArrayEqual(common.flat_idxs,
+              range(self.df1.size)))
+        self.assertTrue(helpers.isArrayEqual(common.other_row_idxs,
+              range(len(self.df1))))
+        with self.assertRaises(AttributeError):
+            _ = common.bogus
+
+    def testFitUnorderedData(self):
+        if IGNORE_TEST:
+            return
+        methods = Fitterpp.mkFitterppMethod(method_names=cn.METHOD_LEASTSQ)
+        params = PARAMS.copy()
+        util.updateParameterValues(params, PARABOLA_PRMS)
+        rssqs = []
+        for data_df in [DATA_DF, DATA_DF.iloc[::-1, :]]:
+            fitter = Fitterpp(calcParabola, params, data_df,
+                  method_names=methods)
+            fitter.fit()
+            rssqs.append(fitter.rssq)
+        self.assertTrue(np.isclose(rssqs[0], rssqs[1]))
+        self.assertLess(rssqs[0], len(DATA_DF))
 
     def testIsCorrectShape(self):
         if IGNORE_TEST:
@@ -116,12 +257,16 @@ class TestDataframeCommon(unittest.TestCase):
 class TestFitterpp(unittest.TestCase):
 
     def setUp(self):
+        self.cache_dir = helpers.TemporaryCacheDir()
         self.function = calcParabola
         self.params = copy.deepcopy(PARAMS)
         self.method_names = ["differential_evolution"]
         self.fitter = Fitterpp(self.function, self.params, DATA_DF,
               method_names=self.method_names, max_fev=1000)
 
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
     def testConstructor(self):
         if IGNORE_TEST:
             return
@@ -165,9 +310,9 @@ class TestFitterpp(unittest.TestCase):
                 params.add(key, value=0, min=0, max=10*value)
             methods = Fitterpp.mkFitterppMethod(
                   method_names=["differential_evolution"],
-                  max_fev=100)
+                  method_kwargs={"seed": 0}, max_fev=100)
             fitter = Fitterpp(calcParabola, params, DATA_DF, method_names=methods,
-                  num_latincube=num_latincube)
+                  num_latincube=num_latincube, seed=0)
             fitter.fit()
             for key, value in PARABOLA_PRMS.items():
                 true_value = value
@@ -196,6 +341,204 @@ class TestFitterpp(unittest.TestCase):
         minvalue_dct = {n: v[min_idx] for n, v in value_dct.items()}
         self.assertLessEqual(minvalue_dct[RSSQ], fitter_1.rssq)
 
+    def testFitParallel(self):
+        if IGNORE_TEST:
+            return
+        NUM_LATINCUBE = 4
+        methods = Fitterpp.mkFitterppMethod(
+              method_names=[cn.METHOD_DIFFERENTIAL_EVOLUTION,
+              cn.METHOD_LEASTSQ], max_fev=100)
+        def test(**kwargs):
+            fitter = Fitterpp(calcParabola, self.params, DATA_DF,
+                  method_names=methods, num_latincube=NUM_LATINCUBE,
+                  is_collect=True, **kwargs)
+            fitter.fit()
+            self.assertEqual(len(fitter.performance_stats),
+                  NUM_LATINCUBE*len(methods))
+            self.assertEqual(len(fitter.quality_stats),
+                  NUM_LATINCUBE*len(methods))
+            self.assertLess(fitter.rssq, 1e10)
+            self.assertTrue(isinstance(fitter.final_params, lmfit.Parameters))
+            fitter.report()
+        #
+        test(n_workers=2)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            test(executor=executor)
+
+    def testFitVectorized(self):
+        if IGNORE_TEST:
+            return
+        def test(method_names):
+            # differential_evolution is seeded
+            methods = Fitterpp.mkFitterppMethod(method_names=method_names[0],
+                  method_kwargs={"seed": 0})
+            methods.extend(Fitterpp.mkFitterppMethod(
+                  method_names=method_names[1:]))
+            fitter = Fitterpp(calcParabolaVectorized, self.params, DATA_DF,
+                  method_names=methods, is_vectorized=True,
+                  is_collect=True)
+            fitter.fit()
+            self.assertLess(fitter.rssq, len(DATA_DF))
+            for name, value in PARABOLA_PRMS.items():
+                fitted_value = fitter.final_params.valuesdict()[name]
+                self.assertLess(np.abs(value - fitted_value), 0.1)
+            self.assertTrue(method_names[-1] in fitter.report())
+            return fitter
+        #
+        test([cn.METHOD_DIFFERENTIAL_EVOLUTION])
+        fitter = test([cn.METHOD_DIFFERENTIAL_EVOLUTION, cn.METHOD_LEASTSQ])
+        self.assertEqual(len(fitter.quality_stats), 2)
+        test([cn.METHOD_DIFFERENTIAL_EVOLUTION, cn.METHOD_LEAST_SQUARES])
+
+    def testCalcJacobian(self):
+        if IGNORE_TEST:
+            return
+        fitter = Fitterpp(calcParabolaVectorized, self.params, DATA_DF,
+              is_vectorized=True)
+        wrapper = FunctionWrapper(fitter.function)
+        params = self.params.copy()
+        util.updateParameterValues(params, PARABOLA_PRMS)
+        jacobian = wrapper.calcJacobian(params)
+        self.assertEqual(np.shape(jacobian), (len(DATA_DF), len(params)))
+        # Derivative of the residuals with respect to mult
+        expected = -np.array([(n - PARABOLA_PRMS[CENTER_PRM])**2
+              for n in XVALUES])
+        self.assertTrue(np.allclose(jacobian[:, 0], expected, rtol=1e-4,
+              atol=1e-4))
+        self.assertLess(wrapper.rssq, 1e10)
+
+    def testScreen(self):
+        if IGNORE_TEST:
+            return
+        methods = Fitterpp.mkFitterppMethod(method_names=cn.METHOD_LEASTSQ)
+        for function, is_vectorized in [(calcParabola, False),
+              (calcParabolaVectorized, True)]:
+            fitter = Fitterpp(function, self.params, DATA_DF,
+                  method_names=methods, num_latincube=5, num_screen=50,
+                  num_screen_top=2, is_vectorized=is_vectorized,
+                  is_collect=True)
+            fitter.fit()
+            df = fitter.screening_df
+            self.assertEqual(len(df), 50)
+            self.assertEqual(df[cn.IS_STARTED].sum(), 2)
+            self.assertTrue(all(np.diff(df[cn.RSSQ].values) >= 0))
+            self.assertEqual(len(fitter.quality_stats), 2)
+            self.assertLessEqual(fitter.rssq, df[cn.RSSQ].min())
+        # No screening
+        self.fitter.fit()
+        self.assertIsNone(self.fitter.screening_df)
+
+    def testFitWithCache(self):
+        if IGNORE_TEST:
+            return
+        methods = Fitterpp.mkFitterppMethod(
+              method_names=[cn.METHOD_DIFFERENTIAL_EVOLUTION,
+              cn.METHOD_LEASTSQ], max_fev=100)
+        cache = EvaluationCache(max_entry=100)
+        fitter = Fitterpp(calcParabola, self.params, DATA_DF,
+              method_names=methods, num_latincube=2, cache=cache,
+              is_collect=True)
+        fitter.fit()
+        self.assertEqual(len(fitter.cache_stats), 4)
+        num_hit = sum([v[0] for v in fitter.cache_stats])
+        num_miss = sum([v[1] for v in fitter.cache_stats])
+        self.assertGreater(num_hit, 0)
+        self.assertEqual(num_hit, cache.num_hit)
+        self.assertEqual(num_miss, cache.num_miss)
+        self.assertLessEqual(len(cache), 100)
+        df = fitter.plotPerformance(is_plot=False)
+        self.assertEqual(df["hit"].sum(), num_hit)
+
+    def testFitWithJacobian(self):
+        if IGNORE_TEST:
+            return
+        params = PARAMS.copy()
+        util.updateParameterValues(params, {MULT_PRM: 1, CENTER_PRM: 8})
+        methods = Fitterpp.mkFitterppMethod(method_names=cn.METHOD_LEASTSQ)
+        jacobians = []
+        for jacobian in [None, calcParabolaJacobian] + cn.JACOBIAN_MODES[1:]:
+            fitter = Fitterpp(calcParabola, params, DATA_DF,
+                  method_names=methods, jacobian=jacobian,
+                  num_jacobian_worker=2)
+            fitter.fit()
+            self.assertLess(fitter.rssq, len(DATA_DF))
+            if jacobian is not None:
+                wrapper = FunctionWrapper(fitter.function)
+                jacobians.append(wrapper.calcJacobian(params))
+        for jacobian in jacobians[1:]:
+            self.assertTrue(np.allclose(jacobian, jacobians[0], rtol=1e-4,
+                  atol=1e-3))
+        #
+        with self.assertRaises(ValueError):
+            Fitterpp(calcParabola, params, DATA_DF, jacobian="bad")
+
+    def testFitSuccessiveHalving(self):
+        if IGNORE_TEST:
+            return
+        NUM_LATINCUBE = 9
+        MAX_FEV = 90
+        methods = Fitterpp.mkFitterppMethod(
+              method_names=[cn.METHOD_DIFFERENTIAL_EVOLUTION,
+              cn.METHOD_LEASTSQ], max_fev=MAX_FEV)
+        def test(halving_factor):
+            fitter = Fitterpp(calcParabola, self.params, DATA_DF,
+                  method_names=methods, num_latincube=NUM_LATINCUBE,
+                  halving_factor=halving_factor, is_collect=True)
+            fitter.fit()
+            self.assertLess(fitter.rssq, 1e10)
+            self.assertEqual(fitter.num_evaluation,
+                  sum([len(v) for v in fitter.performance_stats]))
+            return fitter
+        #
+        fitter = test(None)
+        self.assertEqual(len(fitter.performance_stats),
+              NUM_LATINCUBE*len(methods))
+        halving_fitter = test(3)
+        # Rungs of 9, 3 and 1 starts
+        self.assertEqual(len(halving_fitter.performance_stats),
+              (9 + 3 + 1)*len(methods))
+        self.assertLess(halving_fitter.num_evaluation, fitter.num_evaluation)
+        halving_fitter.plotPerformance(is_plot=False)
+        #
+        with self.assertRaises(ValueError):
+            Fitterpp(calcParabola, self.params, DATA_DF, halving_factor=1)
+
+    def testFitWithCheckpoint(self):
+        if IGNORE_TEST:
+            return
+        NUM_LATINCUBE = 3
+        methods = Fitterpp.mkFitterppMethod(method_names=cn.METHOD_LEASTSQ)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "checkpoint.ckpt")
+            def mkFitter():
+                return Fitterpp(calcParabolaCounted, self.params, DATA_DF,
+                      method_names=methods, num_latincube=NUM_LATINCUBE,
+                      checkpoint_path=path)
+            fitter = mkFitter()
+            fitter.fit()
+            checkpoint = Checkpoint.read(path)
+            self.assertEqual(len(checkpoint.results), NUM_LATINCUBE)
+            self.assertEqual(checkpoint.best_result.rssq, fitter.rssq)
+            # Simulate an interruption after the first start
+            del checkpoint.results[1]
+            del checkpoint.results[2]
+            checkpoint.write()
+            NUM_CALL[0] = 0
+            fitter = mkFitter()
+            num_setup_call = NUM_CALL[0]
+            fitter.fit(is_resume=True)
+            self.assertEqual(len(fitter.performance_stats), NUM_LATINCUBE)
+            self.assertEqual(NUM_CALL[0] - num_setup_call,
+                  fitter.num_evaluation - checkpoint.results[0].num_evaluation)
+            self.assertEqual(len(Checkpoint.read(path).results), NUM_LATINCUBE)
+            # Nothing to resume
+            NUM_CALL[0] = 0
+            fitter.fit(is_resume=True)
+            self.assertEqual(NUM_CALL[0], 0)
+        with self.assertRaises(ValueError):
+            fitter = Fitterpp(calcParabola, self.params, DATA_DF)
+            fitter.fit(is_resume=True)
+
     def testMkFitterppMethod(self):
         if IGNORE_TEST:
             return
@@ -234,6 +577,343 @@ class TestFitterpp(unittest.TestCase):
         fitter.fit()
         fitter.plotQuality(is_plot=IS_PLOT)
 
+    def testFitWithSpilledTrace(self):
+        if IGNORE_TEST:
+            return
+        methods = Fitterpp.mkFitterppMethod(
+              method_names=[cn.METHOD_DIFFERENTIAL_EVOLUTION,
+              cn.METHOD_LEASTSQ], max_fev=200)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fitter = Fitterpp(calcParabola, self.params, DATA_DF,
+                  method_names=methods, is_collect=True, max_trace_entry=50,
+                  trace_dir=tmp_dir)
+            fitter.fit()
+            self.assertGreater(len(os.listdir(tmp_dir)), 0)
+            trace = fitter.traces[0]
+            self.assertEqual(len(trace.values), len(trace))
+            self.assertEqual(len(fitter.quality_stats[0]), len(trace))
+            self.assertTrue(np.isclose(np.min(fitter.quality_stats[-1]),
+                  fitter.rssq))
+            df = fitter.plotPerformance(is_plot=False)
+            self.assertEqual(list(df["cnt"]), [len(t) for t in fitter.traces])
+        with self.assertRaises(ValueError):
+            _ = Fitterpp(calcParabola, self.params, DATA_DF,
+                  max_trace_entry=50)
+
+    def testFitTimed(self):
+        if IGNORE_TEST:
+            return
+        methods = Fitterpp.mkFitterppMethod(
+              method_names=[cn.METHOD_DIFFERENTIAL_EVOLUTION,
+              cn.METHOD_LEASTSQ], max_fev=100)
+        fitter = Fitterpp(calcParabola, self.params, DATA_DF,
+              method_names=methods, num_latincube=2, is_timed=True)
+        fitter.fit()
+        self.assertEqual(len(fitter.timers), 2*len(methods))
+        df = fitter.timing_df
+        self.assertEqual(set(df[cn.PHASE]), set(cn.PHASES))
+        # Seconds are not negative, and phases are within the total
+        self.assertTrue((df[cn.SECONDS] >= 0).all())
+        for timer in fitter.timers:
+            measured = sum([timer.getSeconds(p) for p in cn.PHASES_MEASURED])
+            self.assertLessEqual(measured, timer.getSeconds(cn.PHASE_TOTAL))
+        # Each evaluation is timed
+        num_user = fitter.timer.getCount(cn.PHASE_USER_FUNCTION)
+        self.assertEqual(num_user, fitter.num_evaluation)
+        fit_df = df[df[cn.START] == cn.ALL].set_index(cn.PHASE)
+        self.assertGreater(fit_df.loc[cn.PHASE_START, cn.SECONDS], 0)
+        self.assertEqual(list(df[df[cn.START] == 0][cn.METHOD].unique()),
+              [m.method for m in methods])
+        # A start that did not run the first method
+        timer = PhaseTimer(method=cn.METHOD_LEASTSQ)
+        timer.add(cn.PHASE_TOTAL, 10)
+        result = FitterResult(mzr=None, rssq=1, prm=None, traces=[],
+              cache_stats=[], num_evaluation=0, timers=[timer])
+        df = fitter._makeTimingDF([result])
+        self.assertEqual(set(df[df[cn.START] == 0][cn.METHOD]),
+              {cn.METHOD_LEASTSQ})
+        # Not timed by default
+        fitter = Fitterpp(calcParabola, self.params, DATA_DF,
+              method_names=methods)
+        fitter.fit()
+        self.assertEqual(len(fitter.timers), 0)
+        self.assertIsNone(fitter.timing_df)
+
+    def testFitWithResultStore(self):
+        if IGNORE_TEST:
+            return
+        methods = Fitterpp.mkFitterppMethod(method_names=[cn.METHOD_LEASTSQ],
+              max_fev=100)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = ResultStore(os.path.join(tmp_dir, "store.db"))
+            def fit(data_df):
+                fitter = Fitterpp(calcParabola, self.params, data_df,
+                      method_names=methods, result_store=store)
+                fitter.fit()
+                return fitter
+            fitter = fit(DATA_DF)
+            self.assertFalse(fitter.is_stored_result)
+            # The same data are not fit
+            stored_fitter = fit(DATA_DF.copy())
+            self.assertTrue(stored_fitter.is_stored_result)
+            self.assertEqual(stored_fitter.num_evaluation, 0)
+            self.assertEqual(stored_fitter.rssq, fitter.rssq)
+            self.assertEqual(stored_fitter.final_params.valuesdict(),
+                  fitter.final_params.valuesdict())
+            # Similar data start from the stored result
+            other_fitter = fit(DATA_DF + 0.1)
+            self.assertFalse(other_fitter.is_stored_result)
+            self.assertEqual(len(other_fitter.traces), 2)
+            self.assertEqual(len(store), 2)
+
+    def testFitWithConvergence(self):
+        if IGNORE_TEST:
+            return
+        max_fev = 2000
+        methods = Fitterpp.mkFitterppMethod(
+              method_names=[cn.METHOD_DIFFERENTIAL_EVOLUTION,
+              cn.METHOD_LEASTSQ], max_fev=max_fev)
+        fitter = Fitterpp(calcParabola, self.params, DATA_DF,
+              method_names=methods,
+              convergences=WindowConvergence(window=50, tolerance=1e-3))
+        fitter.fit()
+        self.assertEqual(len(fitter.saved_evaluations), len(methods))
+        self.assertGreater(fitter.saved_evaluations[0], 0)
+        self.assertLess(fitter.num_evaluation, 2*max_fev)
+        # Reaching a target stops the method
+        fitter = Fitterpp(calcParabola, self.params, DATA_DF,
+              method_names=methods,
+              convergences=TargetConvergence(target_rssq=1e10))
+        fitter.fit()
+        self.assertLess(fitter.num_evaluation, 10)
+        self.assertTrue(all(n > max_fev - 10 for n in fitter.saved_evaluations))
+        # differential_evolution evaluates again after it is stopped
+        methods = Fitterpp.mkFitterppMethod(
+              method_names=[cn.METHOD_DIFFERENTIAL_EVOLUTION], max_fev=max_fev)
+        fitter = Fitterpp(calcParabola, self.params, DATA_DF,
+              method_names=methods,
+              convergences=WindowConvergence(window=50, tolerance=1e-3))
+        fitter.fit()
+        self.assertGreater(fitter.saved_evaluations[0], 0)
+        self.assertIsNotNone(fitter.minimizer_result)
+        self.assertTrue(np.isclose(fitter.rssq,
+              np.sum(fitter.function(fitter.final_params)**2)))
+
+    def testUnsupportedCombinations(self):
+        if IGNORE_TEST:
+            return
+        kwargs_lst = [
+              dict(n_workers=2,
+                  executor=concurrent.futures.ThreadPoolExecutor()),
+              dict(latincube_idx=1, num_screen_top=2),
+              dict(is_vectorized=True, chunk_size=10),
+              dict(is_vectorized=True, jacobian=cn.JACOBIAN_THREAD),
+              ]
+        for kwargs in kwargs_lst:
+            with self.assertRaises(ValueError):
+                _ = Fitterpp(calcParabola, self.params, DATA_DF, **kwargs)
+        with self.assertRaises(ValueError):
+            _ = Fitterpp(ObservedParabola(), self.params, DATA_DF,
+                  is_observation_aware=True, output_index=list(XVALUES),
+                  output_columns=[YKEY])
+
+    def testFitObservationAware(self):
+        if IGNORE_TEST:
+            return
+        methods = Fitterpp.mkFitterppMethod(method_names=[cn.METHOD_LEASTSQ],
+              max_fev=100)
+        # Sparse data in an order that differs from the output
+        data_df = DATA_DF.iloc[[12, 0, 4, 8], :]
+        function = ObservedParabola()
+        fitter = Fitterpp(function, self.params, data_df,
+              method_names=methods, is_observation_aware=True)
+        self.assertEqual(function.xvalues, list(data_df.index))
+        fitter.fit()
+        self.assertEqual(function.num_row, len(data_df))
+        # Baseline that computes every row
+        full_function = ObservedParabola()
+        full_fitter = Fitterpp(full_function, self.params, data_df,
+              method_names=methods)
+        self.assertTrue(np.allclose(fitter.function(self.params),
+              full_fitter.function(self.params)))
+        full_fitter.fit()
+        self.assertEqual(full_function.num_row, len(XVALUES))
+        self.assertLess(function.num_row, full_function.num_row)
+        self.assertTrue(np.isclose(fitter.rssq, full_fitter.rssq))
+        with self.assertRaises(ValueError):
+            _ = Fitterpp(calcParabola, self.params, data_df,
+                  is_observation_aware=True)
+
+    def testFitDeclaredOutput(self):
+        if IGNORE_TEST:
+            return
+        methods = Fitterpp.mkFitterppMethod(method_names=[cn.METHOD_LEASTSQ],
+              max_fev=100)
+        NUM_CALL[0] = 0
+        fitter = Fitterpp(calcParabolaArray, self.params, DATA_DF,
+              method_names=methods, output_index=list(XVALUES),
+              output_columns=[YKEY])
+        # The output is validated by one call
+        self.assertEqual(NUM_CALL[0], 1)
+        fitter.fit()
+        other_fitter = Fitterpp(calcParabola, self.params, DATA_DF,
+              method_names=methods)
+        other_fitter.fit()
+        self.assertTrue(np.isclose(fitter.rssq, other_fitter.rssq))
+        # Errors
+        with self.assertRaises(ValueError):
+            _ = Fitterpp(calcParabolaArray, self.params, DATA_DF,
+                  output_index=list(XVALUES))
+        with self.assertRaises(ValueError):
+            _ = Fitterpp(calcParabolaArray, self.params, DATA_DF,
+                  output_index=list(XVALUES), output_columns=[YKEY, "z"])
+
+    def testFitWithTarget(self):
+        if IGNORE_TEST:
+            return
+        methods = Fitterpp.mkFitterppMethod(
+              method_names=[cn.METHOD_DIFFERENTIAL_EVOLUTION,
+              cn.METHOD_LEASTSQ], max_fev=500)
+        num_latincube = 5
+        def test(**kwargs):
+            fitter = Fitterpp(calcParabola, self.params, DATA_DF,
+                  method_names=methods, num_latincube=num_latincube,
+                  target_rssq=1e10, **kwargs)
+            fitter.fit()
+            self.assertTrue(fitter.is_target_reached)
+            self.assertGreater(fitter.num_skipped_start, 0)
+            self.assertGreaterEqual(fitter.saved_duration, 0)
+            self.assertLessEqual(fitter.rssq, 1e10)
+            return fitter
+        #
+        fitter = test()
+        self.assertEqual(fitter.num_skipped_start, num_latincube - 1)
+        self.assertGreater(fitter.saved_duration, 0)
+        # The first method reaches the target
+        self.assertEqual(len(fitter.traces), 1)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            _ = test(executor=executor)
+        # Successive halving skips the starts of the later rungs (3, 2, 1)
+        fitter = test(halving_factor=2)
+        self.assertEqual(fitter.num_skipped_start,
+              num_latincube - 1 + 3 + 2 + 1)
+        # Without a target, all starts are fit
+        fitter = Fitterpp(calcParabola, self.params, DATA_DF,
+              method_names=methods, num_latincube=num_latincube)
+        fitter.fit()
+        self.assertFalse(fitter.is_target_reached)
+        self.assertEqual(fitter.num_skipped_start, 0)
+
+    def testFitWithTargetAbortsRunningStarts(self):
+        if IGNORE_TEST:
+            return
+        max_fev = 2000
+        thread_ids = []
+        lock = threading.Lock()
+        def calcThreadParabola(center=0, mult=1, is_dataframe=True):
+            # The first worker thread fits the data exactly. Other threads
+            # fit noise, and so run until they are stopped.
+            thread_id = threading.get_ident()
+            with lock:
+                if (len(thread_ids) == 0)  \
+                      and (threading.current_thread() is not
+                      threading.main_thread()):
+                    thread_ids.append(thread_id)
+            result = DATA_DF.copy()
+            if (len(thread_ids) > 0) and (thread_id != thread_ids[0]):
+                time.sleep(0.001)
+                result = result + np.random.uniform(0, 100)
+            if not is_dataframe:
+                result = result.to_numpy()
+            return result
+        #
+        methods = Fitterpp.mkFitterppMethod(
+              method_names=[cn.METHOD_DIFFERENTIAL_EVOLUTION], max_fev=max_fev)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            fitter = Fitterpp(calcThreadParabola, self.params, DATA_DF,
+                  method_names=methods, num_latincube=2, target_rssq=1e-6,
+                  executor=executor)
+            fitter.fit()
+        self.assertTrue(fitter.is_target_reached)
+        self.assertLessEqual(fitter.rssq, 1e-6)
+        # The running start stopped before its max_fev
+        self.assertEqual(len(thread_ids), 1)
+        self.assertLess(fitter.num_evaluation, max_fev)
+
+    def testFitWithBudget(self):
+        if IGNORE_TEST:
+            return
+        methods = Fitterpp.mkFitterppMethod(
+              method_names=[cn.METHOD_DIFFERENTIAL_EVOLUTION,
+              cn.METHOD_LEASTSQ], max_fev=1000)
+        max_total_fev = 300
+        fitter = Fitterpp(calcParabola, self.params, DATA_DF,
+              method_names=methods, num_latincube=3,
+              max_total_fev=max_total_fev)
+        fitter.fit()
+        self.assertTrue(fitter.is_budget_limited)
+        self.assertTrue(isinstance(fitter.final_params, lmfit.Parameters))
+        # Methods stop at the end of an iteration
+        self.assertLess(fitter.num_evaluation, 2*max_total_fev)
+        self.assertIsNone(fitter.budget)
+        # The budget stops differential_evolution during the method
+        de_methods = Fitterpp.mkFitterppMethod(
+              method_names=[cn.METHOD_DIFFERENTIAL_EVOLUTION], max_fev=1000)
+        fitter = Fitterpp(calcParabola, self.params, DATA_DF,
+              method_names=de_methods, max_total_fev=max_total_fev)
+        fitter.fit()
+        self.assertTrue(fitter.is_budget_limited)
+        self.assertLess(fitter.num_evaluation, 2*max_total_fev)
+        self.assertTrue(np.isclose(fitter.rssq,
+              np.sum(fitter.function(fitter.final_params)**2)))
+        # A fit that does not use its budget
+        fitter = Fitterpp(calcParabola, self.params, DATA_DF,
+              method_names=methods, max_total_fev=100000, max_duration=1000)
+        fitter.fit()
+        self.assertFalse(fitter.is_budget_limited)
+
+    def testFitAsync(self):
+        if IGNORE_TEST:
+            return
+        methods = Fitterpp.mkFitterppMethod(
+              method_names=[cn.METHOD_DIFFERENTIAL_EVOLUTION,
+              cn.METHOD_LEASTSQ], max_fev=500)
+        num_latincube = 3
+        def mkFitter():
+            return Fitterpp(calcParabola, self.params, DATA_DF,
+                  method_names=methods, num_latincube=num_latincube)
+        # Progress of a complete fit
+        fitter = mkFitter()
+        events = []
+        params = asyncio.run(fitter.fitAsync(callback=events.append,
+              interval=10))
+        self.assertTrue(isinstance(params, lmfit.Parameters))
+        self.assertFalse(fitter.is_cancelled)
+        self.assertEqual(set([e.start for e in events]),
+              set(range(num_latincube)))
+        self.assertEqual(events[-1].method, cn.METHOD_LEASTSQ)
+        self.assertEqual(events[-1].rssq, fitter.rssq)
+        # Cancel after the first event
+        fitter = mkFitter()
+        async def cancel():
+            events = []
+            async def run():
+                async for event in fitter.iterFitAsync(interval=10):
+                    events.append(event)
+            task = asyncio.create_task(run())
+            while len(events) == 0:
+                await asyncio.sleep(0.001)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+        asyncio.run(cancel())
+        self.assertTrue(fitter.is_cancelled)
+        self.assertTrue(isinstance(fitter.final_params, lmfit.Parameters))
+        self.assertLess(len(fitter.traces), num_latincube*len(methods))
+        # The result is the best found before the cancel
+        self.assertTrue(np.isclose(fitter.rssq,
+              np.sum(fitter.function(fitter.final_params)**2)))
+
     def testReport(self):
         if IGNORE_TEST:
             return
@@ -250,8 +930,40 @@ class TestFitterpp(unittest.TestCase):
         parameters_lst = self.fitter.makeParameterCube(PARAMS, num_sample)
         self.assertEqual(len(parameters_lst), num_sample)
         self.assertTrue(isinstance(parameters_lst[0], lmfit.Parameters))
+        # Seeded samplers are reproducible
+        for sampler in [cn.SAMPLER_SOBOL, cn.SAMPLER_MAXIMIN]:
+            values_lst = [[list(p.valuesdict().values())
+                  for p in self.fitter.makeParameterCube(PARAMS, num_sample,
+                  sampler=sampler, seed=3)] for _ in range(2)]
+            self.assertTrue(np.allclose(values_lst[0], values_lst[1]))
+        with self.assertRaises(ValueError):
+            _ = Fitterpp(calcParabola, PARAMS, DATA_DF, sampler="dummy")
      
 
 
+class TestImport(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = helpers.TemporaryCacheDir()
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def testLazyImport(self):
+        if IGNORE_TEST:
+            return
+        # Importing does not calibrate, read the latin cube, or plot
+        script = "import sys, fitterpp, fitterpp.fitterpp as fpp; "
+        script += "print(fpp.FunctionWrapper._reference_time, "
+        script += "fpp.lc._latincube_df, "
+        script += "'matplotlib.pyplot' in sys.modules, 'lhsmdu' in sys.modules)"
+        output = subprocess.run([sys.executable, "-c", script],
+              check=True, capture_output=True, text=True).stdout
+        self.assertEqual(output.split(), ["None", "None", "False", "False"])
+        #
+        import fitterpp.fitterpp as fpp
+        self.assertEqual(len(fpp.LATINCUBE_DF), 10)
+
+
 if __name__ == '__main__':
     unittest.main()
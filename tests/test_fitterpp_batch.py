@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Created on July 4, 2022
+
+@author: joseph-hellerstein
+"""
+
+import fitterpp.constants as cn
+from fitterpp.evaluation_cache import EvaluationCache
+from fitterpp.fitterpp import Fitterpp
+from fitterpp.fitterpp_batch import FitterppBatch
+
+import concurrent.futures
+import lmfit
+import numpy as np
+import os
+import pandas as pd
+import tempfile
+import unittest
+
+
+IGNORE_TEST = False
+IS_PLOT = False
+YKEY = "y"
+SIZE = 20
+XVALUES = range(SIZE)
+CENTERS = [2, 5, 8]
+PARAMS = lmfit.Parameters()
+PARAMS.add("center", value=1, min=0, max=20)
+PARAMS.add("mult", value=1, min=0, max=10)
+METHODS = Fitterpp.mkFitterppMethod(method_names=[cn.METHOD_LEASTSQ],
+      max_fev=200)
+
+
+def calcParabola(center=0, mult=1, is_dataframe=True):
+    estimates = np.array([mult*(n - center)**2 for n in XVALUES])
+    if is_dataframe:
+        return pd.DataFrame({YKEY: estimates}, index=XVALUES)
+    return np.reshape(estimates, (len(estimates), 1))
+
+def mkDataDF(center, xvalues=XVALUES):
+    df = calcParabola(center=center, mult=2)
+    return df.loc[list(xvalues), :]
+
+
+################ TEST CLASSES #############
+class TestFitterppBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dfs = {"d%d" % c: mkDataDF(c) for c in CENTERS}
+
+    def testMakeFitters(self):
+        if IGNORE_TEST:
+            return
+        data_dfs = dict(self.data_dfs)
+        data_dfs["other"] = mkDataDF(3, xvalues=range(0, SIZE, 2))
+        batch = FitterppBatch(calcParabola, PARAMS, data_dfs,
+              method_names=METHODS)
+        fitter_dct = batch.makeFitters()
+        fitters = list(fitter_dct.values())
+        # Datasets with the same structure share the common indices
+        self.assertIs(fitters[0].data_common, fitters[1].data_common)
+        self.assertIsNot(fitters[0].data_common, fitters[3].data_common)
+        self.assertFalse(np.allclose(fitters[0].data_arr, fitters[1].data_arr))
+        self.assertEqual(len(fitters[3].data_arr), SIZE//2)
+        # Each dataset has its own cache and checkpoint
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "checkpoint")
+            cache = EvaluationCache()
+            batch = FitterppBatch(calcParabola, PARAMS, data_dfs,
+                  method_names=METHODS, cache=cache, checkpoint_path=path)
+            fitters = list(batch.makeFitters().values())
+            caches = [f.cache for f in fitters] + [cache]
+            self.assertEqual(len(set([id(c) for c in caches])), len(caches))
+            self.assertEqual(fitters[0].checkpoint_path, path + ".d2")
+            self.assertEqual(len(set([f.checkpoint_path for f in fitters])),
+                  len(fitters))
+            with self.assertRaises(ValueError):
+                _ = fitters[0].copyWithData(data_dfs["d5"])
+
+    def testFit(self):
+        if IGNORE_TEST:
+            return
+        def test(**kwargs):
+            batch = FitterppBatch(calcParabola, PARAMS, self.data_dfs,
+                  method_names=METHODS, **kwargs)
+            df = batch.fit()
+            self.assertEqual(list(df.index), list(self.data_dfs.keys()))
+            self.assertTrue(np.allclose(df["center"], CENTERS, atol=1e-3))
+            self.assertTrue(np.allclose(df["mult"], 2, atol=1e-3))
+            self.assertTrue((df[cn.NUM_EVALUATION] > 0).all())
+            self.assertTrue((df[cn.DURATION] > 0).all())
+        #
+        test()
+        test(cache=EvaluationCache())
+        test(n_workers=2)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            test(executor=executor)
+
+    def testIterFit(self):
+        if IGNORE_TEST:
+            return
+        batch = FitterppBatch(calcParabola, PARAMS,
+              list(self.data_dfs.values()), method_names=METHODS)
+        keys = [r.key for r in batch.iterFit()]
+        self.assertEqual(sorted(keys), list(range(len(CENTERS))))
+        self.assertEqual(len(batch.makeResultDF()), len(CENTERS))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,10 +7,14 @@ Created on Tue Feb 9, 2021
 
 import fitterpp.constants as cn
 from fitterpp.function_wrapper import FunctionWrapper
+from fitterpp.evaluation_cache import EvaluationCache
 
 import collections
 import numpy as np
 import lmfit
+import os
+import socket
+import tempfile
 import unittest
 
 
@@ -74,11 +78,52 @@ class TestFunctionWrapper(unittest.TestCase):
         arr = np.array(range(3))
         self.assertEqual(self.wrapper.calcSSQ(arr), 5)
 
+    def testGetReferenceTime(self):
+        if IGNORE_TEST:
+            return
+        reference_time = FunctionWrapper._reference_time
+        calibrate = FunctionWrapper.calibrate
+        try:
+            with tempfile.TemporaryDirectory() as cache_dir:
+                # Calibrates and writes the cache
+                FunctionWrapper._reference_time = None
+                FunctionWrapper.calibrate = staticmethod(lambda: 2.5)
+                self.assertEqual(FunctionWrapper.getReferenceTime(
+                      cache_dir=cache_dir), 2.5)
+                # Reads the cache
+                FunctionWrapper._reference_time = None
+                FunctionWrapper.calibrate = staticmethod(lambda: 1/0)
+                self.assertEqual(FunctionWrapper.getReferenceTime(
+                      cache_dir=cache_dir), 2.5)
+                self.assertEqual(os.listdir(cache_dir),
+                      ["reference_time_%s.txt" % socket.gethostname()])
+        finally:
+            FunctionWrapper._reference_time = reference_time
+            FunctionWrapper.calibrate = calibrate
+        wrapper = FunctionWrapper(self.function)
+        self.assertFalse(hasattr(wrapper, "reference_time"))
+
     def testExecute(self):
         if IGNORE_TEST:
             return
         result = self.wrapper.execute(self.params)
         self.assertEqual(result[0], INITIAL_VALUE - POINT[0])
+
+    def testExecuteWithCache(self):
+        if IGNORE_TEST:
+            return
+        cache = EvaluationCache()
+        wrapper = FunctionWrapper(self.function, cache=cache)
+        result1 = wrapper.execute(self.params)
+        result2 = wrapper.execute(self.params)
+        self.assertTrue(np.allclose(result1, result2))
+        self.assertEqual(wrapper.numHit, 1)
+        self.assertEqual(wrapper.numMiss, 1)
+        # Cache is shared with other wrappers
+        wrapper = FunctionWrapper(self.function, cache=cache)
+        _ = wrapper.execute(self.params)
+        self.assertEqual(wrapper.numHit, 1)
+        self.assertEqual(cache.num_hit, 2)
         
         
 
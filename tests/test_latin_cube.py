@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Created on July 4, 2022
+
+@author: joseph-hellerstein
+"""
+
+from fitterpp import latin_cube as lc
+
+import numpy as np
+import os
+import tempfile
+import unittest
+
+
+IGNORE_TEST = False
+IS_PLOT = False
+NUM_PARAMETER = 20
+
+
+################ TEST CLASSES #############
+class TestLatinCube(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = self.tmp_dir.name
+
+    def tearDown(self):
+        lc._block_dct.clear()
+        self.tmp_dir.cleanup()
+
+    def testMakeBlock(self):
+        if IGNORE_TEST:
+            return
+        arr = lc.makeBlock(0, NUM_PARAMETER)
+        self.assertEqual(arr.shape, (lc.BLOCK_SIZE, NUM_PARAMETER))
+        # One strip in each stratum of each parameter
+        strata_arr = np.sort(np.floor(arr*lc.BLOCK_SIZE), axis=0)
+        self.assertTrue(np.allclose(strata_arr[:, 0], range(lc.BLOCK_SIZE)))
+        # Columns do not depend on the number of parameters
+        self.assertTrue(np.allclose(lc.makeBlock(0, 2), arr[:, :2]))
+        self.assertFalse(np.allclose(lc.makeBlock(1, 2), arr[:, :2]))
+
+    def testGetStrip(self):
+        if IGNORE_TEST:
+            return
+        strip_idx = lc.BLOCK_SIZE + 3
+        values = lc.getStrip(strip_idx, NUM_PARAMETER,
+              cache_dir=self.cache_dir)
+        self.assertEqual(len(values), NUM_PARAMETER)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        # Values are read from the file
+        lc._block_dct.clear()
+        other_values = lc.getStrip(strip_idx, NUM_PARAMETER,
+              cache_dir=self.cache_dir)
+        self.assertTrue(np.allclose(values, other_values))
+        # More parameters than the width of the default table
+        num_parameter = 2*lc.NUM_PARAMETER
+        values = lc.getStrip(strip_idx, num_parameter,
+              cache_dir=self.cache_dir)
+        self.assertEqual(len(values), num_parameter)
+        self.assertTrue(np.allclose(values[:NUM_PARAMETER], other_values))
+        # Seeds give different tables
+        values = lc.getStrip(strip_idx, NUM_PARAMETER, seed=1,
+              cache_dir=self.cache_dir)
+        self.assertFalse(np.allclose(values, other_values))
+        with self.assertRaises(ValueError):
+            _ = lc.getStrip(0, NUM_PARAMETER, cache_dir=self.cache_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Created on July 4, 2022
+
+@author: joseph-hellerstein
+"""
+
+import fitterpp.constants as cn
+from fitterpp.fitterpp import Fitterpp
+from fitterpp.mapped_data import MappedData
+
+import concurrent.futures
+import lmfit
+import numpy as np
+import os
+import pandas as pd
+import pickle
+import tempfile
+import unittest
+
+
+IGNORE_TEST = False
+IS_PLOT = False
+SIZE = 1000
+TIMES = np.linspace(0, 10, SIZE)
+COLUMNS = ["y1", "y2"]
+PARAMS = lmfit.Parameters()
+PARAMS.add("rate", value=0.5, min=0, max=10)
+PARAMS.add("scale", value=2, min=0, max=10)
+
+
+def calcDecay(rate=1.0, scale=1.0):
+    """
+    Calculates two columns with declared labels (TIMES, COLUMNS).
+    """
+    return np.column_stack([scale*np.exp(-rate*TIMES),
+          scale*(1 - np.exp(-rate*TIMES))])
+
+
+################ TEST CLASSES #############
+class TestMappedData(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "data.npy")
+        self.data_df = pd.DataFrame(calcDecay(rate=1.5, scale=3),
+              index=TIMES, columns=COLUMNS)
+        self.data = MappedData.fromDataFrame(self.path, self.data_df)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def testConstructor(self):
+        if IGNORE_TEST:
+            return
+        self.assertTrue(isinstance(self.data.values, np.memmap))
+        self.assertEqual(self.data.shape, self.data_df.shape)
+        self.assertTrue(self.data.index.equals(self.data_df.index))
+        self.assertTrue(self.data.toDataFrame().equals(self.data_df))
+        # Default labels are positions
+        data = MappedData(self.path)
+        self.assertTrue(data.columns.equals(pd.RangeIndex(len(COLUMNS))))
+        with self.assertRaises(ValueError):
+            _ = MappedData(self.path, columns=["a"])
+
+    def testPickle(self):
+        if IGNORE_TEST:
+            return
+        serialization = pickle.dumps(self.data)
+        # The values are not pickled
+        self.assertLess(len(serialization), self.data.values.nbytes)
+        data = pickle.loads(serialization)
+        self.assertTrue(isinstance(data.values, np.memmap))
+        self.assertTrue(np.allclose(data.values, self.data.values))
+
+    def testFit(self):
+        if IGNORE_TEST:
+            return
+        methods = Fitterpp.mkFitterppMethod(method_names=[cn.METHOD_LEASTSQ],
+              max_fev=200)
+        fitter = Fitterpp(calcDecay, PARAMS, self.data, method_names=methods,
+              output_index=self.data.index, output_columns=self.data.columns,
+              chunk_size=101)
+        # The observations are the mapped values
+        self.assertTrue(np.shares_memory(fitter.data_arr, self.data.values))
+        self.assertLess(len(pickle.dumps(fitter.function)),
+              self.data.values.nbytes)
+        fitter.fit()
+        self.assertTrue(np.isclose(fitter.final_params["rate"].value, 1.5))
+        self.assertTrue(np.isclose(fitter.final_params["scale"].value, 3))
+        # Worker processes map the data
+        fitter = Fitterpp(calcDecay, PARAMS, self.data, method_names=methods,
+              output_index=self.data.index, output_columns=self.data.columns,
+              num_latincube=2, n_workers=2)
+        self.assertLess(len(pickle.dumps(fitter)), self.data.values.nbytes)
+        fitter.fit()
+        self.assertLess(fitter.rssq, 1e-6)
+
+    def testFromParquet(self):
+        if IGNORE_TEST:
+            return
+        try:
+            import pyarrow
+        except ImportError:
+            return
+        parquet_path = os.path.join(self.tmp_dir.name, "data.parquet")
+        df = self.data_df.copy()
+        df.index.name = "time"
+        df.reset_index().to_parquet(parquet_path)
+        data = MappedData.fromParquet(parquet_path, self.path,
+              index_column="time", batch_size=300)
+        self.assertEqual(list(data.columns), COLUMNS)
+        self.assertTrue(np.allclose(data.values, self.data_df.values))
+        self.assertTrue(np.allclose(data.index, TIMES))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Created on July 4, 2022
+
+@author: joseph-hellerstein
+"""
+
+import fitterpp.constants as cn
+from fitterpp.phase_timer import PhaseTimer
+
+import pickle
+import time
+import unittest
+
+
+IGNORE_TEST = False
+IS_PLOT = False
+NS = 10**9
+
+
+################ TEST CLASSES #############
+class TestPhaseTimer(unittest.TestCase):
+
+    def setUp(self):
+        self.timer = PhaseTimer()
+
+    def testAdd(self):
+        if IGNORE_TEST:
+            return
+        self.timer.add(cn.PHASE_USER_FUNCTION, NS)
+        self.timer.add(cn.PHASE_USER_FUNCTION, NS)
+        self.assertEqual(self.timer.getSeconds(cn.PHASE_USER_FUNCTION), 2)
+        self.assertEqual(self.timer.getCount(cn.PHASE_USER_FUNCTION), 2)
+        self.assertEqual(self.timer.getSeconds(cn.PHASE_RESIDUAL), 0)
+        start_ns = time.perf_counter_ns()
+        now_ns = self.timer.addSince(cn.PHASE_RESIDUAL, start_ns)
+        self.assertGreaterEqual(now_ns, start_ns)
+        self.assertEqual(self.timer.getCount(cn.PHASE_RESIDUAL), 1)
+
+    def testMinimizer(self):
+        if IGNORE_TEST:
+            return
+        self.timer.add(cn.PHASE_TOTAL, 3*NS)
+        self.timer.add(cn.PHASE_USER_FUNCTION, NS)
+        self.timer.add(cn.PHASE_PARAMETERS, NS)
+        self.assertEqual(self.timer.getSeconds(cn.PHASE_MINIMIZER), 1)
+        self.assertEqual(self.timer.getCount(cn.PHASE_MINIMIZER), 1)
+
+    def testMerge(self):
+        if IGNORE_TEST:
+            return
+        self.timer.add(cn.PHASE_TOTAL, NS)
+        other = pickle.loads(pickle.dumps(self.timer))
+        other.add(cn.PHASE_START, NS)
+        self.timer.merge(other)
+        self.assertEqual(self.timer.getSeconds(cn.PHASE_TOTAL), 2)
+        self.assertEqual(self.timer.getCount(cn.PHASE_TOTAL), 2)
+        self.assertEqual(self.timer.getSeconds(cn.PHASE_START), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
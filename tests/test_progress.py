@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Created on July 4, 2022
+
+@author: joseph-hellerstein
+"""
+
+from fitterpp.progress import FitMonitor
+
+import collections
+import unittest
+
+
+IGNORE_TEST = False
+IS_PLOT = False
+METHOD = "leastsq"
+Wrapper = collections.namedtuple("Wrapper", ["numEvaluation", "rssq"])
+
+
+################ TEST CLASSES #############
+class TestFitMonitor(unittest.TestCase):
+
+    def setUp(self):
+        self.events = []
+        self.monitor = FitMonitor(callback=self.events.append, interval=2)
+
+    def testReport(self):
+        if IGNORE_TEST:
+            return
+        self.monitor.report(0, METHOD, 10, 5.0)
+        self.monitor.report(1, METHOD, 10, 7.0)
+        self.assertEqual(len(self.events), 2)
+        # The rssq is the smallest of the fit
+        self.assertEqual(self.events[1].rssq, 5.0)
+        self.assertEqual(self.events[1].start, 1)
+
+    def testIterCallback(self):
+        if IGNORE_TEST:
+            return
+        callback = self.monitor.makeIterCallback(0, METHOD, Wrapper(3, 1.0))
+        results = [callback(None, n, None) for n in range(5)]
+        self.assertEqual(len(self.events), 2)
+        self.assertFalse(any(results))
+        self.monitor.cancel()
+        self.assertTrue(self.monitor.is_cancelled)
+        self.assertTrue(callback(None, 1, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Created on July 4, 2022
+
+@author: joseph-hellerstein
+"""
+
+from fitterpp.result_store import ResultStore
+from fitterpp import result_store as rs
+
+import lmfit
+import numpy as np
+import os
+import pandas as pd
+import tempfile
+import unittest
+
+
+IGNORE_TEST = False
+IS_PLOT = False
+SIZE = 10
+DATA_DF = pd.DataFrame({"y": np.arange(SIZE, dtype=float)})
+PARAMS = lmfit.Parameters()
+PARAMS.add("a", value=1, min=0, max=10)
+
+
+def calcLine(a=1, is_dataframe=True):
+    return DATA_DF*a
+
+def calcOther(a=1, is_dataframe=True):
+    return DATA_DF*a + 1
+
+
+################ TEST CLASSES #############
+class TestResultStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "store.db")
+        self.store = ResultStore(self.path, max_entry=2)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def testFingerprint(self):
+        if IGNORE_TEST:
+            return
+        keys = ResultStore.makeKeys(calcLine, PARAMS, DATA_DF)
+        self.assertEqual(keys, ResultStore.makeKeys(calcLine, PARAMS,
+              DATA_DF.copy()))
+        self.assertNotEqual(keys[0], rs.fingerprintModel(calcOther, PARAMS))
+        params = PARAMS.copy()
+        params["a"].max = 20
+        self.assertNotEqual(keys[0], rs.fingerprintModel(calcLine, params))
+        other_df = DATA_DF + 1
+        self.assertEqual(keys[1], rs.fingerprintStructure(other_df))
+        self.assertNotEqual(keys[2], rs.fingerprintData(other_df))
+
+    def testGetPut(self):
+        if IGNORE_TEST:
+            return
+        keys = ResultStore.makeKeys(calcLine, PARAMS, DATA_DF)
+        values, rssq = self.store.get(keys)
+        self.assertIsNone(values)
+        self.store.put(keys, DATA_DF, [2.0], 0.5)
+        values, rssq = ResultStore(self.path).get(keys)
+        self.assertTrue(np.allclose(values, [2.0]))
+        self.assertEqual(rssq, 0.5)
+
+    def testGetNearestAndEvict(self):
+        if IGNORE_TEST:
+            return
+        data_dfs = [DATA_DF + n for n in range(3)]
+        keys_lst = [ResultStore.makeKeys(calcLine, PARAMS, d) for d in data_dfs]
+        for idx in range(2):
+            self.store.put(keys_lst[idx], data_dfs[idx], [idx], 0)
+        values_lst = self.store.getNearest(keys_lst[2], data_dfs[2],
+              num_entry=2)
+        self.assertEqual([v[0] for v in values_lst], [1, 0])
+        # The least recently used entry is evicted
+        _ = self.store.get(keys_lst[0])
+        self.store.put(keys_lst[2], data_dfs[2], [2], 0)
+        self.assertEqual(len(self.store), 2)
+        self.assertEqual(self.store.num_evict, 1)
+        self.assertIsNone(self.store.get(keys_lst[1])[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Created on July 4, 2022
+
+@author: joseph-hellerstein
+"""
+
+import fitterpp.constants as cn
+from fitterpp import shard
+from fitterpp.checkpoint import Checkpoint
+import helpers
+
+import numpy as np
+import os
+import pandas as pd
+import subprocess
+import sys
+import tempfile
+import unittest
+
+
+IGNORE_TEST = False
+IS_PLOT = False
+MODEL_STG = '''
+import lmfit
+import numpy as np
+import pandas as pd
+
+XVALUES = np.arange(20)
+initial_params = lmfit.Parameters()
+initial_params.add("center", value=0, min=0, max=100)
+initial_params.add("mult", value=0, min=0, max=20)
+
+def user_function(center=0, mult=1, is_dataframe=True):
+    estimates = mult*(XVALUES - center)**2
+    if is_dataframe:
+        return pd.DataFrame({"y": estimates}, index=XVALUES)
+    return np.reshape(estimates, (len(XVALUES), 1))
+'''
+XVALUES = np.arange(20)
+DATA_DF = pd.DataFrame({"y": 2*(XVALUES - 10)**2 + 0.1*np.random.rand(20)},
+      index=XVALUES)
+NUM_STRIP = 4
+
+
+################ TEST CLASSES #############
+class TestShard(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = helpers.TemporaryCacheDir()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.model_path = os.path.join(self.tmp_dir.name, "parabola_model.py")
+        with open(self.model_path, "w") as fd:
+            fd.write(MODEL_STG)
+        self.data_path = os.path.join(self.tmp_dir.name, "data.csv")
+        DATA_DF.to_csv(self.data_path)
+        self.out_dir = os.path.join(self.tmp_dir.name, "results")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        self.cache_dir.cleanup()
+
+    def runShard(self, *args):
+        return subprocess.Popen([sys.executable, "-m", "fitterpp.shard"]
+              + list(args), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def testFitAndMerge(self):
+        if IGNORE_TEST:
+            return
+        # Processes stand in for nodes
+        processes = [self.runShard("fit", "--model", self.model_path,
+              "--data", self.data_path, "--first", str(first),
+              "--last", str(first + 1), "--out_dir", self.out_dir,
+              "--method_names", cn.METHOD_LEASTSQ)
+              for first in range(1, NUM_STRIP + 1, 2)]
+        for process in processes:
+            _, stderr = process.communicate()
+            self.assertEqual(process.returncode, 0, stderr.decode())
+        self.assertEqual(len(os.listdir(self.out_dir)), NUM_STRIP)
+        process = self.runShard("merge", "--out_dir", self.out_dir)
+        stdout, stderr = process.communicate()
+        self.assertEqual(process.returncode, 0, stderr.decode())
+        self.assertIn("Best strip", stdout.decode())
+        # Merged result
+        strip_idx, result = shard.mergeShards(self.out_dir)
+        self.assertEqual(len(result.traces), NUM_STRIP)
+        checkpoint = Checkpoint.read(os.path.join(self.out_dir,
+              shard.MERGE_FILE))
+        self.assertEqual(sorted(checkpoint.results.keys()),
+              list(range(1, NUM_STRIP + 1)))
+        self.assertEqual(checkpoint.best_result.rssq, result.rssq)
+        self.assertEqual(checkpoint.results[strip_idx].rssq, result.rssq)
+        self.assertTrue(np.isclose(result.prm.valuesdict()["center"], 10,
+              rtol=0.01))
+
+    def testFitShardSkipsCompletedStrips(self):
+        if IGNORE_TEST:
+            return
+        paths = shard.fitShard(self.model_path, self.data_path, 1, 2,
+              self.out_dir, method_names=cn.METHOD_LEASTSQ)
+        mtimes = [os.path.getmtime(p) for p in paths]
+        _ = shard.fitShard(self.model_path, self.data_path, 1, 2,
+              self.out_dir, method_names=cn.METHOD_LEASTSQ)
+        self.assertEqual(mtimes, [os.path.getmtime(p) for p in paths])
+
+    def testErrors(self):
+        if IGNORE_TEST:
+            return
+        with self.assertRaises(ValueError):
+            shard.fitShard(self.model_path, self.data_path, 2, 1, self.out_dir)
+        with self.assertRaises(ValueError):
+            shard.mergeShards(self.out_dir)
+        with self.assertRaises(ValueError):
+            shard.loadModel("fitterpp.constants")
+
+
+if __name__ == '__main__':
+    unittest.main()
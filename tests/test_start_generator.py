@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Created on July 4, 2022
+
+@author: joseph-hellerstein
+"""
+
+import fitterpp.constants as cn
+from fitterpp import start_generator as sg
+
+import lmfit
+import numpy as np
+import unittest
+
+
+IGNORE_TEST = False
+IS_PLOT = False
+NUM_SAMPLE = 50
+NUM_PARAMETER = 4
+
+
+################ TEST CLASSES #############
+class TestStartGenerator(unittest.TestCase):
+
+    def testSample(self):
+        if IGNORE_TEST:
+            return
+        for sampler in cn.SAMPLERS[:-1]:
+            arr = sg.sample(NUM_SAMPLE, NUM_PARAMETER, sampler=sampler, seed=1)
+            self.assertEqual(arr.shape, (NUM_SAMPLE, NUM_PARAMETER))
+            self.assertTrue(np.all((arr >= 0) & (arr < 1)))
+            # Seeded samples are reproducible
+            other_arr = sg.sample(NUM_SAMPLE, NUM_PARAMETER, sampler=sampler,
+                  seed=1)
+            self.assertTrue(np.allclose(arr, other_arr))
+        with self.assertRaises(ValueError):
+            _ = sg.sample(NUM_SAMPLE, NUM_PARAMETER, sampler="dummy")
+
+    def testLatinHypercube(self):
+        if IGNORE_TEST:
+            return
+        for sampler in [cn.SAMPLER_LHS, cn.SAMPLER_MAXIMIN]:
+            arr = sg.sample(NUM_SAMPLE, NUM_PARAMETER, sampler=sampler)
+            # One sample in each stratum of each parameter
+            strata_arr = np.sort(np.floor(arr*NUM_SAMPLE), axis=0)
+            for idx in range(NUM_PARAMETER):
+                self.assertTrue(np.allclose(strata_arr[:, idx],
+                      range(NUM_SAMPLE)))
+
+    def testMakeStartArray(self):
+        if IGNORE_TEST:
+            return
+        parameters = lmfit.Parameters()
+        parameters.add("a", value=1, min=-1, max=1)
+        parameters.add("b", value=1, min=10, max=20)
+        arr = sg.makeStartArray(parameters, NUM_SAMPLE, seed=0)
+        self.assertEqual(arr.shape, (NUM_SAMPLE, 2))
+        self.assertTrue(np.all((arr[:, 0] >= -1) & (arr[:, 0] <= 1)))
+        self.assertTrue(np.all((arr[:, 1] >= 10) & (arr[:, 1] <= 20)))
+
+    def testLarge(self):
+        if IGNORE_TEST:
+            return
+        arr = sg.sample(10000, 500, seed=0)
+        self.assertEqual(arr.shape, (10000, 500))
+        self.assertTrue(np.isclose(np.mean(arr), 0.5, atol=0.01))
+
+
+if __name__ == '__main__':
+    unittest.main()